@@ -0,0 +1,257 @@
+"""
+Monthly rollover of old audit events into compressed, checksummed JSONL files.
+
+Each archived month becomes one or more segments in the archive directory:
+
+    audit-events-2025-01-001.jsonl.gz        one serialized event per line
+    audit-events-2025-01-001.manifest.json   month, row count, id range, sha256
+
+Rows are deleted from audit_events only after their segment has been written,
+fsynced and re-read against its checksum, and only by the ids the segment
+holds: a row that commits into the month during the export is left for the
+next run.
+"""
+
+import gzip
+import hashlib
+import heapq
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+
+from audit_log import serialize_audit_event
+from models import AuditEvent
+
+SEGMENT_PREFIX = "audit-events-"
+DELETE_CHUNK_SIZE = 5000
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    return month_start(month_start(value) + timedelta(days=32))
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _next_segment_base(archive_dir: str, month_label: str) -> str:
+    sequence = 1
+    while os.path.exists(
+        os.path.join(archive_dir, f"{SEGMENT_PREFIX}{month_label}-{sequence:03d}.manifest.json")
+    ):
+        sequence += 1
+    return os.path.join(archive_dir, f"{SEGMENT_PREFIX}{month_label}-{sequence:03d}")
+
+
+def _write_segment(
+    db, archive_dir: str, start: datetime, end: datetime
+) -> tuple[dict | None, list[int]]:
+    """Export the month's rows; returns the manifest and the ids written."""
+    month_label = start.strftime("%Y-%m")
+    base = _next_segment_base(archive_dir, month_label)
+    data_path = base + ".jsonl.gz"
+    tmp_path = data_path + ".tmp"
+
+    rows = 0
+    min_id = max_id = None
+    ids = []
+    events = db.execute(
+        select(AuditEvent)
+        .where(AuditEvent.created_at >= start, AuditEvent.created_at < end)
+        .order_by(AuditEvent.created_at.asc(), AuditEvent.id.asc())
+        .execution_options(yield_per=1000)
+    ).scalars()
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+        for event in events:
+            handle.write(json.dumps(serialize_audit_event(event)) + "\n")
+            rows += 1
+            ids.append(event.id)
+            min_id = event.id if min_id is None else min(min_id, event.id)
+            max_id = event.id if max_id is None else max(max_id, event.id)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    if not rows:
+        os.remove(tmp_path)
+        return None, ids
+
+    os.replace(tmp_path, data_path)
+    manifest = {
+        "month": month_label,
+        "file": os.path.basename(data_path),
+        "rows": rows,
+        "min_id": min_id,
+        "max_id": max_id,
+        "range_start": start.isoformat(),
+        "range_end": end.isoformat(),
+        "sha256": _file_sha256(data_path),
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    }
+    verify_segment(archive_dir, manifest)
+    with open(base + ".manifest.json", "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+        handle.flush()
+        os.fsync(handle.fileno())
+    return manifest, ids
+
+
+def verify_segment(archive_dir: str, manifest: dict):
+    """Raise ValueError unless the segment matches its checksum and row count."""
+    data_path = os.path.join(archive_dir, manifest["file"])
+    if _file_sha256(data_path) != manifest["sha256"]:
+        raise ValueError(f"Checksum mismatch for {manifest['file']}")
+    with gzip.open(data_path, "rt", encoding="utf-8") as handle:
+        rows = sum(1 for _line in handle)
+    if rows != manifest["rows"]:
+        raise ValueError(f"Row count mismatch for {manifest['file']}: {rows} != {manifest['rows']}")
+
+
+def _delete_archived_rows(db, ids: list[int]):
+    for offset in range(0, len(ids), DELETE_CHUNK_SIZE):
+        db.execute(delete(AuditEvent).where(AuditEvent.id.in_(ids[offset:offset + DELETE_CHUNK_SIZE])))
+        db.commit()
+
+
+def archive_audit_events(session_factory, archive_dir: str, older_than_days: int) -> list[dict]:
+    """
+    Archive every complete month older than `older_than_days`, oldest first.
+    Safe to re-run: months with no remaining rows are skipped and events that
+    arrive late for an archived month go into a new segment.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = month_start(datetime.now(timezone.utc) - timedelta(days=older_than_days))
+
+    db = session_factory()
+    try:
+        oldest = db.execute(
+            select(func.min(AuditEvent.created_at)).where(AuditEvent.created_at < cutoff)
+        ).scalar()
+        if oldest is None:
+            return []
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+
+        archived = []
+        start = month_start(oldest)
+        while start < cutoff:
+            end = next_month(start)
+            manifest, ids = _write_segment(db, archive_dir, start, end)
+            if manifest:
+                _delete_archived_rows(db, ids)
+                archived.append(manifest)
+            start = end
+        return archived
+    finally:
+        db.close()
+
+
+def load_manifests(archive_dir: str) -> list[dict]:
+    if not archive_dir or not os.path.isdir(archive_dir):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(archive_dir)):
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(".manifest.json"):
+            with open(os.path.join(archive_dir, name), encoding="utf-8") as handle:
+                manifests.append(json.load(handle))
+    return manifests
+
+
+def _parse_timestamp(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def iter_archived_events(
+    archive_dir: str,
+    *,
+    user_id: int | None = None,
+    event_type: str | None = None,
+    resource_type: str | None = None,
+    resource_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    metadata: dict | None = None,
+):
+    """
+    Yield archived events (serialize_audit_event shape) oldest first, with the
+    same filters as the /audit-events API. Segments outside the time range
+    are skipped without being opened.
+    """
+    since, until = _as_utc(since), _as_utc(until)
+
+    def segment_rows(manifest):
+        data_path = os.path.join(archive_dir, manifest["file"])
+        with gzip.open(data_path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                row = json.loads(line)
+                if user_id is not None and row["user_id"] != user_id:
+                    continue
+                if event_type and row["event_type"] != event_type:
+                    continue
+                if resource_type and row["resource_type"] != resource_type:
+                    continue
+                if resource_id and row["resource_id"] != resource_id:
+                    continue
+                created_at = _parse_timestamp(row["created_at"])
+                if since is not None and (created_at is None or created_at < since):
+                    continue
+                if until is not None and (created_at is None or created_at >= until):
+                    continue
+                if metadata and any(row["metadata"].get(k) != v for k, v in metadata.items()):
+                    continue
+                yield row
+
+    segments = []
+    for manifest in load_manifests(archive_dir):
+        range_start = _parse_timestamp(manifest["range_start"])
+        range_end = _parse_timestamp(manifest["range_end"])
+        if since is not None and range_end <= since:
+            continue
+        if until is not None and range_start >= until:
+            continue
+        segments.append(segment_rows(manifest))
+    # Late events for an archived month land in a later, overlapping segment.
+    yield from merge_audit_rows(*segments)
+
+
+def merge_audit_rows(*streams):
+    """
+    Merge event streams that are each ordered by (created_at, id), yielding
+    every event once. Archive segments can overlap each other and the live
+    table (late events, or a run that stopped before deleting its rows), so
+    neither source is assumed to come strictly before the other.
+    """
+    # Copies of one event share a sort key, so they come out adjacent. Rows
+    # are compared whole: SQLite reuses the ids of archived (deleted) rows.
+    current_key, seen = None, []
+    for row in heapq.merge(*streams, key=_row_order):
+        key = _row_order(row)
+        if key != current_key:
+            current_key, seen = key, []
+        if row in seen:
+            continue
+        seen.append(row)
+        yield row
+
+
+def _row_order(row: dict) -> tuple:
+    created_at = _parse_timestamp(row["created_at"])
+    return (created_at or datetime.min.replace(tzinfo=timezone.utc), row["id"])
@@ -0,0 +1,171 @@
+"""Audit event serialization and the batched background writer."""
+
+import json
+import queue
+import threading
+import time
+
+from sqlalchemy import event, insert
+
+from models import AuditEvent
+
+# Session.info key for rows waiting for their transaction to commit.
+PENDING_AUDIT_KEY = "pending_audit_rows"
+
+
+def serialize_audit_event(event: AuditEvent) -> dict:
+    try:
+        metadata = json.loads(event.metadata_json) if event.metadata_json else {}
+    except ValueError:
+        metadata = {"raw": event.metadata_json}
+    return {
+        "id": event.id,
+        "user_id": event.user_id,
+        "event_type": event.event_type,
+        "resource_type": event.resource_type,
+        "resource_id": event.resource_id,
+        "ip_address": event.ip_address,
+        "user_agent": event.user_agent,
+        "metadata": metadata,
+        "created_at": event.created_at.isoformat() if event.created_at else None,
+    }
+
+
+class AuditWriter:
+    """
+    Collects audit rows in a bounded in-memory queue and bulk-inserts them
+    from a daemon thread, `batch_size` rows or `flush_interval_seconds` at a
+    time. enqueue() returns False when the queue is full so the caller can
+    fall back to writing the row itself.
+
+    Request code calls defer() instead: the rows are queued only when the
+    session commits (see install_session_hooks), so a rolled-back request
+    leaves no audit trail of things that did not happen.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        *,
+        batch_size: int = 200,
+        flush_interval_seconds: float = 1.0,
+        max_queue_size: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_queue_size))
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"enqueued": 0, "rejected": 0, "written": 0, "batches": 0, "lost": 0}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker and write whatever is still queued."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def enqueue(self, row: dict) -> bool:
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._count("rejected")
+            return False
+        self._count("enqueued")
+        return True
+
+    def defer(self, db, row: dict):
+        if not db.in_transaction():
+            # Begin now so a rollback before any query still discards the row.
+            db.begin()
+        db.info.setdefault(PENDING_AUDIT_KEY, []).append(row)
+
+    def install_session_hooks(self, session_class):
+        """Queue deferred rows after commit; drop them on rollback."""
+
+        @event.listens_for(session_class, "after_commit")
+        def _queue_committed(session):
+            rows = session.info.pop(PENDING_AUDIT_KEY, None)
+            if not rows:
+                return
+            overflow = [row for row in rows if not self.enqueue(row)]
+            if overflow:
+                # The queue is full; write them now rather than lose them.
+                self._write(overflow)
+
+        @event.listens_for(session_class, "after_soft_rollback")
+        def _discard_rolled_back(session, previous_transaction):
+            if previous_transaction.parent is None:
+                session.info.pop(PENDING_AUDIT_KEY, None)
+
+    def flush(self):
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return
+            self._write(batch)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval_seconds)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _drain(self, limit: int) -> list[dict]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[dict]):
+        for attempt in range(2):
+            db = self.session_factory()
+            try:
+                db.execute(insert(AuditEvent), batch)
+                db.commit()
+                with self._stats_lock:
+                    self._stats["written"] += len(batch)
+                    self._stats["batches"] += 1
+                return
+            except Exception as write_error:
+                db.rollback()
+                if attempt:
+                    print(f"Audit writer dropped {len(batch)} events: {write_error}")
+                    self._count("lost", len(batch))
+            finally:
+                db.close()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[name] += amount
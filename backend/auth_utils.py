@@ -1,8 +1,12 @@
 """Authentication and token helpers."""
 
+import asyncio
 import hashlib
 import os
 import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from passlib.context import CryptContext
@@ -14,24 +18,190 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "15"))
 REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_DAYS", "14"))
 
+# Password hashing runs on its own small pool so a login burst cannot occupy
+# every thread of the shared threadpool. Requests beyond the pending limit
+# are rejected with 503 instead of queueing.
+PASSWORD_HASH_WORKERS = max(1, int(os.getenv("PASSWORD_HASH_WORKERS", "2")))
+PASSWORD_HASH_MAX_PENDING = max(0, int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16")))
+UNUSABLE_PASSWORD_PREFIX = "!"
+
+# pbkdf2_sha256 work factor; run `python manage.py calibrate-password-hash`
+# on the deployment host to pick a value for a latency budget. Hashes made
+# with any other round count are upgraded on the next successful login.
+DEFAULT_PASSWORD_HASH_ROUNDS = 29000
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", str(DEFAULT_PASSWORD_HASH_ROUNDS)))
+MIN_PASSWORD_HASH_ROUNDS = 10000
+
 # IMPORTANT: use pbkdf2_sha256 instead of bcrypt to avoid backend issues
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256"],
     deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=PASSWORD_HASH_ROUNDS,
+)
+
+_password_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_password_hash_slots = threading.BoundedSemaphore(
+    PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING
 )
+_password_hash_stats_lock = threading.Lock()
+_password_hash_stats = {
+    "completed": 0,
+    "rejected": 0,
+    "queue_wait_seconds_total": 0.0,
+    "queue_wait_seconds_max": 0.0,
+    "hash_seconds_total": 0.0,
+    "hash_seconds_max": 0.0,
+}
+
+
+def _record_password_hash_timing(queue_wait: float, hash_time: float):
+    with _password_hash_stats_lock:
+        stats = _password_hash_stats
+        stats["completed"] += 1
+        stats["queue_wait_seconds_total"] += queue_wait
+        stats["queue_wait_seconds_max"] = max(stats["queue_wait_seconds_max"], queue_wait)
+        stats["hash_seconds_total"] += hash_time
+        stats["hash_seconds_max"] = max(stats["hash_seconds_max"], hash_time)
+
+
+def _submit_password_hash(func, *args):
+    """
+    Queue `func(*args)` on the hashing pool and return its future. The slot
+    is held until the hash itself finishes, even if the caller stops waiting.
+    """
+    if not _password_hash_slots.acquire(blocking=False):
+        with _password_hash_stats_lock:
+            _password_hash_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy. Please try again shortly.",
+        )
+
+    submitted_at = time.perf_counter()
+
+    def timed_call():
+        started_at = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            _record_password_hash_timing(
+                started_at - submitted_at,
+                time.perf_counter() - started_at,
+            )
+
+    try:
+        future = _password_hash_executor.submit(timed_call)
+    except BaseException:
+        _password_hash_slots.release()
+        raise
+    future.add_done_callback(lambda _future: _password_hash_slots.release())
+    return future
+
+
+def _run_password_hash(func, *args):
+    # Blocks the calling thread; request handlers use the *_async variants.
+    return _submit_password_hash(func, *args).result()
+
+
+async def _run_password_hash_async(func, *args):
+    return await asyncio.wrap_future(_submit_password_hash(func, *args))
+
+
+def get_password_hash_stats() -> dict:
+    with _password_hash_stats_lock:
+        stats = dict(_password_hash_stats)
+    completed = stats["completed"]
+    stats["queue_wait_seconds_avg"] = (
+        stats["queue_wait_seconds_total"] / completed if completed else 0.0
+    )
+    stats["hash_seconds_avg"] = stats["hash_seconds_total"] / completed if completed else 0.0
+    stats["workers"] = PASSWORD_HASH_WORKERS
+    stats["max_pending"] = PASSWORD_HASH_MAX_PENDING
+    return stats
+
 
 def hash_password(password: str) -> str:
     """
     Hash a plain-text password using pbkdf2_sha256.
     No 72-byte limitation, safe for normal passwords.
     """
-    return pwd_context.hash(password)
+    return _run_password_hash(pwd_context.hash, password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain-text password against its hash.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    if is_unusable_password_hash(hashed_password):
+        return False
+    return _run_password_hash(pwd_context.verify, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() for async routes: waits without holding a threadpool thread."""
+    return await _run_password_hash_async(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    if is_unusable_password_hash(hashed_password):
+        return False
+    return await _run_password_hash_async(pwd_context.verify, plain_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    True when a stored hash was made with a different scheme or round count
+    than the current PASSWORD_HASH_ROUNDS.
+    """
+    if is_unusable_password_hash(hashed_password):
+        return False
+    return pwd_context.needs_update(hashed_password)
+
+
+def calibrate_password_hash_rounds(target_ms: float, samples: int = 5) -> dict:
+    """
+    Time pbkdf2_sha256 on this machine and return the round count that
+    keeps a single hash near `target_ms`.
+    """
+    handler = pwd_context.handler("pbkdf2_sha256")
+    probe_rounds = DEFAULT_PASSWORD_HASH_ROUNDS
+    probe = handler.using(rounds=probe_rounds)
+    probe.hash("calibration")  # warm up
+
+    timings = []
+    for _ in range(max(1, samples)):
+        started = time.perf_counter()
+        probe.hash("calibration")
+        timings.append(time.perf_counter() - started)
+    probe_ms = sorted(timings)[len(timings) // 2] * 1000
+
+    rounds = int(probe_rounds * target_ms / probe_ms) // 1000 * 1000
+    rounds = max(MIN_PASSWORD_HASH_ROUNDS, rounds)
+    return {
+        "target_ms": target_ms,
+        "probe_rounds": probe_rounds,
+        "probe_ms": probe_ms,
+        "recommended_rounds": rounds,
+        "estimated_ms": probe_ms * rounds / probe_rounds,
+        "current_rounds": PASSWORD_HASH_ROUNDS,
+        "current_estimated_ms": probe_ms * PASSWORD_HASH_ROUNDS / probe_rounds,
+    }
+
+
+def make_unusable_password_hash() -> str:
+    """
+    Marker for accounts that cannot log in until a password is set
+    (e.g. clients created from an intake). Never matches any password.
+    """
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(16)
+
+
+def is_unusable_password_hash(hashed_password: str | None) -> bool:
+    return not hashed_password or hashed_password.startswith(UNUSABLE_PASSWORD_PREFIX)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
@@ -0,0 +1,216 @@
+"""
+Load benchmark: async database path vs sync threadpool path for the
+highest-volume reads (/notifications, /notifications/unread-count, /matters,
+/matters/{id}/messages).
+
+Drives the real app in-process with N concurrent clients, first with
+ASYNC_DATABASE_READS off (sync sessions on the anyio threadpool) and then
+on (AsyncSession on aiosqlite/asyncpg), and reports throughput and
+p50/p99 latency per concurrency level.
+
+    cd backend && python benchmarks/async_load_bench.py [--concurrency 1 16 64 256]
+    cd backend && python benchmarks/async_load_bench.py --database-url postgresql://...
+
+Defaults to a throwaway SQLite database, which answers in microseconds and
+leaves little for the async path to win. --query-latency-ms makes every
+SQLite statement wait inside the driver's thread, like a round trip to a
+remote server would; or point --database-url at an empty PostgreSQL
+database over the network.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per run")
+    parser.add_argument("--threadpool-size", type=int, default=40, help="anyio default is 40")
+    parser.add_argument("--query-latency-ms", type=float, default=0.0, help="SQLite only")
+    return parser.parse_args()
+
+
+args = _parse_args()
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    _db_dir = tempfile.mkdtemp(prefix="ocl-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+import anyio.to_thread  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import main  # noqa: E402
+from auth_utils import create_access_token  # noqa: E402
+from database import SessionLocal, engine, get_async_engine  # noqa: E402
+from migrations import upgrade  # noqa: E402
+from models import Matter, MatterMessage, Notification, User  # noqa: E402
+
+MATTERS = 20
+MESSAGES_PER_MATTER = 50
+NOTIFICATIONS = 100
+
+
+def seed() -> tuple[int, int]:
+    """Create a lawyer, a client with matters, messages and notifications; returns (client_id, matter_id)."""
+    upgrade(engine)
+    db = SessionLocal()
+    try:
+        lawyer = User(name="Bench Lawyer", email="bench-lawyer@example.com", password_hash="!", role="lawyer")
+        client = User(name="Bench Client", email="bench-client@example.com", password_hash="!", role="client")
+        db.add_all([lawyer, client])
+        db.flush()
+        matters = [
+            Matter(title=f"Matter {i}", client_id=client.id, lawyer_id=lawyer.id)
+            for i in range(MATTERS)
+        ]
+        db.add_all(matters)
+        db.flush()
+        for matter in matters:
+            db.add_all(
+                MatterMessage(matter_id=matter.id, sender_id=lawyer.id, body=f"Message {i}")
+                for i in range(MESSAGES_PER_MATTER)
+            )
+        db.add_all(
+            Notification(
+                user_id=client.id,
+                type="new_message",
+                title=f"Notification {i}",
+                matter_id=matters[i % MATTERS].id,
+                is_read=i % 2 == 0,
+            )
+            for i in range(NOTIFICATIONS)
+        )
+        db.commit()
+        return client.id, matters[0].id
+    finally:
+        db.close()
+
+
+def add_query_latency(latency_ms: float):
+    """
+    Delay every statement in the thread that runs it (the request's worker
+    thread for the sync path, aiosqlite's connection thread for the async
+    path), so waiting on the database never blocks the event loop.
+    """
+    if engine.dialect.name != "sqlite":
+        raise SystemExit("--query-latency-ms only applies to SQLite; use a remote database instead")
+    delay = latency_ms / 1000
+
+    def wait(_statement):
+        time.sleep(delay)
+
+    @event.listens_for(engine, "connect")
+    def _sync_connect(dbapi_connection, _record):
+        dbapi_connection.set_trace_callback(wait)
+
+    @event.listens_for(get_async_engine().sync_engine, "connect")
+    def _async_connect(dbapi_connection, _record):
+        dbapi_connection.await_(dbapi_connection.driver_connection.set_trace_callback(wait))
+
+    engine.dispose()
+
+
+async def call(app, path: str, cookie: str) -> int:
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"bench"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+    status_code = 0
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def run_load(paths: list[str], cookie: str, concurrency: int, requests: int) -> dict:
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for index in remaining:
+            path = paths[index % len(paths)]
+            started = time.perf_counter()
+            status_code = await call(main.app, path, cookie)
+            latencies.append(time.perf_counter() - started)
+            if status_code != 200:
+                raise RuntimeError(f"GET {path} returned {status_code}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def bench():
+    client_id, matter_id = seed()
+    if args.query_latency_ms:
+        add_query_latency(args.query_latency_ms)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool_size
+    cookie = f"{main.ACCESS_COOKIE_NAME}={create_access_token({'sub': str(client_id)})}"
+    paths = [
+        "/notifications",
+        "/notifications/unread-count",
+        "/matters",
+        f"/matters/{matter_id}/messages?limit=50",
+    ]
+
+    print(
+        f"threadpool size {args.threadpool_size}, {args.requests} requests per run, "
+        f"{args.query_latency_ms:g} ms added per query"
+    )
+    print(f"{'mode':<8}{'clients':>9}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode in ("sync", "async"):
+        main.ASYNC_DATABASE_READS = mode == "async"
+        await run_load(paths, cookie, 8, 200)  # warm up pools and the identity cache
+        for concurrency in args.concurrency:
+            result = await run_load(paths, cookie, concurrency, args.requests)
+            print(
+                f"{mode:<8}{concurrency:>9}{result['rps']:>10.0f}"
+                f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+            )
+    main.notification_fanout.stop()
+    await main.dispose_async_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(bench())
@@ -0,0 +1,180 @@
+"""
+Micro-benchmark: decorator-style (BaseHTTPMiddleware) vs pure ASGI middleware.
+
+Drives a minimal FastAPI app in-process through the CSRF and security-header
+middleware in both styles and reports requests/sec for small JSON responses
+and CSRF-checked writes, plus MB/s for a streamed document body.
+
+    cd backend && python benchmarks/middleware_bench.py [--requests 3000]
+
+Uses a throwaway SQLite database; DATABASE_URL is overridden.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+_db_dir = tempfile.mkdtemp(prefix="ocl-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+
+import main  # noqa: E402
+from auth_utils import get_refresh_expiry, hash_token  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from models import Base, User, UserSession  # noqa: E402
+
+REFRESH_TOKEN = "bench-refresh-token"
+CSRF_TOKEN = "bench-csrf-token"
+STREAM_CHUNK = b"x" * 64 * 1024
+STREAM_CHUNKS = 128  # 8 MiB per streamed response
+
+
+def seed_session():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(name="Bench", email="bench@example.com", password_hash="!", role="client")
+        db.add(user)
+        db.flush()
+        db.add(
+            UserSession(
+                user_id=user.id,
+                refresh_token_hash=hash_token(REFRESH_TOKEN),
+                csrf_token_hash=hash_token(CSRF_TOKEN),
+                expires_at=get_refresh_expiry(),
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_app(style: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.post("/write")
+    def write():
+        return {"ok": True}
+
+    @app.get("/documents/1/content")
+    def stream():
+        def body():
+            for _ in range(STREAM_CHUNKS):
+                yield STREAM_CHUNK
+
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    if style == "asgi":
+        app.add_middleware(main.CSRFMiddleware)
+        app.add_middleware(main.SecurityHeadersMiddleware)
+        return app
+
+    # Decorator-based equivalents of the previous middleware.
+    @app.middleware("http")
+    async def csrf_middleware(request: Request, call_next):
+        if request.method.upper() in main.CSRF_PROTECTED_METHODS:
+            path = request.url.path.rstrip("/") or "/"
+            if path not in main.CSRF_EXEMPT_PATHS:
+                error_response = main.check_csrf_request(request)
+                if error_response is not None:
+                    return error_response
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def security_headers(request: Request, call_next):
+        response = await call_next(request)
+        main.apply_security_headers(response.headers, request.url.path)
+        return response
+
+    return app
+
+
+async def call(app, method: str, path: str) -> tuple[int, int]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"cookie", f"{main.REFRESH_COOKIE_NAME}={REFRESH_TOKEN}".encode()),
+            (main.CSRF_HEADER_NAME.encode(), CSRF_TOKEN.encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+    status_code = 0
+    body_bytes = 0
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code, body_bytes
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            body_bytes += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status_code, body_bytes
+
+
+async def run_rps(app, method: str, path: str, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        status_code, _ = await call(app, method, path)
+        if status_code != 200:
+            raise RuntimeError(f"{method} {path} returned {status_code}")
+    return requests / (time.perf_counter() - started)
+
+
+async def run_stream(app, rounds: int) -> float:
+    started = time.perf_counter()
+    total = 0
+    for _ in range(rounds):
+        _, body_bytes = await call(app, "GET", "/documents/1/content")
+        total += body_bytes
+    return total / (1024 * 1024) / (time.perf_counter() - started)
+
+
+async def bench(requests: int, stream_rounds: int):
+    seed_session()
+    print(f"{'style':<10}{'GET req/s':>12}{'POST req/s':>12}{'stream MB/s':>14}")
+    for style in ("decorator", "asgi"):
+        app = build_app(style)
+        await run_rps(app, "GET", "/ping", 100)  # warm up
+        get_rps = await run_rps(app, "GET", "/ping", requests)
+        post_rps = await run_rps(app, "POST", "/write", requests)
+        stream_mbs = await run_stream(app, stream_rounds)
+        print(f"{style:<10}{get_rps:>12.0f}{post_rps:>12.0f}{stream_mbs:>14.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--stream-rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(bench(args.requests, args.stream_rounds))
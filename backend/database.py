@@ -1,17 +1,395 @@
+import asyncio
+import itertools
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Comma-separated read replicas. Without any, read sessions use the primary.
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+# Set in Session.info of sessions from open_read_session(); they must not write.
+READ_ONLY_SESSION_KEY = "read_only"
+# Drivers behind the async read path (open_async_read_session).
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Connection budget: the most connections one process opens to one database
+# (the primary, and each replica separately). Across a deployment that is
+#     worker processes x DB_CONNECTION_BUDGET
+# plus manage.py and cron jobs (and a PostgreSQL RATE_LIMIT_DATABASE_URL on
+# the same server), which has to stay below Postgres max_connections minus
+# superuser_reserved_connections: 4 workers at the default budget of 55 need
+# 220. Lower the budget rather than raising max_connections past what the
+# server's memory allows.
+#
+# Each process has two engines per database and the budget is split between
+# them. The async engine (the async read path) gets DB_ASYNC_CONNECTIONS;
+# its sessions hold no threadpool worker, so that is simply how many async
+# reads run at once. The sync engine gets the rest: sync routes run on a
+# threadpool of THREADPOOL_SIZE workers (applied by main.py at startup), each
+# typically holding one connection, plus the background threads (audit
+# writer, notification fanout). The default budget covers all of them, so
+# requests never wait on checkout while a worker is free. Each pool keeps
+# its *_POOL_SIZE connections open and opens the rest on demand.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+BACKGROUND_CONNECTIONS = 5
+DB_ASYNC_CONNECTIONS = int(os.getenv("DB_ASYNC_CONNECTIONS", "10"))
+DB_CONNECTION_BUDGET = int(
+    os.getenv(
+        "DB_CONNECTION_BUDGET",
+        str(THREADPOOL_SIZE + BACKGROUND_CONNECTIONS + DB_ASYNC_CONNECTIONS),
+    )
+)
+DB_SYNC_CONNECTIONS = DB_CONNECTION_BUDGET - DB_ASYNC_CONNECTIONS
+if DB_ASYNC_CONNECTIONS < 1 or DB_SYNC_CONNECTIONS < 1:
+    raise ValueError(
+        f"DB_CONNECTION_BUDGET={DB_CONNECTION_BUDGET} leaves no connections for one of the "
+        f"engines with DB_ASYNC_CONNECTIONS={DB_ASYNC_CONNECTIONS}"
+    )
+DB_POOL_SIZE = min(int(os.getenv("DB_POOL_SIZE", "10")), DB_SYNC_CONNECTIONS)
+DB_MAX_OVERFLOW = DB_SYNC_CONNECTIONS - DB_POOL_SIZE
+DB_ASYNC_POOL_SIZE = min(int(os.getenv("DB_ASYNC_POOL_SIZE", "5")), DB_ASYNC_CONNECTIONS)
+DB_ASYNC_MAX_OVERFLOW = DB_ASYNC_CONNECTIONS - DB_ASYNC_POOL_SIZE
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_SLOW_CHECKOUT_MS = float(os.getenv("DB_SLOW_CHECKOUT_MS", "100"))
+
+if DB_SYNC_CONNECTIONS < THREADPOOL_SIZE:
+    print(
+        f"WARNING: {DB_SYNC_CONNECTIONS} of DB_CONNECTION_BUDGET={DB_CONNECTION_BUDGET} "
+        f"connections are left for sync routes, fewer than THREADPOOL_SIZE={THREADPOOL_SIZE}; "
+        "requests will queue for connections"
+    )
 
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    future=True
+def _create_engine(url: str, name: str):
+    return instrument_engine(
+        create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_pre_ping=True,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            future=True,
+        ),
+        name,
+        DB_SLOW_CHECKOUT_MS / 1000,
     )
 
 
+engine = _create_engine(DATABASE_URL, "primary")
+
+replica_engines = [
+    _create_engine(url, f"replica {index}") for index, url in enumerate(DATABASE_REPLICA_URLS)
+]
+
+
+class ReadOnlySession(Session):
+    pass
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_read_session_writes(session, _flush_context, _instances):
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError("Read-only session cannot write; use SessionLocal")
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(class_=ReadOnlySession, autocommit=False, autoflush=False)
+
+
+# Zero when the standby has replayed everything it received, so an idle
+# primary does not look like lag.
+POSTGRES_REPLICA_LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def measure_replica_lag(replica) -> float:
+    """Replay lag in seconds; other databases (a local stand-in) report 0."""
+    if replica.dialect.name != "postgresql":
+        return 0.0
+    with replica.connect() as conn:
+        return float(conn.exec_driver_sql(POSTGRES_REPLICA_LAG_SQL).scalar() or 0)
+
+
+async def measure_replica_lag_async(replica) -> float:
+    if replica.dialect.name != "postgresql":
+        return 0.0
+    async with replica.connect() as conn:
+        return float((await conn.exec_driver_sql(POSTGRES_REPLICA_LAG_SQL)).scalar() or 0)
+
+
+class ReplicaRouter:
+    """
+    Health and lag bookkeeping for the read replicas, shared by the sync and
+    async read paths. candidates() yields replica indexes in turn, skipping
+    any that failed within `retry_seconds`; a replica whose last sampled lag
+    exceeds `max_lag_seconds` is rejected by accept(). Lag is due for a new
+    sample every `lag_check_seconds`.
+    """
+
+    def __init__(
+        self,
+        replica_count: int,
+        *,
+        max_lag_seconds: float = 5.0,
+        lag_check_seconds: float = 5.0,
+        retry_seconds: float = 30.0,
+    ):
+        self.replica_count = replica_count
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self.retry_seconds = retry_seconds
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._health = [
+            {"down_until": 0.0, "lag": 0.0, "checked_at": float("-inf")}
+            for _ in range(replica_count)
+        ]
+        self._stats = {
+            "replica_reads": 0,
+            "primary_reads": 0,
+            "pinned_reads": 0,
+            "lagging_skips": 0,
+            "failures": 0,
+        }
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def candidates(self, prefer_primary: bool = False):
+        if prefer_primary:
+            self._count("pinned_reads")
+            return
+        if not self.replica_count:
+            return
+        start = next(self._turn)
+        for offset in range(self.replica_count):
+            index = (start + offset) % self.replica_count
+            if self._health[index]["down_until"] <= time.monotonic():
+                yield index
+
+    def lag_check_due(self, index: int) -> bool:
+        return time.monotonic() - self._health[index]["checked_at"] >= self.lag_check_seconds
+
+    def accept(self, index: int, lag: float | None = None) -> bool:
+        with self._lock:
+            health = self._health[index]
+            if lag is not None:
+                health["lag"] = lag
+                health["checked_at"] = time.monotonic()
+            if health["lag"] > self.max_lag_seconds:
+                self._stats["lagging_skips"] += 1
+                return False
+            return True
+
+    def record_read(self, index: int | None):
+        self._count("primary_reads" if index is None else "replica_reads")
+
+    def mark_down(self, index: int, error):
+        with self._lock:
+            self._health[index]["down_until"] = time.monotonic() + self.retry_seconds
+            self._stats["failures"] += 1
+        print(
+            f"Read replica {index} unavailable, using the primary for "
+            f"{self.retry_seconds:.0f}s: {error}"
+        )
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                **self._stats,
+                "replicas": [
+                    {"lag_seconds": health["lag"], "down": health["down_until"] > now}
+                    for health in self._health
+                ],
+            }
+
+
+replica_router = ReplicaRouter(
+    len(replica_engines),
+    max_lag_seconds=REPLICA_MAX_LAG_SECONDS,
+    lag_check_seconds=REPLICA_LAG_CHECK_SECONDS,
+    retry_seconds=REPLICA_RETRY_SECONDS,
+)
+
+
+def _new_read_session(bind):
+    db = ReadSessionLocal(bind=bind)
+    db.info[READ_ONLY_SESSION_KEY] = True
+    return db
+
+
+def open_read_session(prefer_primary: bool = False):
+    """
+    Session for read-only work, bound to a healthy replica (or the primary).
+    The connection is checked out up front so a replica that is down is
+    detected here and the session falls back to the primary.
+    """
+    for index in replica_router.candidates(prefer_primary):
+        replica = replica_engines[index]
+        db = None
+        try:
+            lag = measure_replica_lag(replica) if replica_router.lag_check_due(index) else None
+            if not replica_router.accept(index, lag):
+                continue
+            db = _new_read_session(replica)
+            db.connection()
+        except DBAPIError as replica_error:
+            if db is not None:
+                db.close()
+            replica_router.mark_down(index, replica_error)
+            continue
+        replica_router.record_read(index)
+        return db
+    replica_router.record_read(None)
+    return _new_read_session(engine)
+
+
+def async_database_url(url: str):
+    """The async-driver form of a sync DATABASE_URL (psycopg2 -> asyncpg, pysqlite -> aiosqlite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    query = dict(parsed.query)
+    if backend == "postgresql" and "sslmode" in query:
+        # asyncpg takes libpq's sslmode values as `ssl`.
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend], query=query)
+
+
+_async_engines = {}
+_async_engines_lock = threading.Lock()
+
+
+def get_async_engine(url: str | None = None):
+    """
+    Async engine for `url` (default: the primary), created on first use so
+    processes that never serve the async endpoints (manage.py, workers) do
+    not need the async drivers.
+    """
+    url = url or DATABASE_URL
+    with _async_engines_lock:
+        async_engine = _async_engines.get(url)
+        if async_engine is None:
+            async_engine = create_async_engine(
+                async_database_url(url),
+                poolclass=InstrumentedAsyncQueuePool,
+                pool_pre_ping=True,
+                pool_size=DB_ASYNC_POOL_SIZE,
+                max_overflow=DB_ASYNC_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+            )
+            if url == DATABASE_URL:
+                name = "async primary"
+            elif url in DATABASE_REPLICA_URLS:
+                name = f"async replica {DATABASE_REPLICA_URLS.index(url)}"
+            else:
+                name = "async " + make_url(url).render_as_string(hide_password=True)
+            instrument_engine(async_engine.sync_engine, name, DB_SLOW_CHECKOUT_MS / 1000)
+            _async_engines[url] = async_engine
+    return async_engine
+
+
+async def dispose_async_engines():
+    with _async_engines_lock:
+        engines = list(_async_engines.values())
+        _async_engines.clear()
+    for async_engine in engines:
+        await async_engine.dispose()
+
+
+def _new_async_read_session(bind):
+    db = AsyncSession(
+        bind=bind,
+        sync_session_class=ReadOnlySession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    db.info[READ_ONLY_SESSION_KEY] = True
+    return db
+
+
+async def open_async_read_session(prefer_primary: bool = False):
+    """open_read_session() on the async drivers; same replica choice and fallback."""
+    for index in replica_router.candidates(prefer_primary):
+        replica = get_async_engine(DATABASE_REPLICA_URLS[index])
+        db = None
+        try:
+            if replica_router.lag_check_due(index):
+                lag = await measure_replica_lag_async(replica)
+            else:
+                lag = None
+            if not replica_router.accept(index, lag):
+                continue
+            db = _new_async_read_session(replica)
+            await db.connection()
+        except (DBAPIError, OSError) as replica_error:
+            if db is not None:
+                await db.close()
+            replica_router.mark_down(index, replica_error)
+            continue
+        replica_router.record_read(index)
+        return db
+    replica_router.record_read(None)
+    return _new_async_read_session(get_async_engine())
+
+
+_async_read_slots = weakref.WeakKeyDictionary()
+
+
+def _read_slots() -> asyncio.Semaphore:
+    # One per event loop; asyncio primitives are bound to the loop that first uses them.
+    loop = asyncio.get_running_loop()
+    slots = _async_read_slots.get(loop)
+    if slots is None:
+        slots = _async_read_slots[loop] = asyncio.Semaphore(DB_ASYNC_CONNECTIONS)
+    return slots
+
+
+@asynccontextmanager
+async def async_read_session(prefer_primary: bool = False):
+    """
+    An open_async_read_session() that is closed on exit. Sessions are
+    admitted first-come first-served up to the pool's capacity: the async
+    pool hands a returned connection to whichever task asks next, so under
+    load early waiters could otherwise starve.
+    """
+    async with _read_slots():
+        db = await open_async_read_session(prefer_primary)
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+def get_pool_stats() -> list[dict]:
+    with _async_engines_lock:
+        async_engines = [async_engine.sync_engine for async_engine in _async_engines.values()]
+    return [
+        each.pool.stats()
+        for each in [engine, *replica_engines, *async_engines]
+        if isinstance(each.pool, InstrumentedQueuePool)
+    ]
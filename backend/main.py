@@ -1,6 +1,11 @@
 from contextlib import asynccontextmanager
+import asyncio
 from datetime import datetime, timedelta, timezone
+import base64
+import csv
 import html
+import io
+import itertools
 from secrets import token_urlsafe
 from typing import Optional
 import hmac
@@ -8,17 +13,47 @@ import json
 import os
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
-from fastapi import FastAPI, Form, Depends, HTTPException, status, Query, Request
+from fastapi import FastAPI, Form, Depends, HTTPException, status, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import anyio.to_thread
+from starlette.datastructures import MutableHeaders
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import text, or_
-
-from database import SessionLocal, engine
+from sqlalchemy import String, and_, cast, func, literal, select, text, or_, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
+
+from audit_archive import iter_archived_events, merge_audit_rows
+from audit_log import AuditWriter, serialize_audit_event
+from cache_utils import TTLCache
+from database import (
+    READ_ONLY_SESSION_KEY,
+    THREADPOOL_SIZE,
+    SessionLocal,
+    async_read_session,
+    dispose_async_engines,
+    engine,
+    get_pool_stats,
+    open_read_session,
+    replica_engines,
+    replica_router,
+)
+from matter_activity import record_matter_activity
+from notification_counters import adjust_unread_count, get_unread_count
+from notification_stream import (
+    NotificationBroker,
+    create_notification_fanout,
+    format_sse,
+    install_publish_hooks,
+    queue_notification,
+)
+from rate_limit import create_rate_limit_backend
+from migrations import check_schema_on_startup
 from models import (
-    Base,
     AuditEvent,
     ClientInvitation,
     ContactSubmission,
@@ -43,10 +78,13 @@ from auth_utils import (
     create_csrf_token,
     create_refresh_token,
     decode_access_token,
+    get_password_hash_stats,
     get_refresh_expiry,
-    hash_password,
+    hash_password_async,
     hash_token,
-    verify_password,
+    make_unusable_password_hash,
+    password_needs_rehash,
+    verify_password_async,
 )
 
 from pydantic import BaseModel
@@ -70,7 +108,17 @@ CSRF_HEADER_NAME = "x-csrf-token"
 COOKIE_SECURE = os.getenv("COOKIE_SECURE", "true").lower() == "true"
 COOKIE_DOMAIN = os.getenv("COOKIE_DOMAIN", ".ochoalawyers.com").strip() or None
 COOKIE_SAMESITE = os.getenv("COOKIE_SAMESITE", "lax").lower()
+# After a successful write the client reads from the primary for this long,
+# so replica lag never hides its own change.
+READ_YOUR_WRITES_COOKIE_NAME = "ocl_read_primary"
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+# The highest-volume reads are async handlers; "true" runs their queries on
+# the async drivers (asyncpg/aiosqlite), "false" on a sync session in the
+# threadpool like every other route.
+ASYNC_DATABASE_READS = os.getenv("ASYNC_DATABASE_READS", "true").lower() == "true"
 DEFAULT_FRONTEND_BASE_URL = "https://ochoalawyers.com"
+AUDIT_REVIEWER_ROLES = {"lawyer", "admin"}
+AUDIT_METADATA_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_]{1,64}$")
 DEFAULT_SECURE_ACTIVITY_EMAIL_COOLDOWN_SECONDS = 15 * 60
 _secure_activity_email_sent_at: dict[tuple[int, str], float] = {}
 
@@ -86,6 +134,16 @@ ALLOWED_CONTENT_TYPES = {
     "image/webp",
 }
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+SYNC_PAGE_SIZE = 200
+SYNC_MAX_WAIT_SECONDS = 25
+# Ids and change numbers are taken before commit, so a row can become visible
+# after a higher one. /sync cursors only move past rows at least this old;
+# keep it above twice the longest write transaction plus server clock skew.
+SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", "5"))
+SYNC_STREAMS = ("messages", "events", "notes", "documents", "notifications")
+
 RATE_LIMIT_WINDOW_SECONDS = 60
 RATE_LIMITS = {
     "auth_login": (10, RATE_LIMIT_WINDOW_SECONDS),
@@ -94,7 +152,83 @@ RATE_LIMITS = {
     "upload_presign": (30, RATE_LIMIT_WINDOW_SECONDS),
     "invite": (20, RATE_LIMIT_WINDOW_SECONDS),
 }
-rate_limit_store: dict[str, list[float]] = {}
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower()
+rate_limit_backend = create_rate_limit_backend(
+    RATE_LIMIT_BACKEND,
+    idle_seconds=max(window for _limit, window in RATE_LIMITS.values()),
+    default_engine=engine,
+    database_url=os.getenv("RATE_LIMIT_DATABASE_URL") or None,
+)
+IDENTITY_CACHE_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "30"))
+IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "5000"))
+# (user id, access token hash) -> column snapshot of the authenticated user
+identity_cache = TTLCache(IDENTITY_CACHE_MAX_ENTRIES, IDENTITY_CACHE_TTL_SECONDS)
+MATTER_ACCESS_CACHE_TTL_SECONDS = int(os.getenv("MATTER_ACCESS_CACHE_TTL_SECONDS", "60"))
+MATTER_ACCESS_CACHE_MAX_ENTRIES = int(os.getenv("MATTER_ACCESS_CACHE_MAX_ENTRIES", "5000"))
+# user id -> frozenset of matter ids the user is lawyer or client on
+matter_access_cache = TTLCache(MATTER_ACCESS_CACHE_MAX_ENTRIES, MATTER_ACCESS_CACHE_TTL_SECONDS)
+# document id -> matter id (documents never move between matters)
+document_matter_cache = TTLCache(MATTER_ACCESS_CACHE_MAX_ENTRIES * 4, MATTER_ACCESS_CACHE_TTL_SECONDS * 10)
+CSRF_SESSION_CACHE_TTL_SECONDS = int(os.getenv("CSRF_SESSION_CACHE_TTL_SECONDS", "60"))
+CSRF_SESSION_CACHE_MAX_ENTRIES = int(os.getenv("CSRF_SESSION_CACHE_MAX_ENTRIES", "5000"))
+# refresh token hash -> CSRF fields of the matching user_sessions row
+csrf_session_cache = TTLCache(CSRF_SESSION_CACHE_MAX_ENTRIES, CSRF_SESSION_CACHE_TTL_SECONDS)
+# "sync" writes audit rows in the request transaction; "batched" hands them to
+# a background writer when the request commits (a crash can lose up to one
+# flush interval of events).
+AUDIT_WRITE_MODE = os.getenv("AUDIT_WRITE_MODE", "sync").strip().lower()
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "audit-archive")
+audit_writer = (
+    AuditWriter(
+        SessionLocal,
+        batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "200")),
+        flush_interval_seconds=float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0")),
+        max_queue_size=int(os.getenv("AUDIT_MAX_QUEUE_SIZE", "10000")),
+    )
+    if AUDIT_WRITE_MODE == "batched"
+    else None
+)
+if audit_writer is not None:
+    # Every session class, so replica and async-path sessions are covered too.
+    audit_writer.install_session_hooks(Session)
+# Writes the audit rows of read-only sessions to the primary. Those sessions
+# may be running on the event loop (AsyncSession.run_sync), where a
+# synchronous write would stall every other request.
+audit_primary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="audit-primary")
+# Unread notifications of these types are merged into one row per
+# (recipient, matter, type) instead of one row per action.
+NOTIFICATION_CHANGE_SEQUENCE = "notification_change_seq"
+NOTIFICATION_COALESCE_TYPES = {
+    item.strip()
+    for item in os.getenv("NOTIFICATION_COALESCE_TYPES", "new_message,shared_update_added").split(",")
+    if item.strip()
+}
+NOTIFICATION_FANOUT_BACKEND = os.getenv("NOTIFICATION_FANOUT_BACKEND", "local").strip().lower()
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", "25"))
+NOTIFICATION_STREAM_REPLAY_LIMIT = 50
+notification_broker = NotificationBroker(
+    max_queue_size=int(os.getenv("NOTIFICATION_STREAM_QUEUE_SIZE", "100")),
+    max_subscribers_per_user=int(os.getenv("NOTIFICATION_STREAM_MAX_PER_USER", "5")),
+)
+notification_fanout = create_notification_fanout(
+    NOTIFICATION_FANOUT_BACKEND,
+    notification_broker,
+    engine,
+)
+install_publish_hooks(
+    SessionLocal,
+    notification_fanout,
+    lambda notification: serialize_notification(notification),
+)
+# "check" warns about pending migrations, "strict" refuses to start and
+# "upgrade" applies them (see migrations.py). A local SQLite database is
+# upgraded by default so a fresh development checkout boots.
+SCHEMA_STARTUP_MODE = os.getenv(
+    "SCHEMA_STARTUP_MODE",
+    "upgrade" if engine.dialect.name == "sqlite" else "check",
+).strip().lower()
+# Sent as X-Internal-Metrics-Token to read /internal/metrics; unset disables it.
+INTERNAL_METRICS_TOKEN = os.getenv("INTERNAL_METRICS_TOKEN")
 EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 AWS_REGION = os.getenv("AWS_REGION", "us-east-2")
@@ -114,14 +248,50 @@ s3_client = boto3.client(
 if not S3_BUCKET_NAME:
     print("WARNING: S3_BUCKET_NAME is not set. Document uploads will fail.")
 
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    try:
+        assert_csrf_session_active(request, db)
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Session for handlers that only read. Uses a read replica when one is
+    configured and healthy, except for a client that wrote within the last
+    READ_YOUR_WRITES_SECONDS.
+    """
+    db = open_read_session(prefer_primary=READ_YOUR_WRITES_COOKIE_NAME in request.cookies)
     try:
         yield db
     finally:
         db.close()
 
 
+def run_sync_read(load, args, prefer_primary: bool):
+    db = open_read_session(prefer_primary=prefer_primary)
+    try:
+        return load(db, *args)
+    finally:
+        db.close()
+
+
+async def run_read(request: Request, load, *args, primary: bool = False):
+    """
+    Run `load(session, *args)` for an async handler on a read session chosen
+    like get_read_db(). With ASYNC_DATABASE_READS the session is an
+    AsyncSession and `load` runs through run_sync(), so waiting on the
+    database holds no threadpool worker; otherwise it runs in the threadpool.
+    """
+    prefer_primary = primary or READ_YOUR_WRITES_COOKIE_NAME in request.cookies
+    if not ASYNC_DATABASE_READS:
+        return await run_in_threadpool(run_sync_read, load, args, prefer_primary)
+    async with async_read_session(prefer_primary) as db:
+        return await db.run_sync(load, *args)
+
+
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -135,6 +305,159 @@ def datetime_is_past(value: datetime | None) -> bool:
     return value < now
 
 
+def encode_cursor(created_at: datetime | None, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_condition(
+    created_at_column,
+    id_column,
+    cursor: str,
+    dialect_name: str,
+    older: bool = True,
+):
+    """
+    Rows strictly before (older=True) or after a (created_at, id) cursor.
+    SQLite stores CURRENT_TIMESTAMP defaults without fractional seconds and
+    compares datetimes as text, so the cursor is bound in the stored format.
+    """
+    cursor_created_at, cursor_id = decode_cursor(cursor)
+    bound_created_at = cursor_created_at
+    if dialect_name == "sqlite" and cursor_created_at is not None:
+        timestamp_format = "%Y-%m-%d %H:%M:%S"
+        if cursor_created_at.microsecond:
+            timestamp_format += ".%f"
+        bound_created_at = literal(cursor_created_at.strftime(timestamp_format), String)
+
+    if older:
+        return or_(
+            created_at_column < bound_created_at,
+            and_(created_at_column == bound_created_at, id_column < cursor_id),
+        )
+    return or_(
+        created_at_column > bound_created_at,
+        and_(created_at_column == bound_created_at, id_column > cursor_id),
+    )
+
+
+class PageParams:
+    """
+    Query parameters shared by the paginated list endpoints.
+
+    Without limit, before or after the full list is returned, as before
+    pagination existed. Otherwise pages start at the newest rows (limit
+    defaults to DEFAULT_PAGE_SIZE). `before` walks towards older rows and
+    `after` towards newer ones; X-Next-Cursor continues in the requested
+    direction (before when neither is given) and X-Prev-Cursor goes the other
+    way.
+    """
+
+    def __init__(
+        self,
+        limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        before: str | None = None,
+        after: str | None = None,
+    ):
+        if before and after:
+            raise HTTPException(status_code=400, detail="Use either before or after, not both")
+        self.paginated = limit is not None or bool(before or after)
+        self.limit = limit or DEFAULT_PAGE_SIZE
+        self.before = before
+        self.after = after
+
+
+async def async_page_params(
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    before: str | None = None,
+    after: str | None = None,
+) -> PageParams:
+    """PageParams for async handlers; FastAPI runs class dependencies in the threadpool."""
+    return PageParams(limit, before, after)
+
+
+def page_query(
+    query,
+    page: PageParams,
+    created_at_column,
+    id_column,
+    dialect_name: str,
+    oldest_first: bool = False,
+):
+    """
+    `query` ordered and limited the way paginate_query() runs it for `page`.
+    A page requested with `after` comes back oldest first.
+    """
+    newest_first = (created_at_column.desc(), id_column.desc())
+    oldest_first_order = (created_at_column.asc(), id_column.asc())
+    if not page.paginated:
+        return query.order_by(*(oldest_first_order if oldest_first else newest_first))
+    if page.after:
+        query = query.filter(
+            keyset_condition(created_at_column, id_column, page.after, dialect_name, older=False)
+        )
+        return query.order_by(*oldest_first_order).limit(page.limit)
+    if page.before:
+        query = query.filter(
+            keyset_condition(created_at_column, id_column, page.before, dialect_name)
+        )
+    return query.order_by(*newest_first).limit(page.limit)
+
+
+def paginate_query(
+    query,
+    response: Response,
+    page: PageParams,
+    created_at_column,
+    id_column,
+    dialect_name: str,
+    oldest_first: bool = False,
+    sort_value=None,
+) -> list:
+    """
+    Apply keyset pagination over (created_at_column, id_column) and set the
+    cursor headers. Rows come back in the endpoint's usual order.
+    `created_at_column` may be an expression; `sort_value(row)` then returns
+    its value for the cursor.
+    """
+    rows = page_query(
+        query, page, created_at_column, id_column, dialect_name, oldest_first
+    ).all()
+    if not page.paginated:
+        return rows
+    if sort_value is None:
+        sort_value = lambda row: getattr(row, created_at_column.key)
+
+    if page.after:
+        newest_row, oldest_row = (rows[-1], rows[0]) if rows else (None, None)
+        next_param_row, prev_param_row = newest_row, oldest_row
+    else:
+        newest_row, oldest_row = (rows[0], rows[-1]) if rows else (None, None)
+        next_param_row, prev_param_row = oldest_row, newest_row
+
+    def row_cursor(row):
+        return encode_cursor(sort_value(row), getattr(row, id_column.key))
+
+    if rows:
+        if len(rows) == page.limit:
+            response.headers["X-Next-Cursor"] = row_cursor(next_param_row)
+        response.headers["X-Prev-Cursor"] = row_cursor(prev_param_row)
+
+    in_oldest_first_order = bool(page.after)
+    if in_oldest_first_order != oldest_first:
+        rows.reverse()
+    return rows
+
+
 def set_auth_cookies(response, access_token: str, refresh_token: str, csrf_token: str):
     cookie_common = {
         "secure": COOKIE_SECURE,
@@ -208,6 +531,17 @@ def user_payload(user: User) -> dict:
     }
 
 
+def write_audit_event_on_primary(row: dict):
+    primary_db = SessionLocal()
+    try:
+        primary_db.add(AuditEvent(**row))
+        primary_db.commit()
+    except Exception as write_error:
+        print(f"WARNING: could not record {row['event_type']} audit event: {write_error}")
+    finally:
+        primary_db.close()
+
+
 def log_audit_event(
     db: Session,
     event_type: str,
@@ -217,15 +551,29 @@ def log_audit_event(
     request: Request | None = None,
     metadata: dict | None = None,
 ):
-    event = AuditEvent(
-        user_id=user_id,
-        event_type=event_type,
-        resource_type=resource_type,
-        resource_id=str(resource_id) if resource_id is not None else None,
-        ip_address=request.client.host if request and request.client else None,
-        user_agent=request.headers.get("user-agent") if request else None,
-        metadata_json=json.dumps(metadata or {}),
-    )
+    row = {
+        "user_id": user_id,
+        "event_type": event_type,
+        "resource_type": resource_type,
+        "resource_id": str(resource_id) if resource_id is not None else None,
+        "ip_address": request.client.host if request and request.client else None,
+        "user_agent": request.headers.get("user-agent") if request else None,
+        "metadata_json": json.dumps(metadata or {}),
+    }
+    if db.info.get(READ_ONLY_SESSION_KEY):
+        # Read sessions cannot write and have no write to commit with: queue
+        # the event now, or write it to the primary off the request.
+        row["created_at"] = utc_now()
+        if audit_writer is None or not audit_writer.enqueue(row):
+            audit_primary_executor.submit(write_audit_event_on_primary, row)
+        return None
+
+    if audit_writer is not None:
+        audit_writer.defer(db, {**row, "created_at": utc_now()})
+        return None
+
+    # Sync mode: write with the caller's transaction.
+    event = AuditEvent(**row)
     db.add(event)
     return event
 
@@ -241,38 +589,97 @@ def get_rate_limit_key(request: Request, bucket: str) -> str:
 def enforce_rate_limit(request: Request, bucket: str):
     limit, window = RATE_LIMITS[bucket]
     key = get_rate_limit_key(request, bucket)
-    now = time.time()
-    recent = [ts for ts in rate_limit_store.get(key, []) if now - ts < window]
-    if len(recent) >= limit:
+    try:
+        allowed = rate_limit_backend.take(key, capacity=limit, refill_per_second=limit / window)
+    except Exception as limiter_error:
+        # Fail open: a broken limiter store must not lock everyone out of login.
+        print(f"Rate limiter unavailable: {limiter_error}")
+        return
+    if not allowed:
         raise HTTPException(status_code=429, detail="Too many requests. Please try again soon.")
-    recent.append(now)
-    rate_limit_store[key] = recent
 
 
 def get_csrf_from_request(request: Request):
     return request.headers.get(CSRF_HEADER_NAME)
 
 
-def verify_csrf_token(request: Request, session: UserSession):
+def verify_csrf_token(request: Request, csrf_token_hash: str | None):
     csrf_header = get_csrf_from_request(request)
     if not csrf_header:
         raise HTTPException(status_code=403, detail="Missing CSRF token")
-    if not session.csrf_token_hash:
+    if not csrf_token_hash:
         raise HTTPException(status_code=403, detail="Missing CSRF session")
-    if not hmac.compare_digest(hash_token(csrf_header), session.csrf_token_hash):
+    if not hmac.compare_digest(hash_token(csrf_header), csrf_token_hash):
         raise HTTPException(status_code=403, detail="Invalid CSRF token")
 
 
+def get_csrf_session_record(request: Request) -> dict:
+    """
+    Return the CSRF fields of the caller's session, from the cache when possible.
+    Only a cache miss opens a database session. A cached record may belong to
+    a session revoked on another worker, so get_db() re-checks it.
+    """
+    refresh_token = request.cookies.get(REFRESH_COOKIE_NAME)
+    if not refresh_token:
+        raise HTTPException(status_code=401, detail="Missing refresh token")
+
+    refresh_token_hash = hash_token(refresh_token)
+    record = csrf_session_cache.get(refresh_token_hash)
+    if record is not None:
+        if datetime_is_past(record["expires_at"]):
+            csrf_session_cache.pop(refresh_token_hash)
+            raise HTTPException(status_code=401, detail="Session expired")
+        request.state.csrf_cached_session_id = record["session_id"]
+        return record
+
+    db = SessionLocal()
+    try:
+        session = get_session_from_refresh_cookie(request, db)
+        record = {
+            "session_id": session.id,
+            "user_id": session.user_id,
+            "csrf_token_hash": session.csrf_token_hash,
+            "expires_at": session.expires_at,
+        }
+    finally:
+        db.close()
+    csrf_session_cache.set(refresh_token_hash, record)
+    return record
+
+
+def invalidate_csrf_session(refresh_token: str | None):
+    if refresh_token:
+        csrf_session_cache.pop(hash_token(refresh_token))
+
+
+def assert_csrf_session_active(request: Request, db: Session):
+    """
+    Reject a write whose CSRF check passed on a cached session record when
+    the session has since been revoked (logout or password reset, possibly
+    on another worker). Runs on the route's own connection, so the cache
+    still saves the extra pool checkout.
+    """
+    session_id = getattr(request.state, "csrf_cached_session_id", None)
+    if session_id is None:
+        return
+    revoked = db.execute(
+        select(UserSession.revoked_at).where(UserSession.id == session_id)
+    ).first()
+    if revoked is None or revoked.revoked_at is not None:
+        invalidate_csrf_session(request.cookies.get(REFRESH_COOKIE_NAME))
+        raise HTTPException(status_code=401, detail="Session revoked")
+
+
+def refresh_session_query(db: Session, refresh_token_hash: str):
+    return db.query(UserSession).filter(UserSession.refresh_token_hash == refresh_token_hash)
+
+
 def get_session_from_refresh_cookie(request: Request, db: Session) -> UserSession:
     refresh_token = request.cookies.get(REFRESH_COOKIE_NAME)
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Missing refresh token")
 
-    session = (
-        db.query(UserSession)
-        .filter(UserSession.refresh_token_hash == hash_token(refresh_token))
-        .first()
-    )
+    session = refresh_session_query(db, hash_token(refresh_token)).first()
     if not session:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
     if session.revoked_at is not None:
@@ -302,8 +709,17 @@ def validate_document_file(file_name: str, content_type: str | None, file_size:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+    # The database pools are sized against this (see database.py).
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    check_schema_on_startup(engine, SCHEMA_STARTUP_MODE)
+    if audit_writer is not None:
+        audit_writer.start()
+    notification_fanout.start()
     yield
+    notification_fanout.stop()
+    if audit_writer is not None:
+        audit_writer.stop()
+    await dispose_async_engines()
     
 app = FastAPI(title="Ochoa Lawyers", version="1.0.0", lifespan=lifespan,)
 
@@ -313,6 +729,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "ETag"],
     )
 
 
@@ -328,47 +745,133 @@ CSRF_EXEMPT_PATHS = {
 }
 
 
-@app.middleware("http")
-async def csrf_middleware(request: Request, call_next):
-    if request.method.upper() in {"POST", "PUT", "PATCH", "DELETE"}:
-        path = request.url.path.rstrip("/") or "/"
-        if path not in CSRF_EXEMPT_PATHS:
-            db = SessionLocal()
-            try:
-                session = get_session_from_refresh_cookie(request, db)
-                verify_csrf_token(request, session)
-            except HTTPException as exc:
-                log_audit_event(
-                    db,
-                    "csrf_failure",
-                    request=request,
-                    metadata={"path": request.url.path, "status_code": exc.status_code},
-                )
-                db.commit()
-                return JSONResponse(
-                    status_code=exc.status_code,
-                    content={"detail": exc.detail},
-                )
-            finally:
-                db.close()
+CSRF_PROTECTED_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
 
-    return await call_next(request)
 
+def check_csrf_request(request: Request) -> JSONResponse | None:
+    """Return an error response when an unsafe request fails CSRF verification."""
+    try:
+        record = get_csrf_session_record(request)
+        verify_csrf_token(request, record["csrf_token_hash"])
+    except HTTPException as exc:
+        db = SessionLocal()
+        try:
+            log_audit_event(
+                db,
+                "csrf_failure",
+                request=request,
+                metadata={"path": request.url.path, "status_code": exc.status_code},
+            )
+            db.commit()
+        finally:
+            db.close()
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail},
+        )
+    return None
+
+
+class CSRFMiddleware:
+    """
+    Pure ASGI CSRF check. Unlike @app.middleware("http") it does not wrap
+    the response body, so streamed documents pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"].upper() in CSRF_PROTECTED_METHODS:
+            request = Request(scope)
+            path = request.url.path.rstrip("/") or "/"
+            if path not in CSRF_EXEMPT_PATHS:
+                # A cache miss queries user_sessions, so keep it off the event loop.
+                error_response = await run_in_threadpool(check_csrf_request, request)
+                if error_response is not None:
+                    await error_response(scope, receive, send)
+                    return
+
+        await self.app(scope, receive, send)
 
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    if request.url.path.startswith("/documents/") and request.url.path.endswith("/content"):
-        response.headers["Content-Security-Policy"] = (
+
+def apply_security_headers(headers: MutableHeaders, path: str):
+    headers["X-Content-Type-Options"] = "nosniff"
+    headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+    if path.startswith("/documents/") and path.endswith("/content"):
+        headers["Content-Security-Policy"] = (
             "frame-ancestors 'self' https://ochoalawyers.com https://www.ochoalawyers.com"
         )
     else:
-        response.headers["X-Frame-Options"] = "DENY"
+        headers["X-Frame-Options"] = "DENY"
     if COOKIE_SECURE:
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    return response
+        headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+
+
+class SecurityHeadersMiddleware:
+    """Pure ASGI middleware that adds security headers to the response start message."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = Request(scope).url.path
+
+        async def send_with_security_headers(message):
+            if message["type"] == "http.response.start":
+                apply_security_headers(MutableHeaders(scope=message), path)
+            await send(message)
+
+        await self.app(scope, receive, send_with_security_headers)
+
+
+def read_your_writes_cookie_header() -> str:
+    cookie_response = Response()
+    cookie_response.set_cookie(
+        key=READ_YOUR_WRITES_COOKIE_NAME,
+        value="1",
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        secure=COOKIE_SECURE,
+        samesite=COOKIE_SAMESITE,
+        domain=COOKIE_DOMAIN,
+        path="/",
+    )
+    return cookie_response.headers["set-cookie"]
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware that marks clients after a successful unsafe
+    request, so get_read_db() sends their next reads to the primary.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie_header = read_your_writes_cookie_header()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"].upper() not in CSRF_PROTECTED_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("set-cookie", self.cookie_header)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+if replica_engines:
+    app.add_middleware(ReadYourWritesMiddleware)
+# The last middleware added runs outermost, so CSRF failures also get security headers.
+app.add_middleware(CSRFMiddleware)
+app.add_middleware(SecurityHeadersMiddleware)
 
 @app.get("/")
 def root():
@@ -389,6 +892,36 @@ def test_db(db: Session = Depends(get_db)):
             detail=f"DB error: {str(e)}",
         )
 
+
+def get_threadpool_stats() -> dict:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {
+        "size": int(limiter.total_tokens),
+        "busy": limiter.borrowed_tokens,
+        "waiting": limiter.statistics().tasks_waiting,
+    }
+
+
+@app.get("/internal/metrics")
+async def internal_metrics(request: Request):
+    """
+    Operational counters for this worker process. Async so it still answers
+    when every threadpool worker is busy or waiting on the database pool.
+    """
+    token = request.headers.get("X-Internal-Metrics-Token", "")
+    if not INTERNAL_METRICS_TOKEN or not hmac.compare_digest(token.encode(), INTERNAL_METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {
+        "database_pools": get_pool_stats(),
+        "read_replicas": replica_router.stats(),
+        "threadpool": get_threadpool_stats(),
+        "identity_cache": get_identity_cache_stats(),
+        "matter_access_cache": get_matter_access_cache_stats(),
+        "password_hash": get_password_hash_stats(),
+        "audit_writer": audit_writer.stats() if audit_writer is not None else None,
+        "notification_streams": notification_broker.stats(),
+    }
+
 @app.post("/contact")
 def contact(
     request: Request,
@@ -458,19 +991,30 @@ def contact(
 
 # signup
 @app.post("/signup", status_code=status.HTTP_201_CREATED)
-def signup(
+async def signup(
     name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    if db.query(User).filter(User.email == email.strip().lower()).first():
+    await run_in_threadpool(ensure_email_available, db, email)
+    password_hash = await hash_password_async(password)
+    return await run_in_threadpool(create_signup_user, db, name, email, password_hash)
+
+
+def ensure_email_available(db: Session, email: str):
+    exists = db.query(User.id).filter(User.email == email.strip().lower()).first()
+    # Release the connection while the password hashes.
+    db.rollback()
+    if exists:
         raise HTTPException(status_code=400, detail="Email already exists")
 
+
+def create_signup_user(db: Session, name: str, email: str, password_hash: str):
     user = User(
         name=name.strip(),
         email=email.strip().lower(),
-        password_hash=hash_password(password),
+        password_hash=password_hash,
     )
     db.add(user)
     db.commit()
@@ -483,20 +1027,52 @@ class LoginRequest(BaseModel):
     password: str
 
 
-def issue_login_response(email: str, password: str, request: Request, db: Session):
+async def issue_login_response(email: str, password: str, request: Request, db: Session):
+    """
+    Check the password on the event loop and do the database work in the
+    threadpool, so no threadpool thread or connection waits on the hash.
+    """
+    email = email.strip().lower()
+    credentials = await run_in_threadpool(load_login_credentials, db, request, email)
+
+    if not credentials or not await verify_password_async(password, credentials.password_hash):
+        await run_in_threadpool(record_login_failure, db, request, email)
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    new_password_hash = None
+    if password_needs_rehash(credentials.password_hash):
+        try:
+            new_password_hash = await hash_password_async(password)
+        except HTTPException:
+            # Hashing is saturated; keep the old hash and upgrade on a later login.
+            pass
+
+    return await run_in_threadpool(
+        complete_login, db, request, credentials.id, new_password_hash
+    )
+
+
+def load_login_credentials(db: Session, request: Request, email: str):
     enforce_rate_limit(request, "auth_login")
+    credentials = db.execute(
+        select(User.id, User.password_hash).where(User.email == email)
+    ).first()
+    # Release the connection while the password hashes.
+    db.rollback()
+    return credentials
 
-    user = db.query(User).filter(User.email == email.strip().lower()).first()
 
-    if not user or not verify_password(password, user.password_hash):
-        log_audit_event(
-            db,
-            "login_failure",
-            request=request,
-            metadata={"email": email.strip().lower()},
-        )
-        db.commit()
+def record_login_failure(db: Session, request: Request, email: str):
+    log_audit_event(db, "login_failure", request=request, metadata={"email": email})
+    db.commit()
+
+
+def complete_login(db: Session, request: Request, user_id: int, new_password_hash: str | None):
+    user = db.get(User, user_id)
+    if user is None:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_password_hash is not None:
+        user.password_hash = new_password_hash
 
     access_token = build_access_token_for_user(user)
     refresh_token, csrf_token, _session = create_session_for_user(user, request, db)
@@ -515,28 +1091,26 @@ def issue_login_response(email: str, password: str, request: Request, db: Sessio
 
 
 @app.post("/auth/login")
-def auth_login(
+async def auth_login(
     body: LoginRequest,
     request: Request,
     db: Session = Depends(get_db),
 ):
-    return issue_login_response(body.email, body.password, request, db)
+    return await issue_login_response(body.email, body.password, request, db)
 
 
 @app.post("/login")
-def login_alias(
+async def login_alias(
     request: Request,
     email: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db),
 ):
-    return issue_login_response(email, password, request, db)
+    return await issue_login_response(email, password, request, db)
 
 
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db)
-):
+def read_access_token(request: Request) -> tuple[int, tuple]:
+    """The user id and identity cache key of the request's access token."""
     token = request.cookies.get(ACCESS_COOKIE_NAME)
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -548,12 +1122,77 @@ def get_current_user(
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token payload")
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
+
+    return int(user_id), (int(user_id), hash_token(token))
+
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    user_id, cache_key = read_access_token(request)
+    snapshot = identity_cache.get(cache_key)
+    if snapshot is not None:
+        # Transient copy: callers only read columns, and it must never be
+        # shared between requests or attached to their sessions.
+        return User(**snapshot)
+
+    user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    identity_cache.set(cache_key, identity_snapshot(user))
     return user
 
+
+def load_identity_snapshot(db: Session, user_id: int) -> dict | None:
+    user = db.get(User, user_id)
+    return identity_snapshot(user) if user else None
+
+
+async def get_current_user_async(request: Request):
+    """
+    get_current_user() for async handlers. A cache hit touches no database;
+    a miss loads the user from the primary through run_read().
+    """
+    user_id, cache_key = read_access_token(request)
+    snapshot = identity_cache.get(cache_key)
+    if snapshot is None:
+        snapshot = await run_read(request, load_identity_snapshot, user_id, primary=True)
+        if snapshot is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        identity_cache.set(cache_key, snapshot)
+    return User(**snapshot)
+
+
+def identity_snapshot(user: User) -> dict:
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "role": user.role,
+        "created_at": user.created_at,
+    }
+
+
+def invalidate_cached_identity(user_id: int | None = None, access_token: str | None = None):
+    """
+    Drop cached identities after password resets, role changes or logout.
+    Without an access token every cached token for `user_id` is dropped.
+    """
+    if access_token:
+        if user_id is not None:
+            identity_cache.pop((int(user_id), hash_token(access_token)))
+        else:
+            token_hash = hash_token(access_token)
+            identity_cache.discard_where(lambda key: key[1] == token_hash)
+        return
+    if user_id is not None:
+        identity_cache.discard_where(lambda key: key[0] == int(user_id))
+
+
+def get_identity_cache_stats() -> dict:
+    return identity_cache.stats()
+
 def raise_access_denied(
     db: Session,
     user: User,
@@ -573,20 +1212,69 @@ def raise_access_denied(
     raise HTTPException(status_code=404, detail=f"{resource_type.title()} not found")
 
 
+def load_accessible_matter_ids(db: Session, user: User) -> frozenset:
+    if user.role not in ("lawyer", "client"):
+        return frozenset()
+    matter_ids = frozenset(db.execute(accessible_matter_ids_query(user)).scalars())
+    matter_access_cache.set(user.id, matter_ids)
+    return matter_ids
+
+
+def user_can_access_matter(db: Session, user: User, matter_id: int) -> bool:
+    """
+    Answered from the per-user matter id cache when the matter is in it.
+    Matters never change lawyer or client, so a cached hit stays valid; a
+    miss reloads the ids once in case the matter was created since (possibly
+    by another worker).
+    """
+    matter_ids = matter_access_cache.get(user.id)
+    if matter_ids is not None and matter_id in matter_ids:
+        return True
+    return matter_id in load_accessible_matter_ids(db, user)
+
+
+def invalidate_matter_access(*user_ids: int):
+    for user_id in user_ids:
+        if user_id is not None:
+            matter_access_cache.pop(user_id)
+
+
+def get_matter_access_cache_stats() -> dict:
+    return {
+        "matters": matter_access_cache.stats(),
+        "documents": document_matter_cache.stats(),
+    }
+
+
+def deny_matter_access(db: Session, user: User, matter_id: int, request: Request | None):
+    if db.get(Matter, matter_id) is None:
+        raise HTTPException(status_code=404, detail="Matter not found")
+    raise_access_denied(db, user, request, "matter", matter_id)
+
+
+def assert_matter_access(
+    db: Session,
+    user: User,
+    matter_id: int,
+    request: Request | None = None,
+):
+    """Access check for handlers that only need the matter id; no query on a cache hit."""
+    if not user_can_access_matter(db, user, matter_id):
+        deny_matter_access(db, user, matter_id, request)
+
+
 def get_accessible_matter(
     db: Session,
     user: User,
     matter_id: int,
     request: Request | None = None,
 ):
-    matter = db.query(Matter).filter(Matter.id == matter_id).first()
+    if not user_can_access_matter(db, user, matter_id):
+        deny_matter_access(db, user, matter_id, request)
+    matter = db.get(Matter, matter_id)
     if not matter:
         raise HTTPException(status_code=404, detail="Matter not found")
-    if user.role == "lawyer" and matter.lawyer_id == user.id:
-        return matter
-    if user.role == "client" and matter.client_id == user.id:
-        return matter
-    raise_access_denied(db, user, request, "matter", matter_id)
+    return matter
 
 
 def get_accessible_document(
@@ -595,11 +1283,23 @@ def get_accessible_document(
     document_id: int,
     request: Request | None = None,
 ):
-    doc = db.query(Document).filter(Document.id == document_id).first()
+    """The document and its matter, loaded with one joined query."""
+    cached_matter_id = document_matter_cache.get(document_id)
+    if cached_matter_id is not None and not user_can_access_matter(db, user, cached_matter_id):
+        deny_matter_access(db, user, cached_matter_id, request)
+
+    doc = (
+        db.query(Document)
+        .options(joinedload(Document.matter))
+        .filter(Document.id == document_id)
+        .first()
+    )
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    matter = get_accessible_matter(db, user, doc.matter_id, request=request)
-    return doc, matter
+    document_matter_cache.set(doc.id, doc.matter_id)
+    if cached_matter_id is None and not user_can_access_matter(db, user, doc.matter_id):
+        deny_matter_access(db, user, doc.matter_id, request)
+    return doc, doc.matter
 
 
 # S3 authorization helper
@@ -614,6 +1314,44 @@ def assert_can_access_internal_notes(user: User, matter: Matter):
         raise HTTPException(status_code=403, detail="Internal notes are only visible to lawyers")
 
 
+def matter_etag(request: Request, user: User, matter: Matter) -> str:
+    """
+    Weak ETag for a matter resource. It changes with the matter version and
+    also depends on the path, query string and role, since those decide
+    which rows the response contains.
+    """
+    variant = hash_token(f"{request.url.path}?{request.url.query}|{user.role}")[:12]
+    return f'W/"m{matter.id}-v{matter.version}-{variant}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    weak_value = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == weak_value for tag in if_none_match.split(","))
+
+
+def conditional_matter_response(
+    request: Request,
+    response: Response,
+    user: User,
+    matter: Matter,
+) -> Response | None:
+    """
+    Return a 304 when the client already has this version, otherwise set the
+    ETag on `response` and return None so the handler builds the body.
+    """
+    etag = matter_etag(request, user, matter)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
 def serialize_note(note: MatterNote):
     return {
         "id": note.id,
@@ -640,6 +1378,12 @@ def create_matter_event(
         message=message,
     )
     db.add(event)
+    db.execute(
+        update(Matter)
+        .where(Matter.id == matter_id)
+        .values(version=Matter.version + 1)
+        .execution_options(synchronize_session=False)
+    )
     return event
 
 
@@ -655,6 +1399,35 @@ def serialize_event(event: MatterEvent):
     }
 
 
+def serialize_matter_summary(matter: Matter):
+    return {
+        "id": matter.id,
+        "title": matter.title,
+        "status": matter.status,
+        "description": matter.description,
+        "client_id": matter.client_id,
+        "lawyer_id": matter.lawyer_id,
+        "client_name": matter.client.name if matter.client else None,
+        "lawyer_name": matter.lawyer.name if matter.lawyer else None,
+        "created_at": matter.created_at.isoformat() if matter.created_at else None,
+        "last_activity_at": matter.last_activity_at.isoformat() if matter.last_activity_at else None,
+        "last_message_at": matter.last_message_at.isoformat() if matter.last_message_at else None,
+        "message_count": matter.message_count,
+        "document_count": matter.document_count,
+    }
+
+
+def serialize_document(doc: Document):
+    return {
+        "id": doc.id,
+        "filename": doc.filename,
+        "s3_key": doc.s3_key,
+        "matter_id": doc.matter_id,
+        "uploaded_by_id": doc.uploaded_by_id,
+        "created_at": doc.created_at.isoformat() if doc.created_at else None,
+    }
+
+
 def serialize_matter_message(message: MatterMessage):
     return {
         "id": message.id,
@@ -678,7 +1451,12 @@ def serialize_notification(notification: Notification):
         "document_id": notification.document_id,
         "message_id": notification.message_id,
         "is_read": notification.is_read,
+        "occurrence_count": notification.occurrence_count or 1,
+        "change_seq": notification.change_seq,
         "created_at": notification.created_at.isoformat() if notification.created_at else None,
+        "last_occurred_at": (
+            notification.last_occurred_at.isoformat() if notification.last_occurred_at else None
+        ),
         "read_at": notification.read_at.isoformat() if notification.read_at else None,
     }
 
@@ -709,6 +1487,13 @@ def create_notification(
     document_id: int | None = None,
     message_id: int | None = None,
 ):
+    coalesce_key = None
+    if type in NOTIFICATION_COALESCE_TYPES and matter_id is not None:
+        coalesce_key = f"{user_id}:{matter_id}:{type}"
+        existing = find_coalesced_notification(db, coalesce_key)
+        if existing is not None:
+            return bump_coalesced_notification(db, existing, title, body, document_id, message_id)
+
     notification = Notification(
         user_id=user_id,
         type=type,
@@ -717,8 +1502,71 @@ def create_notification(
         matter_id=matter_id,
         document_id=document_id,
         message_id=message_id,
+        coalesce_key=coalesce_key,
+        change_seq=next_notification_change_seq(db),
     )
-    db.add(notification)
+    if coalesce_key is None:
+        db.add(notification)
+    else:
+        try:
+            with db.begin_nested():
+                db.add(notification)
+        except IntegrityError:
+            # A concurrent request created the unread row first.
+            existing = find_coalesced_notification(db, coalesce_key)
+            if existing is None:
+                raise
+            return bump_coalesced_notification(db, existing, title, body, document_id, message_id)
+    adjust_unread_count(db, user_id, 1)
+    queue_notification(db, notification)
+    return notification
+
+
+def next_notification_change_seq(db: Session) -> int:
+    """
+    Number the next notification insert or bump. PostgreSQL takes it from a
+    sequence; SQLite runs one write transaction at a time, so it counts on
+    from the largest value written so far.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return db.execute(select(func.nextval(NOTIFICATION_CHANGE_SEQUENCE))).scalar_one()
+    db.flush()  # include notifications added earlier in this transaction
+    return db.execute(
+        select(func.coalesce(func.max(Notification.change_seq), 0) + 1)
+    ).scalar_one()
+
+
+def coalesced_notification_query(db: Session, coalesce_key: str):
+    return (
+        db.query(Notification)
+        .filter(Notification.coalesce_key == coalesce_key)
+        .with_for_update()
+        .populate_existing()
+    )
+
+
+def find_coalesced_notification(db: Session, coalesce_key: str) -> Notification | None:
+    db.flush()
+    return coalesced_notification_query(db, coalesce_key).first()
+
+
+def bump_coalesced_notification(
+    db: Session,
+    notification: Notification,
+    title: str,
+    body: str | None,
+    document_id: int | None,
+    message_id: int | None,
+) -> Notification:
+    """Point the unread row at the latest item; the unread counter is unchanged."""
+    notification.change_seq = next_notification_change_seq(db)
+    notification.occurrence_count = Notification.occurrence_count + 1
+    notification.title = title
+    notification.body = body
+    notification.document_id = document_id
+    notification.message_id = message_id
+    notification.last_occurred_at = func.now()
+    queue_notification(db, notification)
     return notification
 
 
@@ -939,13 +1787,16 @@ def get_authorized_document_for_user(document_id: int, user: User, db: Session):
     return get_accessible_document(db, user, document_id)
 
 
-def get_valid_document_access_token(token: str, db: Session):
-    access = (
+def document_access_token_query(db: Session, token: str):
+    return (
         db.query(DocumentAccessToken)
         .options(joinedload(DocumentAccessToken.document))
         .filter(DocumentAccessToken.token == token)
-        .first()
     )
+
+
+def get_valid_document_access_token(token: str, db: Session):
+    access = document_access_token_query(db, token).first()
     if not access:
         raise HTTPException(status_code=404, detail="Document access token not found")
 
@@ -963,35 +1814,388 @@ def auth_me(user: User = Depends(get_current_user)):
     return user_payload(user)
 
 
-@app.get("/notifications")
-def list_notifications(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    notifications = (
+NOTIFICATION_LIST_LIMIT = 50
+
+
+def recent_notifications_query(db: Session, user_id: int, limit: int):
+    return (
         db.query(Notification)
-        .filter(Notification.user_id == user.id)
-        .order_by(Notification.created_at.desc())
-        .limit(50)
-        .all()
+        .filter(Notification.user_id == user_id)
+        .order_by(Notification.last_occurred_at.desc(), Notification.id.desc())
+        .limit(limit)
+    )
+
+
+def unread_by_matter_query(db: Session, user_id: int):
+    return (
+        db.query(Notification.matter_id, func.count(Notification.id))
+        .filter(
+            Notification.user_id == user_id,
+            Notification.is_read.is_(False),
+            Notification.matter_id.isnot(None),
+        )
+        .group_by(Notification.matter_id)
     )
+
+
+def load_notifications(db: Session, user: User):
+    notifications = recent_notifications_query(db, user.id, NOTIFICATION_LIST_LIMIT).all()
     return [serialize_notification(n) for n in notifications]
 
 
+@app.get("/notifications")
+async def list_notifications(
+    request: Request,
+    user: User = Depends(get_current_user_async),
+):
+    return await run_read(request, load_notifications, user)
+
+
 @app.get("/notifications/unread-count")
-def get_unread_notification_count(
+async def get_unread_notification_count(
+    request: Request,
+    user: User = Depends(get_current_user_async),
+):
+    return {"unread_count": await run_read(request, get_unread_count, user.id)}
+
+
+@app.get("/notifications/stream")
+async def stream_notifications(
+    request: Request,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    count = (
-        db.query(Notification)
+    """
+    Server-sent events for the current user: a "ready" event with the unread
+    count, then one "notification" event per new or bumped notification,
+    with its change_seq as the event id. Reconnecting clients that send
+    Last-Event-ID (or ?last_event_id= on a fresh EventSource) first get what
+    they missed, in change_seq order. Like /sync, the replay also repeats the
+    last SYNC_SETTLE_SECONDS of changes, so clients merge by id. The stream
+    ends when the access token expires so the client reconnects with a
+    refreshed cookie.
+    """
+    subscriber = notification_broker.subscribe(user.id)
+    if subscriber is None:
+        raise HTTPException(status_code=429, detail="Too many open notification streams")
+
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get(
+        "last_event_id"
+    )
+
+    def load_initial_state():
+        missed = []
+        if last_event_id and last_event_id.isdigit():
+            missed = (
+                db.query(Notification)
+                .filter(
+                    Notification.user_id == user.id,
+                    or_(
+                        Notification.change_seq > int(last_event_id),
+                        Notification.last_occurred_at > sync_settle_cutoff(),
+                    ),
+                )
+                .order_by(Notification.change_seq.asc())
+                .limit(NOTIFICATION_STREAM_REPLAY_LIMIT)
+                .all()
+            )
+        return get_unread_count(db, user.id), [serialize_notification(n) for n in missed]
+
+    try:
+        unread_count, missed = await run_in_threadpool(load_initial_state)
+    except Exception:
+        notification_broker.unsubscribe(subscriber)
+        raise
+    finally:
+        # Return the connection to the pool; the stream may stay open for hours.
+        await run_in_threadpool(db.close)
+
+    token_payload = decode_access_token(request.cookies.get(ACCESS_COOKIE_NAME))
+    expires_at = float(token_payload.get("exp") or time.time())
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield format_sse({"unread_count": unread_count}, event_name="ready")
+            for notification in missed:
+                yield format_sse(
+                    notification, event_name="notification", event_id=notification["change_seq"]
+                )
+            if len(missed) == NOTIFICATION_STREAM_REPLAY_LIMIT:
+                yield format_sse(event_name="resync")
+
+            while True:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    yield format_sse(event_name="reauthenticate")
+                    return
+                try:
+                    message = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=min(NOTIFICATION_STREAM_HEARTBEAT_SECONDS, remaining),
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+
+                notification = message["notification"]
+                yield format_sse(
+                    notification, event_name="notification", event_id=notification["change_seq"]
+                )
+                if subscriber.overflowed:
+                    subscriber.overflowed = False
+                    yield format_sse(event_name="resync")
+        finally:
+            notification_broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def encode_sync_cursor(state: dict) -> str:
+    raw = json.dumps(state, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(state, dict):
+            raise ValueError
+        seen = state.get("seen") or {}
+        if not isinstance(seen, dict):
+            raise ValueError
+        for key in SYNC_STREAMS:
+            state[key] = int(state.get(key) or 0)
+            seen[key] = max(int(seen.get(key) or 0), state[key])
+        state["seen"] = seen
+        return state
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync cursor")
+
+
+def accessible_matter_filter(user: User):
+    if user.role == "lawyer":
+        return Matter.lawyer_id == user.id
+    if user.role == "client":
+        return Matter.client_id == user.id
+    raise HTTPException(status_code=403, detail="Invalid role")
+
+
+def accessible_matter_ids_query(user: User):
+    return select(Matter.id).where(accessible_matter_filter(user))
+
+
+def sync_settle_cutoff() -> datetime:
+    return utc_now() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+
+
+def sync_row_settled(changed_at: datetime | None, cutoff: datetime) -> bool:
+    if changed_at is None:
+        return True
+    if changed_at.tzinfo is None:
+        changed_at = changed_at.replace(tzinfo=timezone.utc)
+    return changed_at <= cutoff
+
+
+def current_sync_cursor(db: Session, user: User) -> str:
+    """
+    Cursor at the current head of every stream, in one statement. Each
+    stream's position is the newest row older than SYNC_SETTLE_SECONDS, so
+    the first sync may repeat a few recent rows; "seen" holds the true head
+    and keeps those repeats from waking a long poll.
+    """
+    cutoff = sync_settle_cutoff()
+
+    def stream_heads(marker, created_at, *criteria):
+        latest = select(func.max(marker)).where(*criteria).scalar_subquery()
+        settled = (
+            select(marker)
+            .where(*criteria, created_at <= cutoff)
+            .order_by(marker.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        return latest, settled
+
+    heads = {
+        "messages": stream_heads(MatterMessage.id, MatterMessage.created_at),
+        "events": stream_heads(MatterEvent.id, MatterEvent.created_at),
+        "notes": stream_heads(MatterNote.id, MatterNote.created_at),
+        "documents": stream_heads(Document.id, Document.created_at),
+        "notifications": stream_heads(
+            Notification.change_seq,
+            Notification.last_occurred_at,
+            Notification.user_id == user.id,
+        ),
+    }
+    values = iter(db.execute(select(*itertools.chain(*heads.values()))).one())
+    state = {"seen": {}}
+    for stream in heads:
+        latest, settled = next(values) or 0, next(values) or 0
+        state[stream] = settled
+        state["seen"][stream] = latest
+    return encode_sync_cursor(state)
+
+
+def sync_stream_queries(db: Session, user: User, state: dict) -> dict:
+    """One query per SYNC_STREAMS entry for the rows past `state`, in marker order."""
+    matter_ids = accessible_matter_ids_query(user)
+
+    events_query = db.query(MatterEvent).options(joinedload(MatterEvent.user)).filter(
+        MatterEvent.matter_id.in_(matter_ids),
+        MatterEvent.id > state["events"],
+    )
+    if user.role == "client":
+        events_query = events_query.filter(MatterEvent.event_type != "internal_note_added")
+
+    visible_note_types = ["shared", "internal"] if user.role == "lawyer" else ["shared"]
+    return {
+        "messages": db.query(MatterMessage)
+        .options(joinedload(MatterMessage.sender))
+        .filter(MatterMessage.matter_id.in_(matter_ids), MatterMessage.id > state["messages"])
+        .order_by(MatterMessage.id.asc())
+        .limit(SYNC_PAGE_SIZE),
+        "events": events_query.order_by(MatterEvent.id.asc()).limit(SYNC_PAGE_SIZE),
+        "notes": db.query(MatterNote)
+        .options(joinedload(MatterNote.user))
+        .filter(
+            MatterNote.matter_id.in_(matter_ids),
+            MatterNote.note_type.in_(visible_note_types),
+            MatterNote.id > state["notes"],
+        )
+        .order_by(MatterNote.id.asc())
+        .limit(SYNC_PAGE_SIZE),
+        "documents": db.query(Document)
+        .filter(Document.matter_id.in_(matter_ids), Document.id > state["documents"])
+        .order_by(Document.id.asc())
+        .limit(SYNC_PAGE_SIZE),
+        "notifications": db.query(Notification)
         .filter(
             Notification.user_id == user.id,
-            Notification.is_read.is_(False),
+            Notification.change_seq > state["notifications"],
         )
-        .count()
-    )
-    return {"unread_count": count}
+        .order_by(Notification.change_seq.asc())
+        .limit(SYNC_PAGE_SIZE),
+    }
+
+
+def load_sync_changes(db: Session, user: User, state: dict) -> dict:
+    """
+    Rows visible to `user` that were added after the cursor, up to
+    SYNC_PAGE_SIZE per stream. Messages, events, notes and documents are
+    append-only and tracked by id. Notifications are tracked by change_seq,
+    which a coalescing bump advances, so bumped notifications come back too.
+
+    The next cursor only moves past rows older than SYNC_SETTLE_SECONDS: a
+    transaction that took a lower id may still be about to commit. Newer rows
+    are returned again by the next sync, and clients merge rows by id.
+    """
+    queries = sync_stream_queries(db, user, state)
+    messages = queries["messages"].all()
+    events = queries["events"].all()
+    notes = queries["notes"].all()
+    documents = queries["documents"].all()
+    notifications = queries["notifications"].all()
+
+    cutoff = sync_settle_cutoff()
+    next_state = {"seen": dict(state["seen"])}
+    for stream, rows, marker, changed_at in (
+        ("messages", messages, "id", "created_at"),
+        ("events", events, "id", "created_at"),
+        ("notes", notes, "id", "created_at"),
+        ("documents", documents, "id", "created_at"),
+        ("notifications", notifications, "change_seq", "last_occurred_at"),
+    ):
+        markers = [getattr(row, marker) for row in rows]
+        settled = [
+            getattr(row, marker)
+            for row in rows
+            if sync_row_settled(getattr(row, changed_at), cutoff)
+        ]
+        next_state[stream] = max([state[stream], *settled])
+        next_state["seen"][stream] = max([state["seen"][stream], *markers])
+    changes = {
+        "messages": [serialize_matter_message(m) for m in messages],
+        "events": [serialize_event(e) for e in events],
+        "shared_updates": [serialize_note(n) for n in notes if n.note_type == "shared"],
+        "documents": [serialize_document(d) for d in documents],
+        "notifications": [serialize_notification(n) for n in notifications],
+    }
+    if user.role == "lawyer":
+        changes["internal_notes"] = [serialize_note(n) for n in notes if n.note_type == "internal"]
+
+    return {
+        "cursor": encode_sync_cursor(next_state),
+        "has_more": any(
+            len(rows) == SYNC_PAGE_SIZE
+            for rows in (messages, events, notes, documents, notifications)
+        ),
+        "changes": changes,
+        "unread_count": get_unread_count(db, user.id),
+    }
+
+
+def sync_has_changes(result: dict, state: dict) -> bool:
+    """True when the result holds rows past what the cursor had already seen."""
+    return decode_sync_cursor(result["cursor"])["seen"] != state["seen"]
+
+
+@app.get("/sync")
+async def sync_changes(
+    cursor: str | None = None,
+    wait: int = Query(0, ge=0, le=SYNC_MAX_WAIT_SECONDS),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Everything added to the caller's matters and notifications since `cursor`,
+    with the same visibility rules as the per-matter list endpoints. Without
+    a cursor it returns an empty change set and the current cursor. Rows from
+    the last few seconds can be returned twice; merge them by id (a bumped
+    notification keeps its id and gets a higher change_seq).
+
+    With wait=N and nothing new, the request is held for up to N seconds and
+    answered as soon as a notification for the caller is published, so a
+    portal can long-poll this one URL.
+    """
+    if not cursor:
+        head = await run_in_threadpool(current_sync_cursor, db, user)
+        unread_count = await run_in_threadpool(get_unread_count, db, user.id)
+        sync_streams = ["messages", "events", "shared_updates", "documents", "notifications"]
+        if user.role == "lawyer":
+            sync_streams.append("internal_notes")
+        return {
+            "cursor": head,
+            "has_more": False,
+            "changes": {stream: [] for stream in sync_streams},
+            "unread_count": unread_count,
+        }
+
+    state = decode_sync_cursor(cursor)
+    # Subscribe before the first read so a change committed in between still wakes us.
+    subscriber = notification_broker.subscribe(user.id) if wait else None
+    try:
+        result = await run_in_threadpool(load_sync_changes, db, user, state)
+        if subscriber is None or sync_has_changes(result, state):
+            return result
+        # Release the connection while waiting; notifications are published
+        # only after their transaction commits, so the re-read sees it.
+        await run_in_threadpool(db.close)
+        try:
+            await asyncio.wait_for(subscriber.queue.get(), timeout=wait)
+        except asyncio.TimeoutError:
+            return result
+        return await run_in_threadpool(load_sync_changes, db, user, state)
+    finally:
+        if subscriber is not None:
+            notification_broker.unsubscribe(subscriber)
 
 
 @app.patch("/notifications/{notification_id}/read")
@@ -1000,43 +2204,58 @@ def mark_notification_read(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    notification = (
-        db.query(Notification)
-        .filter(
-            Notification.id == notification_id,
-            Notification.user_id == user.id,
-        )
-        .first()
+    query = db.query(Notification).filter(
+        Notification.id == notification_id,
+        Notification.user_id == user.id,
     )
+    # Conditional, so two concurrent requests cannot both decrement the counter.
+    updated = query.filter(Notification.is_read.is_(False)).update(
+        {
+            Notification.is_read: True,
+            Notification.read_at: utc_now(),
+            Notification.coalesce_key: None,
+        },
+        synchronize_session=False,
+    )
+    if updated == 1:
+        adjust_unread_count(db, user.id, -1)
+
+    notification = query.first()
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
-
-    notification.is_read = True
-    notification.read_at = utc_now()
     db.commit()
-    db.refresh(notification)
     return serialize_notification(notification)
 
 
 @app.patch("/notifications/read-all")
 def mark_all_notifications_read(
+    before: datetime | None = None,
+    matter_id: int | None = None,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    notifications = (
-        db.query(Notification)
-        .filter(
-            Notification.user_id == user.id,
-            Notification.is_read.is_(False),
-        )
-        .all()
+    query = db.query(Notification).filter(
+        Notification.user_id == user.id,
+        Notification.is_read.is_(False),
     )
-    now = utc_now()
-    for notification in notifications:
-        notification.is_read = True
-        notification.read_at = now
+    if before is not None:
+        # A bump after `before` is news the client has not shown yet.
+        query = query.filter(Notification.last_occurred_at < before)
+    if matter_id is not None:
+        query = query.filter(Notification.matter_id == matter_id)
+
+    updated = query.update(
+        {
+            Notification.is_read: True,
+            Notification.read_at: utc_now(),
+            Notification.coalesce_key: None,
+        },
+        synchronize_session=False,
+    )
+    if updated:
+        adjust_unread_count(db, user.id, -updated)
     db.commit()
-    return {"updated": len(notifications)}
+    return {"updated": updated}
 
 
 @app.post("/auth/refresh")
@@ -1058,6 +2277,7 @@ def auth_refresh(
     session.last_used_at = utc_now()
     log_audit_event(db, "session_refresh", user_id=user.id, request=request)
     db.commit()
+    invalidate_csrf_session(request.cookies.get(REFRESH_COOKIE_NAME))
 
     response = JSONResponse({"message": "Session refreshed"})
     set_auth_cookies(response, new_access_token, new_refresh_token, new_csrf_token)
@@ -1083,6 +2303,11 @@ def auth_logout(
 
     log_audit_event(db, "logout", user_id=user_id, request=request)
     db.commit()
+    invalidate_csrf_session(refresh_token)
+    invalidate_cached_identity(
+        user_id=user_id,
+        access_token=request.cookies.get(ACCESS_COOKIE_NAME),
+    )
 
     response = JSONResponse({"message": "Logged out"})
     clear_auth_cookies(response)
@@ -1099,7 +2324,7 @@ def me(user: User = Depends(get_current_user)):
 
 # Get matters for current client
 @app.get("/client/matters")
-def get_client_matters(user: User = Depends(get_current_user), db: Session = Depends(get_db )):
+def get_client_matters(user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
     if user.role != "client":
         raise HTTPException(status_code=403, detail="Not a client")
     
@@ -1123,115 +2348,240 @@ def get_client_matters(user: User = Depends(get_current_user), db: Session = Dep
 
 # Get matters for lawyers
 @app.get("/lawyer/matters")
-def get_lawyer_matters(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_lawyer_matters(user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
+    if user.role != "lawyer":
+        raise HTTPException(status_code=403, detail="Not a lawyer")
+
+    matters = (
+        db.query(Matter)
+        .filter(Matter.lawyer_id == user.id)
+        .order_by(Matter.created_at.desc())
+        .all()
+    )
+
+    return [
+        {
+            "id": m.id,
+            "title": m.title,
+            "status": m.status,
+            "description": m.description,
+            "client_id": m.client_id,
+            "created_at": m.created_at.isoformat() if m.created_at else None,
+        }
+        for m in matters
+    ]
+
+
+def latest_message_filter(db: Session, lawyer_id: int, active_since: datetime | None = None):
+    """
+    Condition selecting each matter's latest message, for a query that
+    already joins Matter and MatterMessage. Uses ROW_NUMBER() where window
+    functions exist and a correlated subquery on SQLite older than 3.25.
+    """
+    dialect = db.get_bind().dialect
+    if dialect.name == "sqlite" and (dialect.server_version_info or (0,)) < (3, 25):
+        latest_id = (
+            select(MatterMessage.id)
+            .where(MatterMessage.matter_id == Matter.id)
+            .order_by(MatterMessage.created_at.desc(), MatterMessage.id.desc())
+            .limit(1)
+            .correlate(Matter)
+            .scalar_subquery()
+        )
+        return MatterMessage.id == latest_id
+
+    ranked = (
+        select(
+            MatterMessage.id.label("message_id"),
+            func.row_number()
+            .over(
+                partition_by=MatterMessage.matter_id,
+                order_by=(MatterMessage.created_at.desc(), MatterMessage.id.desc()),
+            )
+            .label("position"),
+        )
+        .join(Matter, Matter.id == MatterMessage.matter_id)
+        .where(Matter.lawyer_id == lawyer_id)
+    )
+    if active_since is not None:
+        ranked = ranked.where(Matter.last_message_at >= active_since)
+    ranked = ranked.subquery()
+    return MatterMessage.id.in_(select(ranked.c.message_id).where(ranked.c.position == 1))
+
+
+def lawyer_inbox_query(
+    db: Session,
+    lawyer_id: int,
+    limit: int | None = None,
+    cursor: str | None = None,
+    active_since: datetime | None = None,
+):
+    query = (
+        db.query(Matter, MatterMessage)
+        .join(MatterMessage, MatterMessage.matter_id == Matter.id)
+        .options(joinedload(Matter.client), joinedload(MatterMessage.sender))
+        .filter(
+            Matter.lawyer_id == lawyer_id,
+            latest_message_filter(db, lawyer_id, active_since),
+        )
+    )
+    if active_since is not None:
+        query = query.filter(Matter.last_message_at >= active_since)
+    if cursor:
+        query = query.filter(
+            keyset_condition(
+                MatterMessage.created_at,
+                MatterMessage.id,
+                cursor,
+                db.get_bind().dialect.name,
+            )
+        )
+    query = query.order_by(MatterMessage.created_at.desc(), MatterMessage.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+@app.get("/lawyer/inbox")
+def get_lawyer_inbox(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=200),
+    cursor: str | None = None,
+    active_since: datetime | None = None,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Matters with their latest message, newest conversation first. Pass
+    `limit` to paginate; the next page's cursor is in X-Next-Cursor.
+    `active_since` keeps matters whose last message is at or after it.
+    """
     if user.role != "lawyer":
-        raise HTTPException(status_code=403, detail="Not a lawyer")
+        raise HTTPException(status_code=403, detail="Only lawyers can access inbox")
 
-    matters = (
-        db.query(Matter)
-        .filter(Matter.lawyer_id == user.id)
-        .order_by(Matter.created_at.desc())
-        .all()
-    )
+    rows = lawyer_inbox_query(db, user.id, limit, cursor, active_since).all()
+
+    if limit is not None and len(rows) == limit:
+        last_message = rows[-1][1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last_message.created_at, last_message.id)
 
     return [
         {
-            "id": m.id,
-            "title": m.title,
-            "status": m.status,
-            "description": m.description,
-            "client_id": m.client_id,
-            "created_at": m.created_at.isoformat() if m.created_at else None,
+            "matter_id": matter.id,
+            "matter_title": matter.title,
+            "matter_status": matter.status,
+            "client_id": matter.client_id,
+            "client_name": matter.client.name if matter.client else None,
+            "latest_message_id": latest_message.id,
+            "latest_message_body": latest_message.body,
+            "latest_message_sender_id": latest_message.sender_id,
+            "latest_message_sender_name": latest_message.sender.name
+            if latest_message.sender
+            else None,
+            "latest_message_sender_role": latest_message.sender.role
+            if latest_message.sender
+            else None,
+            "latest_message_created_at": latest_message.created_at.isoformat()
+            if latest_message.created_at
+            else None,
         }
-        for m in matters
+        for matter, latest_message in rows
     ]
 
 
-@app.get("/lawyer/inbox")
-def get_lawyer_inbox(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if user.role != "lawyer":
-        raise HTTPException(status_code=403, detail="Only lawyers can access inbox")
+# (Recommended) one unified endpoint: returns matters for current user based on role
+# sort -> (order expression, its value on a loaded row). Matters without
+# activity yet sort by creation time, so keyset cursors never hold NULL.
+MATTER_SORT_COLUMNS = {
+    "created": (Matter.created_at, lambda matter: matter.created_at),
+    "activity": (
+        func.coalesce(Matter.last_activity_at, Matter.created_at),
+        lambda matter: matter.last_activity_at or matter.created_at,
+    ),
+}
 
-    matters = (
+
+def my_matters_query(db: Session, user: User, active_since: datetime | None = None):
+    """The user's matters with client and lawyer joined, unordered."""
+    query = (
         db.query(Matter)
-        .options(joinedload(Matter.client))
-        .filter(Matter.lawyer_id == user.id)
-        .order_by(Matter.created_at.desc())
-        .all()
+        .options(joinedload(Matter.client), joinedload(Matter.lawyer))
+        .filter(accessible_matter_filter(user))
     )
+    if active_since is not None:
+        query = query.filter(Matter.last_activity_at >= active_since)
+    return query
 
-    inbox_items = []
-    for matter in matters:
-        latest_message = (
-            db.query(MatterMessage)
-            .options(joinedload(MatterMessage.sender))
-            .filter(MatterMessage.matter_id == matter.id)
-            .order_by(MatterMessage.created_at.desc())
-            .first()
-        )
-        if not latest_message:
-            continue
-
-        inbox_items.append(
-            {
-                "matter_id": matter.id,
-                "matter_title": matter.title,
-                "matter_status": matter.status,
-                "client_id": matter.client_id,
-                "client_name": matter.client.name if matter.client else None,
-                "latest_message_id": latest_message.id,
-                "latest_message_body": latest_message.body,
-                "latest_message_sender_id": latest_message.sender_id,
-                "latest_message_sender_name": latest_message.sender.name
-                if latest_message.sender
-                else None,
-                "latest_message_sender_role": latest_message.sender.role
-                if latest_message.sender
-                else None,
-                "latest_message_created_at": latest_message.created_at.isoformat()
-                if latest_message.created_at
-                else None,
-            }
-        )
 
-    inbox_items.sort(
-        key=lambda item: item["latest_message_created_at"] or "",
-        reverse=True,
+def load_my_matters(
+    db: Session,
+    user: User,
+    response: Response,
+    page: PageParams,
+    sort: str,
+    active_since: datetime | None,
+):
+    sort_column, sort_value = MATTER_SORT_COLUMNS[sort]
+    matters = paginate_query(
+        my_matters_query(db, user, active_since),
+        response,
+        page,
+        sort_column,
+        Matter.id,
+        db.get_bind().dialect.name,
+        sort_value=sort_value,
     )
-    return inbox_items
+
+    return [serialize_matter_summary(m) for m in matters]
 
 
-# (Recommended) one unified endpoint: returns matters for current user based on role
 @app.get("/matters")
-def get_my_matters(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    matter_query = db.query(Matter).options(
-        joinedload(Matter.client),
-        joinedload(Matter.lawyer),
-    )
+async def get_my_matters(
+    request: Request,
+    response: Response,
+    sort: str = Query("created", pattern="^(created|activity)$"),
+    active_since: datetime | None = None,
+    page: PageParams = Depends(async_page_params),
+    user: User = Depends(get_current_user_async),
+):
+    return await run_read(request, load_my_matters, user, response, page, sort, active_since)
 
-    if user.role == "lawyer":
-        q = matter_query.filter(Matter.lawyer_id == user.id)
-    elif user.role == "client":
-        q = matter_query.filter(Matter.client_id == user.id)
-    else:
-        raise HTTPException(status_code=403, detail="Invalid role")
 
-    matters = q.order_by(Matter.created_at.desc()).all()
+PORTAL_BOOTSTRAP_NOTIFICATION_LIMIT = 50
+
+
+@app.get("/portal/bootstrap")
+def get_portal_bootstrap(
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Everything the portal dashboard needs on load, replacing separate calls to
+    /auth/me, /matters, /notifications and /notifications/unread-count.
+    Four queries regardless of the number of matters: matters (with client
+    and lawyer joined), unread notifications grouped by matter, recent
+    notifications, and the unread counter.
+    """
+    matters = (
+        my_matters_query(db, user)
+        .order_by(Matter.created_at.desc(), Matter.id.desc())
+        .all()
+    )
+    unread_by_matter = dict(unread_by_matter_query(db, user.id).all())
+    notifications = recent_notifications_query(
+        db, user.id, PORTAL_BOOTSTRAP_NOTIFICATION_LIMIT
+    ).all()
+
+    return {
+        "user": user_payload(user),
+        "matters": [
+            dict(serialize_matter_summary(m), unread_count=unread_by_matter.get(m.id, 0))
+            for m in matters
+        ],
+        "notifications": [serialize_notification(n) for n in notifications],
+        "unread_count": get_unread_count(db, user.id),
+    }
 
-    return [
-        {
-            "id": m.id,
-            "title": m.title,
-            "status": m.status,
-            "description": m.description,
-            "client_id": m.client_id,
-            "lawyer_id": m.lawyer_id,
-            "client_name": m.client.name if m.client else None,
-            "lawyer_name": m.lawyer.name if m.lawyer else None,
-            "created_at": m.created_at.isoformat() if m.created_at else None,
-        }
-        for m in matters
-    ]
 
 # Lawyer creates a matter for a selected client
 class MatterCreate(BaseModel):
@@ -1493,18 +2843,27 @@ def create_intake_submission(
     }
 
 
+def intake_submissions_query(db: Session):
+    return db.query(IntakeSubmission)
+
+
 @app.get("/lawyer/intake-submissions")
 def list_intake_submissions(
+    response: Response,
+    page: PageParams = Depends(),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     if user.role != "lawyer":
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    submissions = (
-        db.query(IntakeSubmission)
-        .order_by(IntakeSubmission.created_at.desc())
-        .all()
+    submissions = paginate_query(
+        intake_submissions_query(db),
+        response,
+        page,
+        IntakeSubmission.created_at,
+        IntakeSubmission.id,
+        db.get_bind().dialect.name,
     )
 
     return [serialize_intake_submission(i) for i in submissions]
@@ -1608,12 +2967,11 @@ def convert_intake_submission(
                 detail="An account with this email already exists and is not a client",
             )
     else:
-        temp_password = token_urlsafe(32)
         client = User(
             name=intake.name,
             email=intake.email.lower(),
             role="client",
-            password_hash=hash_password(temp_password),
+            password_hash=make_unusable_password_hash(),
         )
         db.add(client)
         db.flush()
@@ -1625,6 +2983,7 @@ def convert_intake_submission(
         status="Open",
         lawyer_id=user.id,
         client_id=client.id,
+        last_activity_at=func.now(),
     )
     db.add(matter)
     db.flush()
@@ -1675,6 +3034,7 @@ def convert_intake_submission(
             invitation_skipped_reason = "client_account_exists"
 
     db.commit()
+    invalidate_matter_access(user.id, client.id)
     db.refresh(intake)
     db.refresh(matter)
     db.refresh(client)
@@ -1706,6 +3066,222 @@ def convert_intake_submission(
     }
 
 
+def parse_audit_metadata_filters(meta: list[str] | None) -> dict:
+    """Parse repeated `meta=key=value` params; values are JSON when they parse as JSON."""
+    filters = {}
+    for item in meta or []:
+        key, sep, raw_value = item.partition("=")
+        if not sep or not AUDIT_METADATA_KEY_PATTERN.match(key):
+            raise HTTPException(status_code=400, detail="Metadata filters must look like key=value")
+        try:
+            filters[key] = json.loads(raw_value)
+        except ValueError:
+            filters[key] = raw_value
+    return filters
+
+
+def apply_audit_event_filters(
+    query,
+    dialect_name: str,
+    *,
+    user_id: int | None = None,
+    event_type: str | None = None,
+    resource_type: str | None = None,
+    resource_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    metadata: dict | None = None,
+):
+    if user_id is not None:
+        query = query.where(AuditEvent.user_id == user_id)
+    if event_type:
+        query = query.where(AuditEvent.event_type == event_type)
+    if resource_type:
+        query = query.where(AuditEvent.resource_type == resource_type)
+    if resource_id:
+        query = query.where(AuditEvent.resource_id == resource_id)
+    if since is not None:
+        query = query.where(AuditEvent.created_at >= since)
+    if until is not None:
+        query = query.where(AuditEvent.created_at < until)
+    if metadata:
+        if dialect_name == "postgresql":
+            # Matches ix_audit_events_metadata_jsonb (GIN).
+            query = query.where(cast(AuditEvent.metadata_json, JSONB).contains(metadata))
+        else:
+            for key, value in metadata.items():
+                extracted = func.json_extract(AuditEvent.metadata_json, f"$.{key}")
+                if isinstance(value, (dict, list)):
+                    # json_extract returns objects and arrays as minified JSON text.
+                    value = func.json(json.dumps(value))
+                query = query.where(extracted == value)
+    return query
+
+
+def require_audit_reviewer(user: User):
+    if user.role not in AUDIT_REVIEWER_ROLES:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def audit_events_page_query(dialect_name: str, limit: int, cursor: str | None = None, **filters):
+    """Newest-first page of audit events; `filters` as for apply_audit_event_filters()."""
+    query = apply_audit_event_filters(select(AuditEvent), dialect_name, **filters)
+    if cursor:
+        query = query.where(
+            keyset_condition(AuditEvent.created_at, AuditEvent.id, cursor, dialect_name)
+        )
+    return query.order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc()).limit(limit)
+
+
+@app.get("/audit-events")
+def list_audit_events(
+    response: Response,
+    user_id: int | None = None,
+    event_type: str | None = None,
+    resource_type: str | None = None,
+    resource_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    meta: list[str] | None = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    require_audit_reviewer(user)
+
+    query = audit_events_page_query(
+        db.get_bind().dialect.name,
+        limit,
+        cursor,
+        user_id=user_id,
+        event_type=event_type,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        since=since,
+        until=until,
+        metadata=parse_audit_metadata_filters(meta),
+    )
+    events = db.execute(query).scalars().all()
+    if len(events) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(events[-1].created_at, events[-1].id)
+    return [serialize_audit_event(e) for e in events]
+
+
+AUDIT_EXPORT_CSV_FIELDS = [
+    "id",
+    "created_at",
+    "user_id",
+    "event_type",
+    "resource_type",
+    "resource_id",
+    "ip_address",
+    "user_agent",
+    "metadata",
+]
+
+
+def iter_database_audit_rows(query):
+    """Yield serialized events oldest first, `yield_per` rows at a time."""
+    db = SessionLocal()
+    try:
+        events = db.execute(
+            query.order_by(AuditEvent.created_at.asc(), AuditEvent.id.asc()).execution_options(
+                yield_per=1000
+            )
+        ).scalars()
+        for event in events:
+            yield serialize_audit_event(event)
+    finally:
+        db.close()
+
+
+def format_audit_export(rows, export_format: str):
+    if export_format != "csv":
+        for row in rows:
+            yield json.dumps(row) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(AUDIT_EXPORT_CSV_FIELDS)
+    for row in rows:
+        writer.writerow(
+            [
+                json.dumps(row[field]) if field == "metadata" else row[field]
+                for field in AUDIT_EXPORT_CSV_FIELDS
+            ]
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@app.get("/audit-events/export")
+def export_audit_events(
+    request: Request,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    user_id: int | None = None,
+    event_type: str | None = None,
+    resource_type: str | None = None,
+    resource_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    meta: list[str] | None = Query(None),
+    include_archived: bool = False,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    require_audit_reviewer(user)
+
+    metadata = parse_audit_metadata_filters(meta)
+    filters = {
+        "user_id": user_id,
+        "event_type": event_type,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "since": since,
+        "until": until,
+        "metadata": metadata,
+    }
+    query = apply_audit_event_filters(select(AuditEvent), db.get_bind().dialect.name, **filters)
+    rows = iter_database_audit_rows(query)
+    if include_archived:
+        rows = merge_audit_rows(iter_archived_events(AUDIT_ARCHIVE_DIR, **filters), rows)
+    log_audit_event(
+        db,
+        "audit_exported",
+        user_id=user.id,
+        request=request,
+        metadata={
+            "format": export_format,
+            "include_archived": include_archived,
+            "filters": {
+                "user_id": user_id,
+                "event_type": event_type,
+                "resource_type": resource_type,
+                "resource_id": resource_id,
+                "since": since.isoformat() if since else None,
+                "until": until.isoformat() if until else None,
+                "metadata": metadata,
+            },
+        },
+    )
+    db.commit()
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        format_audit_export(rows, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="audit-events.{export_format}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
 @app.get("/lawyer/clients", response_model=list[ClientOut])
 def search_clients(
     query: str = Query(..., min_length=1),
@@ -1788,7 +3364,7 @@ def get_invitation(token: str, db: Session = Depends(get_db)):
     if invitation.accepted_at is not None:
         raise HTTPException(status_code=400, detail="Invitation has already been accepted")
 
-    if invitation.expires_at < datetime.now(timezone.utc):
+    if datetime_is_past(invitation.expires_at):
         raise HTTPException(status_code=400, detail="Invitation has expired")
 
     return {
@@ -1799,33 +3375,64 @@ def get_invitation(token: str, db: Session = Depends(get_db)):
 
 
 @app.post("/invitations/accept", status_code=201)
-def accept_client_invitation(
+async def accept_client_invitation(
     body: ClientInviteAccept,
     request: Request,
     db: Session = Depends(get_db),
 ):
-    invitation = db.query(ClientInvitation).filter(ClientInvitation.token == body.token).first()
+    await run_in_threadpool(load_acceptable_invitation, db, body.token)
+    password_hash = await hash_password_async(body.password)
+    return await run_in_threadpool(
+        complete_invitation_acceptance, db, request, body.token, password_hash
+    )
+
+
+def find_acceptable_invitation(db: Session, token: str, lock: bool = False):
+    query = db.query(ClientInvitation).filter(ClientInvitation.token == token)
+    if lock:
+        query = query.with_for_update()
+    invitation = query.first()
     if not invitation:
         raise HTTPException(status_code=404, detail="Invitation not found")
 
     if invitation.accepted_at is not None:
         raise HTTPException(status_code=400, detail="Invitation has already been accepted")
 
-    if invitation.expires_at < datetime.now(timezone.utc):
+    if datetime_is_past(invitation.expires_at):
         raise HTTPException(status_code=400, detail="Invitation has expired")
 
     existing_user = db.query(User).filter(User.email == invitation.email).first()
     if existing_user and existing_user.role != "client":
         raise HTTPException(status_code=400, detail="A user with this email already exists")
+    return invitation, existing_user
+
+
+def load_acceptable_invitation(db: Session, token: str):
+    """Reject a bad token before hashing the password."""
+    try:
+        find_acceptable_invitation(db, token)
+    finally:
+        # Release the connection while the password hashes.
+        db.rollback()
 
+
+def complete_invitation_acceptance(
+    db: Session,
+    request: Request,
+    token: str,
+    password_hash: str,
+):
+    # Check again under a row lock: another request may have accepted the
+    # invitation while this one was hashing.
+    invitation, existing_user = find_acceptable_invitation(db, token, lock=True)
     if existing_user:
         user = existing_user
-        user.password_hash = hash_password(body.password)
+        user.password_hash = password_hash
     else:
         user = User(
             name=invitation.name,
             email=invitation.email,
-            password_hash=hash_password(body.password),
+            password_hash=password_hash,
             role="client",
         )
         db.add(user)
@@ -1846,6 +3453,7 @@ def accept_client_invitation(
 
     db.commit()
     db.refresh(user)
+    invalidate_cached_identity(user_id=user.id)
 
     response = JSONResponse(
         {
@@ -1941,7 +3549,7 @@ def get_password_reset_token(token: str, db: Session = Depends(get_db)):
     if reset_token.used_at is not None:
         raise HTTPException(status_code=400, detail="Reset token has already been used")
 
-    if reset_token.expires_at < datetime.now(timezone.utc):
+    if datetime_is_past(reset_token.expires_at):
         raise HTTPException(status_code=400, detail="Reset token has expired")
 
     return {
@@ -1951,35 +3559,81 @@ def get_password_reset_token(token: str, db: Session = Depends(get_db)):
 
 
 @app.post("/password-reset/confirm")
-def confirm_password_reset(
+async def confirm_password_reset(
     body: PasswordResetConfirm,
     request: Request,
     db: Session = Depends(get_db),
 ):
-    reset_token = (
+    await run_in_threadpool(load_usable_reset_token, db, body.token)
+    password_hash = await hash_password_async(body.password)
+    return await run_in_threadpool(complete_password_reset, db, request, body.token, password_hash)
+
+
+def find_usable_reset_token(db: Session, token: str, lock: bool = False) -> PasswordResetToken:
+    query = (
         db.query(PasswordResetToken)
         .options(joinedload(PasswordResetToken.user))
-        .filter(PasswordResetToken.token == body.token)
-        .first()
+        .filter(PasswordResetToken.token == token)
     )
+    if lock:
+        query = query.with_for_update(of=PasswordResetToken)
+    reset_token = query.first()
     if not reset_token:
         raise HTTPException(status_code=404, detail="Reset token not found")
 
     if reset_token.used_at is not None:
         raise HTTPException(status_code=400, detail="Reset token has already been used")
 
-    if reset_token.expires_at < datetime.now(timezone.utc):
+    if datetime_is_past(reset_token.expires_at):
         raise HTTPException(status_code=400, detail="Reset token has expired")
 
-    user = reset_token.user
-    if not user:
+    if not reset_token.user:
         raise HTTPException(status_code=404, detail="User not found")
+    return reset_token
+
+
+def load_usable_reset_token(db: Session, token: str):
+    """Reject a bad token before hashing the password."""
+    try:
+        find_usable_reset_token(db, token)
+    finally:
+        # Release the connection while the password hashes.
+        db.rollback()
 
-    user.password_hash = hash_password(body.password)
+
+def complete_password_reset(
+    db: Session,
+    request: Request,
+    token: str,
+    password_hash: str,
+):
+    # Check again under a row lock: the token may have been used while this
+    # request was hashing.
+    reset_token = find_usable_reset_token(db, token, lock=True)
+    user = reset_token.user
+    user.password_hash = password_hash
     reset_token.used_at = datetime.now(timezone.utc)
-    log_audit_event(db, "password_reset_completed", user_id=user.id, request=request)
+    # Sign out every existing session; whoever reset the password logs in again.
+    active_sessions = (
+        db.query(UserSession)
+        .filter(UserSession.user_id == user.id, UserSession.revoked_at.is_(None))
+        .all()
+    )
+    revoked_token_hashes = [session.refresh_token_hash for session in active_sessions]
+    for session in active_sessions:
+        session.revoked_at = reset_token.used_at
+    log_audit_event(
+        db,
+        "password_reset_completed",
+        user_id=user.id,
+        request=request,
+        metadata={"revoked_sessions": len(active_sessions)},
+    )
 
     db.commit()
+    invalidate_cached_identity(user_id=user.id)
+    for refresh_token_hash in revoked_token_hashes:
+        csrf_session_cache.pop(refresh_token_hash)
 
     return {"message": "Password reset successful"}
 
@@ -2006,6 +3660,7 @@ def create_matter(
         status="Open",
         client_id=client.id,
         lawyer_id=user.id,
+        last_activity_at=func.now(),
     )
     db.add(matter)
     db.flush()  # assign matter.id without committing the transaction
@@ -2019,6 +3674,7 @@ def create_matter(
     )
 
     db.commit()
+    invalidate_matter_access(user.id, client.id)
     db.refresh(matter)
 
     return {
@@ -2047,7 +3703,7 @@ def presign_matter_upload(
     if not S3_BUCKET_NAME:
         raise HTTPException(status_code=500, detail="S3 bucket is not configured")
 
-    get_accessible_matter(db, user, matter_id, request=request)
+    assert_matter_access(db, user, matter_id, request=request)
 
     safe_name = validate_document_file(body.file_name, body.content_type, body.file_size)
     key = f"{S3_UPLOAD_PREFIX}/matter-{matter_id}/{uuid4()}-{safe_name}"
@@ -2102,6 +3758,7 @@ def create_document(
     )
     db.add(doc)
     db.flush()
+    record_matter_activity(db, matter_id, document=True)
 
     create_matter_event(
         db=db,
@@ -2134,43 +3791,37 @@ def create_document(
     db.commit()
     db.refresh(doc)
 
-    return {
-        "id": doc.id,
-        "filename": doc.filename,
-        "s3_key": doc.s3_key,
-        "matter_id": doc.matter_id,
-        "uploaded_by_id": doc.uploaded_by_id,
-        "created_at": doc.created_at.isoformat() if doc.created_at else None,
-    }
+    return serialize_document(doc)
 
 # List documents for a matter
+def matter_documents_query(db: Session, matter_id: int):
+    return db.query(Document).filter(Document.matter_id == matter_id)
+
+
 @app.get("/matters/{matter_id}/documents")
 def list_documents(
     matter_id: int,
     request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    get_accessible_matter(db, user, matter_id, request=request)
-
-    docs = (
-        db.query(Document)
-        .filter(Document.matter_id == matter_id)
-        .order_by(Document.created_at.desc())
-        .all()
+    matter = get_accessible_matter(db, user, matter_id, request=request)
+    not_modified = conditional_matter_response(request, response, user, matter)
+    if not_modified:
+        return not_modified
+
+    docs = paginate_query(
+        matter_documents_query(db, matter_id),
+        response,
+        page,
+        Document.created_at,
+        Document.id,
+        db.get_bind().dialect.name,
     )
 
-    return [
-        {
-            "id": d.id,
-            "filename": d.filename,
-            "s3_key": d.s3_key,
-            "matter_id": d.matter_id,
-            "uploaded_by_id": d.uploaded_by_id,
-            "created_at": d.created_at.isoformat() if d.created_at else None,
-        }
-        for d in docs
-    ]
+    return [serialize_document(d) for d in docs]
 
 
 @app.post("/documents/{document_id}/access-links")
@@ -2302,10 +3953,14 @@ def serve_legacy_document_download(
 def get_matter(
     matter_id: int,
     request: Request,
+    response: Response,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     matter = get_accessible_matter(db, user, matter_id, request=request)
+    not_modified = conditional_matter_response(request, response, user, matter)
+    if not_modified:
+        return not_modified
 
     return {
         "id": matter.id,
@@ -2383,49 +4038,89 @@ def update_matter(
     }
 
 
-@app.get("/matters/{matter_id}/events", response_model=list[MatterEventOut])
-def list_matter_events(
-    matter_id: int,
-    request: Request,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    get_accessible_matter(db, user, matter_id, request=request)
-
+def matter_events_query(db: Session, user: User, matter_id: int):
     query = (
         db.query(MatterEvent)
         .options(joinedload(MatterEvent.user))
         .filter(MatterEvent.matter_id == matter_id)
     )
-
     if user.role == "client":
         query = query.filter(MatterEvent.event_type != "internal_note_added")
-
-    events = query.order_by(MatterEvent.created_at.desc()).all()
-
-    return [serialize_event(e) for e in events]
+    return query
 
 
-@app.get("/matters/{matter_id}/messages", response_model=list[MatterMessageOut])
-def list_matter_messages(
+@app.get("/matters/{matter_id}/events", response_model=list[MatterEventOut])
+def list_matter_events(
     matter_id: int,
     request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     matter = get_accessible_matter(db, user, matter_id, request=request)
+    not_modified = conditional_matter_response(request, response, user, matter)
+    if not_modified:
+        return not_modified
+
+    events = paginate_query(
+        matter_events_query(db, user, matter_id),
+        response,
+        page,
+        MatterEvent.created_at,
+        MatterEvent.id,
+        db.get_bind().dialect.name,
+    )
+
+    return [serialize_event(e) for e in events]
+
 
-    messages = (
+def matter_messages_query(db: Session, matter_id: int):
+    return (
         db.query(MatterMessage)
         .options(joinedload(MatterMessage.sender))
-        .filter(MatterMessage.matter_id == matter.id)
-        .order_by(MatterMessage.created_at.asc())
-        .all()
+        .filter(MatterMessage.matter_id == matter_id)
+    )
+
+
+def load_matter_messages(
+    db: Session,
+    user: User,
+    matter_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams,
+):
+    matter = get_accessible_matter(db, user, matter_id, request=request)
+    not_modified = conditional_matter_response(request, response, user, matter)
+    if not_modified:
+        return not_modified
+
+    # Oldest first like a conversation; the first page is the latest `limit`.
+    messages = paginate_query(
+        matter_messages_query(db, matter.id),
+        response,
+        page,
+        MatterMessage.created_at,
+        MatterMessage.id,
+        db.get_bind().dialect.name,
+        oldest_first=True,
     )
 
     return [serialize_matter_message(m) for m in messages]
 
 
+@app.get("/matters/{matter_id}/messages", response_model=list[MatterMessageOut])
+async def list_matter_messages(
+    matter_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(async_page_params),
+    user: User = Depends(get_current_user_async),
+):
+    return await run_read(request, load_matter_messages, user, matter_id, request, response, page)
+
+
 @app.post("/matters/{matter_id}/messages", status_code=201, response_model=MatterMessageOut)
 def create_matter_message(
     matter_id: int,
@@ -2449,6 +4144,7 @@ def create_matter_message(
     )
     db.add(message)
     db.flush()
+    record_matter_activity(db, matter.id, message=True)
 
     create_matter_event(
         db=db,
@@ -2492,25 +4188,36 @@ def create_matter_message(
     return serialize_matter_message(message)
 
 
+def matter_notes_query(db: Session, matter_id: int, note_type: str):
+    return (
+        db.query(MatterNote)
+        .options(joinedload(MatterNote.user))
+        .filter(
+            MatterNote.matter_id == matter_id,
+            MatterNote.note_type == note_type,
+        )
+    )
+
+
 @app.get("/matters/{matter_id}/internal-notes", response_model=list[MatterNoteOut])
 def list_internal_notes(
     matter_id: int,
     request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     matter = get_accessible_matter(db, user, matter_id, request=request)
     assert_can_access_internal_notes(user, matter)
 
-    notes = (
-        db.query(MatterNote)
-        .options(joinedload(MatterNote.user))
-        .filter(
-            MatterNote.matter_id == matter_id,
-            MatterNote.note_type == "internal",
-        )
-        .order_by(MatterNote.created_at.desc())
-        .all()
+    notes = paginate_query(
+        matter_notes_query(db, matter_id, "internal"),
+        response,
+        page,
+        MatterNote.created_at,
+        MatterNote.id,
+        db.get_bind().dialect.name,
     )
 
     return [serialize_note(n) for n in notes]
@@ -2539,6 +4246,7 @@ def create_internal_note(
     )
 
     db.add(note)
+    record_matter_activity(db, matter_id)
 
     create_matter_event(
         db=db,
@@ -2558,20 +4266,23 @@ def create_internal_note(
 def list_shared_updates(
     matter_id: int,
     request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    get_accessible_matter(db, user, matter_id, request=request)
-
-    notes = (
-        db.query(MatterNote)
-        .options(joinedload(MatterNote.user))
-        .filter(
-            MatterNote.matter_id == matter_id,
-            MatterNote.note_type == "shared",
-        )
-        .order_by(MatterNote.created_at.desc())
-        .all()
+    matter = get_accessible_matter(db, user, matter_id, request=request)
+    not_modified = conditional_matter_response(request, response, user, matter)
+    if not_modified:
+        return not_modified
+
+    notes = paginate_query(
+        matter_notes_query(db, matter_id, "shared"),
+        response,
+        page,
+        MatterNote.created_at,
+        MatterNote.id,
+        db.get_bind().dialect.name,
     )
 
     return [serialize_note(n) for n in notes]
@@ -2599,6 +4310,7 @@ def create_shared_update(
     )
 
     db.add(note)
+    record_matter_activity(db, matter_id)
 
     create_matter_event(
         db=db,
@@ -0,0 +1,262 @@
+"""
+Operational commands for the backend.
+
+    python manage.py calibrate-password-hash --target-ms 250
+    python manage.py archive-audit --older-than-days 365
+    python manage.py search-audit-archive --event-type document_downloaded --resource-id 42
+    python manage.py verify-audit-archive
+    python manage.py reconcile-unread-counters
+    python manage.py backfill-matter-activity --chunk-size 500 [--after-id N]
+    python manage.py check-query-plans [--database-url URL] [--rows 20000]
+    python manage.py migrate upgrade|downgrade|status [--to N]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+
+def cmd_calibrate_password_hash(args):
+    from auth_utils import calibrate_password_hash_rounds
+
+    result = calibrate_password_hash_rounds(args.target_ms, samples=args.samples)
+    print(
+        f"pbkdf2_sha256: {result['probe_rounds']} rounds took "
+        f"{result['probe_ms']:.1f} ms on this host"
+    )
+    print(
+        f"current PASSWORD_HASH_ROUNDS={result['current_rounds']} "
+        f"(~{result['current_estimated_ms']:.1f} ms per hash)"
+    )
+    print(
+        f"recommended for a {result['target_ms']:.0f} ms budget "
+        f"(~{result['estimated_ms']:.1f} ms per hash):"
+    )
+    print(f"PASSWORD_HASH_ROUNDS={result['recommended_rounds']}")
+    return 0
+
+
+def cmd_archive_audit(args):
+    from audit_archive import archive_audit_events
+    from database import SessionLocal
+
+    archived = archive_audit_events(SessionLocal, args.dir, args.older_than_days)
+    for manifest in archived:
+        print(f"{manifest['file']}: {manifest['rows']} events, sha256 {manifest['sha256']}")
+    print(f"archived {sum(m['rows'] for m in archived)} events in {len(archived)} segments")
+    return 0
+
+
+def cmd_search_audit_archive(args):
+    from audit_archive import iter_archived_events
+
+    metadata = {}
+    for item in args.meta or []:
+        key, _sep, value = item.partition("=")
+        try:
+            metadata[key] = json.loads(value)
+        except ValueError:
+            metadata[key] = value
+
+    for row in iter_archived_events(
+        args.dir,
+        user_id=args.user_id,
+        event_type=args.event_type,
+        resource_type=args.resource_type,
+        resource_id=args.resource_id,
+        since=datetime.fromisoformat(args.since) if args.since else None,
+        until=datetime.fromisoformat(args.until) if args.until else None,
+        metadata=metadata,
+    ):
+        print(json.dumps(row))
+    return 0
+
+
+def cmd_verify_audit_archive(args):
+    from audit_archive import load_manifests, verify_segment
+
+    failures = 0
+    for manifest in load_manifests(args.dir):
+        try:
+            verify_segment(args.dir, manifest)
+            print(f"ok      {manifest['file']} ({manifest['rows']} events)")
+        except (OSError, ValueError) as error:
+            failures += 1
+            print(f"FAILED  {manifest['file']}: {error}")
+    return 1 if failures else 0
+
+
+def cmd_reconcile_unread_counters(args):
+    from database import SessionLocal
+    from notification_counters import reconcile_unread_counters
+
+    db = SessionLocal()
+    try:
+        repaired = reconcile_unread_counters(db)
+    finally:
+        db.close()
+    print(f"repaired {repaired} unread notification counters")
+    return 0
+
+
+def cmd_backfill_matter_activity(args):
+    from database import SessionLocal
+    from matter_activity import backfill_matter_activity
+
+    def report(last_id):
+        print(f"backfilled through matter id {last_id}", flush=True)
+
+    updated = backfill_matter_activity(
+        SessionLocal,
+        chunk_size=args.chunk_size,
+        after_id=args.after_id,
+        progress=report,
+    )
+    print(f"backfilled activity columns for {updated} matters")
+    return 0
+
+
+def cmd_check_query_plans(args):
+    from query_plans import check_query_plans
+
+    try:
+        results = check_query_plans(args.database_url, rows=args.rows, row_threshold=args.row_threshold)
+    except RuntimeError as error:
+        print(f"FAILED  {error}")
+        return 1
+
+    failures = 0
+    for result in results:
+        if result["full_scans"]:
+            failures += 1
+            print(f"FAILED  {result['name']}: full scan of {', '.join(result['full_scans'])}")
+            for line in result["plan"]:
+                print(f"          {line}")
+        else:
+            print(f"ok      {result['name']}")
+    return 1 if failures else 0
+
+
+def cmd_migrate(args):
+    import migrations
+    from database import engine
+
+    def report(migration):
+        print(f"{args.action:9} {migration.version:4} {migration.name}", flush=True)
+
+    if args.action == "status":
+        for row in migrations.migration_status(engine):
+            applied = row["applied_at"] or "pending"
+            print(f"{row['version']:4} {row['name']:40} {applied}")
+        return 0
+    try:
+        if args.action == "upgrade":
+            changed = migrations.upgrade(engine, target=args.to, progress=report)
+        else:
+            changed = migrations.downgrade(engine, target=args.to, progress=report)
+    except ValueError as error:
+        print(f"FAILED  {error}")
+        return 1
+    if not changed:
+        print("schema already at the requested version")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ochoa Lawyers backend commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    calibrate = subparsers.add_parser(
+        "calibrate-password-hash",
+        help="measure pbkdf2_sha256 on this host and recommend PASSWORD_HASH_ROUNDS",
+    )
+    calibrate.add_argument("--target-ms", type=float, default=250.0)
+    calibrate.add_argument("--samples", type=int, default=5)
+    calibrate.set_defaults(handler=cmd_calibrate_password_hash)
+
+    archive_dir = os.getenv("AUDIT_ARCHIVE_DIR", "audit-archive")
+
+    archive = subparsers.add_parser(
+        "archive-audit",
+        help="move complete months of old audit events into compressed archive files",
+    )
+    archive.add_argument(
+        "--older-than-days",
+        type=int,
+        default=int(os.getenv("AUDIT_ARCHIVE_AFTER_DAYS", "365")),
+    )
+    archive.add_argument("--dir", default=archive_dir)
+    archive.set_defaults(handler=cmd_archive_audit)
+
+    search = subparsers.add_parser(
+        "search-audit-archive",
+        help="print archived audit events matching the filters as NDJSON",
+    )
+    search.add_argument("--dir", default=archive_dir)
+    search.add_argument("--user-id", type=int)
+    search.add_argument("--event-type")
+    search.add_argument("--resource-type")
+    search.add_argument("--resource-id")
+    search.add_argument("--since", help="ISO timestamp, inclusive")
+    search.add_argument("--until", help="ISO timestamp, exclusive")
+    search.add_argument("--meta", action="append", help="key=value metadata filter")
+    search.set_defaults(handler=cmd_search_audit_archive)
+
+    verify = subparsers.add_parser(
+        "verify-audit-archive",
+        help="check every archive segment against its manifest checksum",
+    )
+    verify.add_argument("--dir", default=archive_dir)
+    verify.set_defaults(handler=cmd_verify_audit_archive)
+
+    reconcile = subparsers.add_parser(
+        "reconcile-unread-counters",
+        help="recompute unread notification counters and repair drift",
+    )
+    reconcile.set_defaults(handler=cmd_reconcile_unread_counters)
+
+    backfill = subparsers.add_parser(
+        "backfill-matter-activity",
+        help="recompute matter activity columns in chunks; resume with --after-id",
+    )
+    backfill.add_argument("--chunk-size", type=int, default=500)
+    backfill.add_argument("--after-id", type=int, default=0)
+    backfill.set_defaults(handler=cmd_backfill_matter_activity)
+
+    plans = subparsers.add_parser(
+        "check-query-plans",
+        help="EXPLAIN the hot API queries on a seeded database and fail on full table scans",
+    )
+    plans.add_argument(
+        "--database-url",
+        help="migrated database to seed if empty, never upgraded here "
+        "(default: a temporary SQLite file)",
+    )
+    plans.add_argument("--rows", type=int, default=20000)
+    plans.add_argument("--row-threshold", type=int, default=1000)
+    plans.set_defaults(handler=cmd_check_query_plans)
+
+    migrate = subparsers.add_parser(
+        "migrate",
+        help="apply, revert or list versioned schema migrations",
+    )
+    migrate.add_argument("action", choices=["upgrade", "downgrade", "status"])
+    migrate.add_argument(
+        "--to",
+        type=int,
+        help="target version (upgrade: default latest; downgrade: default one step back)",
+    )
+    migrate.set_defaults(handler=cmd_migrate)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Denormalized activity columns on matters.
+
+last_message_at, last_activity_at, message_count and document_count are
+kept up to date in the transaction that adds the message, document or note,
+so matter lists can sort and filter by activity from an index instead of
+scanning the child tables.
+"""
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from models import Document, Matter, MatterMessage, MatterNote
+
+
+def record_matter_activity(
+    db: Session,
+    matter_id: int,
+    *,
+    message: bool = False,
+    document: bool = False,
+):
+    """Bump the activity columns with a single UPDATE (no read-modify-write)."""
+    values = {"last_activity_at": func.now()}
+    if message:
+        values["last_message_at"] = func.now()
+        values["message_count"] = Matter.message_count + 1
+    if document:
+        values["document_count"] = Matter.document_count + 1
+    db.execute(
+        update(Matter)
+        .where(Matter.id == matter_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _latest(column, matter_column):
+    return select(func.max(column)).where(matter_column == Matter.id).scalar_subquery()
+
+
+def _count(column, matter_column):
+    return select(func.count(column)).where(matter_column == Matter.id).scalar_subquery()
+
+
+def backfill_matter_activity(
+    session_factory,
+    chunk_size: int = 500,
+    after_id: int = 0,
+    progress=None,
+) -> int:
+    """
+    Recompute the activity columns from the child tables for matters with
+    id > `after_id`, `chunk_size` matters per transaction. Each chunk is one
+    UPDATE; `progress(last_id)` is called after every commit so an
+    interrupted run can resume with after_id=last_id.
+    Returns the number of matters updated.
+    """
+    db = session_factory()
+    try:
+        dialect_name = db.get_bind().dialect.name
+        greatest = func.greatest if dialect_name == "postgresql" else func.max
+
+        last_message_at = _latest(MatterMessage.created_at, MatterMessage.matter_id)
+        last_document_at = _latest(Document.created_at, Document.matter_id)
+        last_note_at = _latest(MatterNote.created_at, MatterNote.matter_id)
+        values = {
+            "message_count": _count(MatterMessage.id, MatterMessage.matter_id),
+            "document_count": _count(Document.id, Document.matter_id),
+            "last_message_at": last_message_at,
+            "last_activity_at": greatest(
+                Matter.created_at,
+                func.coalesce(last_message_at, Matter.created_at),
+                func.coalesce(last_document_at, Matter.created_at),
+                func.coalesce(last_note_at, Matter.created_at),
+            ),
+        }
+
+        updated = 0
+        while True:
+            chunk_ids = db.execute(
+                select(Matter.id)
+                .where(Matter.id > after_id)
+                .order_by(Matter.id.asc())
+                .limit(chunk_size)
+            ).scalars().all()
+            if not chunk_ids:
+                return updated
+            db.execute(
+                update(Matter)
+                .where(Matter.id >= chunk_ids[0], Matter.id <= chunk_ids[-1])
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            updated += len(chunk_ids)
+            after_id = chunk_ids[-1]
+            if progress:
+                progress(after_id)
+    finally:
+        db.close()
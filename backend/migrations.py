@@ -0,0 +1,738 @@
+"""
+Versioned schema migrations.
+
+Each Migration has an integer version and applied versions are recorded in
+schema_migrations. Every step checks the live schema before changing it, so
+an interrupted migration can be re-run, and a database that create_all()
+already brought up to date is simply stamped with the versions.
+
+    python manage.py migrate upgrade [--to N]
+    python manage.py migrate downgrade [--to N]
+    python manage.py migrate status
+
+On PostgreSQL, runs are serialized with an advisory lock, DDL in a
+transaction gives up after POSTGRES_LOCK_TIMEOUT instead of queueing behind
+long-running queries, and indexes are built with CREATE INDEX CONCURRENTLY
+so tables stay writable.
+
+At startup main.py only reads the applied versions (SCHEMA_STARTUP_MODE):
+
+    check    warn when migrations are pending (default)
+    strict   refuse to start when migrations are pending
+    upgrade  apply pending migrations (default for SQLite development databases)
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    cast,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.schema import CreateColumn
+
+# Arbitrary application-wide key for pg_advisory_lock().
+MIGRATION_LOCK_ID = 7_261_502_201
+POSTGRES_LOCK_TIMEOUT = "5s"
+# Rows per committed batch when a migration fills in a new column.
+BACKFILL_CHUNK_SIZE = 5000
+STARTUP_MODES = ("check", "strict", "upgrade")
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+class Migration:
+    """
+    `upgrade` and `downgrade` take a Connection. Non-transactional migrations
+    run on an autocommit connection, which CREATE INDEX CONCURRENTLY needs.
+    """
+
+    def __init__(self, version: int, name: str, upgrade, downgrade=None, transactional: bool = True):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.downgrade = downgrade
+        self.transactional = transactional
+
+
+# What each migration creates is written out here instead of being read
+# from models.py, so replaying the migrations on an empty database gives the
+# same schema however the models change later. `baseline` is the schema of
+# version 1; `schema` starts as a copy of it and collects the columns and
+# indexes of the later versions. Model changes need a new migration below.
+baseline = MetaData()
+
+Table(
+    "users",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("email", String, unique=True, nullable=False, index=True),
+    Column("password_hash", String, nullable=False),
+    Column("role", String),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "contact_submissions",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False),
+    Column("phone", String, nullable=True),
+    Column("message", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True)),
+)
+
+Table(
+    "user_sessions",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False, index=True),
+    Column("refresh_token_hash", String, nullable=False, unique=True, index=True),
+    Column("csrf_token_hash", String, nullable=True),
+    Column("user_agent", String, nullable=True),
+    Column("ip_address", String, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("last_used_at", DateTime(timezone=True), nullable=True),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Column("revoked_at", DateTime(timezone=True), nullable=True),
+)
+
+Table(
+    "rate_limit_buckets",
+    baseline,
+    Column("key", String(255), primary_key=True),
+    Column("tokens", Float, nullable=False),
+    Column("updated_at", Float, nullable=False, index=True),
+)
+
+Table(
+    "audit_events",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=True, index=True),
+    Column("event_type", String(100), nullable=False, index=True),
+    Column("resource_type", String(100), nullable=True),
+    Column("resource_id", String(100), nullable=True),
+    Column("ip_address", String, nullable=True),
+    Column("user_agent", String, nullable=True),
+    Column("metadata_json", Text, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "matters",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(200), nullable=False),
+    Column("status", String(50), nullable=False),
+    Column("description", String(1000), nullable=True),
+    Column("client_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("lawyer_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "intake_submissions",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False, index=True),
+    Column("phone", String, nullable=True),
+    Column("matter_type", String, nullable=True),
+    Column("description", Text, nullable=False),
+    Column("status", String, nullable=False, index=True),
+    Column("assigned_lawyer_id", Integer, ForeignKey("users.id"), nullable=True, index=True),
+    Column("converted_matter_id", Integer, ForeignKey("matters.id"), nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "documents",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("matter_id", Integer, ForeignKey("matters.id"), nullable=False),
+    Column("filename", String(255), nullable=False),
+    Column("s3_key", String(500), nullable=False),
+    Column("uploaded_by_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "document_access_tokens",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("document_id", Integer, ForeignKey("documents.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("token", String, nullable=False, unique=True, index=True),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "matter_notes",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("matter_id", Integer, ForeignKey("matters.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("note_type", String(20), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "matter_messages",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("matter_id", Integer, ForeignKey("matters.id"), nullable=False, index=True),
+    Column("sender_id", Integer, ForeignKey("users.id"), nullable=False, index=True),
+    Column("body", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "notifications",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False, index=True),
+    Column("type", String(100), nullable=False, index=True),
+    Column("title", String(255), nullable=False),
+    Column("body", Text, nullable=True),
+    Column("matter_id", Integer, ForeignKey("matters.id"), nullable=True, index=True),
+    Column("document_id", Integer, ForeignKey("documents.id"), nullable=True),
+    Column("message_id", Integer, ForeignKey("matter_messages.id"), nullable=True),
+    Column("is_read", Boolean, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("read_at", DateTime(timezone=True), nullable=True),
+)
+
+Table(
+    "notification_counters",
+    baseline,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("unread_count", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "matter_events",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("matter_id", Integer, ForeignKey("matters.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=True),
+    Column("event_type", String(50), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "client_invitations",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False, index=True),
+    Column("token", String, nullable=False, unique=True, index=True),
+    Column("invited_by_user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Column("accepted_at", DateTime(timezone=True), nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "password_reset_tokens",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("token", String, nullable=False, unique=True, index=True),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Column("used_at", DateTime(timezone=True), nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+schema = MetaData()
+for _table in baseline.sorted_tables:
+    _table.to_metadata(schema)
+matters = schema.tables["matters"]
+notifications = schema.tables["notifications"]
+
+# Version 2
+for _column in (
+    Column("last_message_at", DateTime(timezone=True), nullable=True),
+    Column("last_activity_at", DateTime(timezone=True), nullable=True),
+    Column("message_count", Integer, nullable=False, server_default="0"),
+    Column("document_count", Integer, nullable=False, server_default="0"),
+    Column("version", Integer, nullable=False, server_default="1"),
+):
+    matters.append_column(_column)
+
+# Version 3
+for _column in (
+    Column("coalesce_key", String(255), nullable=True),
+    Column("occurrence_count", Integer, nullable=False, server_default="1"),
+):
+    notifications.append_column(_column)
+
+# Version 4
+_intake_submissions = schema.tables["intake_submissions"]
+_audit_events = schema.tables["audit_events"]
+_documents = schema.tables["documents"]
+_matter_notes = schema.tables["matter_notes"]
+_matter_messages = schema.tables["matter_messages"]
+_matter_events = schema.tables["matter_events"]
+Index("ix_intake_submissions_created_at_id", _intake_submissions.c.created_at, _intake_submissions.c.id)
+Index("ix_audit_events_created_at_id", _audit_events.c.created_at, _audit_events.c.id)
+Index(
+    "ix_audit_events_resource",
+    _audit_events.c.resource_type,
+    _audit_events.c.resource_id,
+    _audit_events.c.created_at,
+)
+Index(
+    "ix_audit_events_metadata_jsonb",
+    cast(_audit_events.c.metadata_json, JSONB),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+Index("ix_matters_lawyer_id_last_activity_at", matters.c.lawyer_id, matters.c.last_activity_at)
+Index("ix_matters_client_id_last_activity_at", matters.c.client_id, matters.c.last_activity_at)
+Index("ix_matters_lawyer_id_last_message_at", matters.c.lawyer_id, matters.c.last_message_at)
+Index("ix_matters_lawyer_id_created_at", matters.c.lawyer_id, matters.c.created_at, matters.c.id)
+Index("ix_matters_client_id_created_at", matters.c.client_id, matters.c.created_at, matters.c.id)
+Index("ix_documents_matter_id_created_at", _documents.c.matter_id, _documents.c.created_at, _documents.c.id)
+Index("ix_document_access_tokens_document_id", schema.tables["document_access_tokens"].c.document_id)
+Index(
+    "ix_matter_notes_matter_id_type_created_at",
+    _matter_notes.c.matter_id,
+    _matter_notes.c.note_type,
+    _matter_notes.c.created_at,
+    _matter_notes.c.id,
+)
+Index(
+    "ix_matter_messages_matter_id_created_at",
+    _matter_messages.c.matter_id,
+    _matter_messages.c.created_at,
+    _matter_messages.c.id,
+)
+Index("ix_notifications_user_id_is_read", notifications.c.user_id, notifications.c.is_read)
+Index(
+    "ix_notifications_user_id_created_at",
+    notifications.c.user_id,
+    notifications.c.created_at,
+    notifications.c.id,
+)
+Index("uq_notifications_coalesce_key", notifications.c.coalesce_key, unique=True)
+Index(
+    "ix_matter_events_matter_id_created_at",
+    _matter_events.c.matter_id,
+    _matter_events.c.created_at,
+    _matter_events.c.id,
+)
+
+# Version 5 (its index is version 6)
+notifications.append_column(Column("change_seq", BigInteger, nullable=True))
+Index("ix_notifications_user_id_change_seq", notifications.c.user_id, notifications.c.change_seq)
+
+# Version 7 (its index is version 8)
+notifications.append_column(Column("last_occurred_at", DateTime(timezone=True), nullable=True))
+Index(
+    "ix_notifications_user_id_last_occurred_at",
+    notifications.c.user_id,
+    notifications.c.last_occurred_at,
+    notifications.c.id,
+)
+
+
+def _schema_index(name: str):
+    for table in schema.tables.values():
+        for index in table.indexes:
+            if index.name == name:
+                return index
+    raise KeyError(f"No migration index named {name}")
+
+
+def _column_names(conn, table_name: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table_name)}
+
+
+def _invalid_postgres_indexes(conn) -> set[str]:
+    """Indexes left INVALID by an interrupted CREATE INDEX CONCURRENTLY."""
+    return set(
+        conn.exec_driver_sql(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid"
+        ).scalars()
+    )
+
+
+def add_column(conn, table_name: str, column_name: str):
+    """Add a `schema` column unless it exists; it must be nullable or have a server default."""
+    if column_name in _column_names(conn, table_name):
+        return
+    column = schema.tables[table_name].c[column_name]
+    column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {column_ddl}")
+
+
+def drop_column(conn, table_name: str, column_name: str):
+    if column_name in _column_names(conn, table_name):
+        conn.exec_driver_sql(f"ALTER TABLE {table_name} DROP COLUMN {column_name}")
+
+
+def create_index(conn, name: str):
+    """
+    Create a `schema` index unless it exists. On PostgreSQL it is built
+    CONCURRENTLY (the connection must be in autocommit) and an invalid
+    leftover from an interrupted build is dropped and rebuilt.
+    """
+    index = _schema_index(name)
+    existing = {item["name"] for item in inspect(conn).get_indexes(index.table.name)}
+    if conn.dialect.name != "postgresql":
+        if name not in existing:
+            # Indexes restricted to another dialect (ddl_if) are skipped by create().
+            index.create(bind=conn)
+        return
+
+    if name in _invalid_postgres_indexes(conn):
+        conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    elif name in existing:
+        return
+    index.dialect_kwargs["postgresql_concurrently"] = True
+    try:
+        index.create(bind=conn)
+    finally:
+        index.dialect_kwargs["postgresql_concurrently"] = False
+
+
+def drop_index(conn, name: str):
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        return
+    index = _schema_index(name)
+    if name in {item["name"] for item in inspect(conn).get_indexes(index.table.name)}:
+        index.drop(bind=conn)
+
+
+MATTER_ACTIVITY_COLUMNS = [
+    "last_message_at",
+    "last_activity_at",
+    "message_count",
+    "document_count",
+    "version",
+]
+NOTIFICATION_COALESCING_COLUMNS = ["coalesce_key", "occurrence_count"]
+HOT_PATH_INDEXES = [
+    "ix_intake_submissions_created_at_id",
+    "ix_audit_events_created_at_id",
+    "ix_audit_events_resource",
+    "ix_audit_events_metadata_jsonb",
+    "ix_matters_lawyer_id_last_activity_at",
+    "ix_matters_client_id_last_activity_at",
+    "ix_matters_lawyer_id_last_message_at",
+    "ix_matters_lawyer_id_created_at",
+    "ix_matters_client_id_created_at",
+    "ix_documents_matter_id_created_at",
+    "ix_document_access_tokens_document_id",
+    "ix_matter_notes_matter_id_type_created_at",
+    "ix_matter_messages_matter_id_created_at",
+    "ix_notifications_user_id_is_read",
+    "ix_notifications_user_id_created_at",
+    "uq_notifications_coalesce_key",
+    "ix_matter_events_matter_id_created_at",
+]
+
+
+def _create_tables(conn):
+    # Existing tables are left alone; their later columns come from versions 2-7.
+    baseline.create_all(bind=conn, checkfirst=True)
+
+
+def _drop_tables(conn):
+    baseline.drop_all(bind=conn, checkfirst=True)
+
+
+def _add_columns(table_name, column_names):
+    def upgrade(conn):
+        for column_name in column_names:
+            add_column(conn, table_name, column_name)
+
+    def downgrade(conn):
+        for column_name in reversed(column_names):
+            drop_column(conn, table_name, column_name)
+
+    return upgrade, downgrade
+
+
+def _create_indexes(index_names):
+    def upgrade(conn):
+        for name in index_names:
+            create_index(conn, name)
+
+    def downgrade(conn):
+        for name in reversed(index_names):
+            drop_index(conn, name)
+
+    return upgrade, downgrade
+
+
+def _add_column_outside_transaction(conn, table_name: str, column_name: str):
+    """add_column() on an autocommit connection, still bounded by POSTGRES_LOCK_TIMEOUT."""
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SET lock_timeout = '{POSTGRES_LOCK_TIMEOUT}'")
+    try:
+        add_column(conn, table_name, column_name)
+    finally:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("RESET lock_timeout")
+
+
+def _backfill_column(conn, table_name: str, column_name: str, value_sql: str):
+    """
+    Set `column_name` to `value_sql` where it is NULL, BACKFILL_CHUNK_SIZE ids
+    per statement. On an autocommit connection each batch commits on its own,
+    instead of one UPDATE holding row locks on the whole table (and on
+    PostgreSQL writing it all out again) in a single transaction. An
+    interrupted run resumes with the rows still NULL.
+    """
+    max_id = conn.exec_driver_sql(f"SELECT MAX(id) FROM {table_name}").scalar() or 0
+    for low in range(0, max_id, BACKFILL_CHUNK_SIZE):
+        conn.execute(
+            text(
+                f"UPDATE {table_name} SET {column_name} = {value_sql} "
+                f"WHERE id > :low AND id <= :high AND {column_name} IS NULL"
+            ),
+            {"low": low, "high": low + BACKFILL_CHUNK_SIZE},
+        )
+
+
+def _add_notification_change_seq(conn):
+    _add_column_outside_transaction(conn, "notifications", "change_seq")
+    # Existing rows keep their id order; new values continue after the largest.
+    _backfill_column(conn, "notifications", "change_seq", "id")
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("CREATE SEQUENCE IF NOT EXISTS notification_change_seq")
+        conn.exec_driver_sql(
+            "SELECT setval('notification_change_seq', "
+            "(SELECT COALESCE(MAX(change_seq), 0) + 1 FROM notifications), false)"
+        )
+
+
+def _drop_notification_change_seq(conn):
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("DROP SEQUENCE IF EXISTS notification_change_seq")
+    drop_column(conn, "notifications", "change_seq")
+
+
+def _add_notification_last_occurred_at(conn):
+    _add_column_outside_transaction(conn, "notifications", "last_occurred_at")
+    # Rows written before coalescing bumps were tracked last occurred when created.
+    _backfill_column(conn, "notifications", "last_occurred_at", "created_at")
+
+
+def _drop_notification_last_occurred_at(conn):
+    drop_column(conn, "notifications", "last_occurred_at")
+
+
+MIGRATIONS = [
+    # Baseline: the tables without the columns and indexes of later versions.
+    Migration(1, "create_tables", _create_tables, _drop_tables),
+    # Run `python manage.py backfill-matter-activity` after this on existing data.
+    Migration(2, "matter_activity_columns", *_add_columns("matters", MATTER_ACTIVITY_COLUMNS)),
+    Migration(
+        3,
+        "notification_coalescing_columns",
+        *_add_columns("notifications", NOTIFICATION_COALESCING_COLUMNS),
+    ),
+    Migration(4, "hot_path_indexes", *_create_indexes(HOT_PATH_INDEXES), transactional=False),
+    Migration(
+        5,
+        "notification_change_seq",
+        _add_notification_change_seq,
+        _drop_notification_change_seq,
+        transactional=False,
+    ),
+    Migration(
+        6,
+        "notification_change_seq_index",
+        *_create_indexes(["ix_notifications_user_id_change_seq"]),
+        transactional=False,
+    ),
+    Migration(
+        7,
+        "notification_last_occurred_at",
+        _add_notification_last_occurred_at,
+        _drop_notification_last_occurred_at,
+        transactional=False,
+    ),
+    Migration(
+        8,
+        "notification_last_occurred_at_index",
+        *_create_indexes(["ix_notifications_user_id_last_occurred_at"]),
+        transactional=False,
+    ),
+]
+
+
+def create_rate_limit_table(engine):
+    """
+    Create only rate_limit_buckets, for a dedicated RATE_LIMIT_DATABASE_URL.
+    The main database gets the table from version 1.
+    """
+    schema.tables["rate_limit_buckets"].create(bind=engine, checkfirst=True)
+
+
+@contextmanager
+def migration_lock(engine):
+    """Hold a PostgreSQL advisory lock so concurrent runs apply each migration once."""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql(f"SELECT pg_advisory_lock({MIGRATION_LOCK_ID})")
+        try:
+            yield
+        finally:
+            conn.exec_driver_sql(f"SELECT pg_advisory_unlock({MIGRATION_LOCK_ID})")
+
+
+def applied_versions(conn) -> dict:
+    """{version: applied_at} for every recorded migration."""
+    if not inspect(conn).has_table(schema_migrations.name):
+        return {}
+    return dict(
+        conn.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at)).all()
+    )
+
+
+def _run(engine, migration: Migration, step, record):
+    if not migration.transactional:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            step(conn)
+        with engine.begin() as conn:
+            record(conn)
+        return
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{POSTGRES_LOCK_TIMEOUT}'")
+        step(conn)
+        record(conn)
+
+
+def upgrade(engine, target: int | None = None, progress=None) -> list[Migration]:
+    """Apply pending migrations up to `target` (default: all); returns those applied."""
+    applied = []
+    with migration_lock(engine):
+        schema_migrations.create(bind=engine, checkfirst=True)
+        with engine.connect() as conn:
+            done = applied_versions(conn)
+        for migration in MIGRATIONS:
+            if migration.version in done or (target is not None and migration.version > target):
+                continue
+            _run(
+                engine,
+                migration,
+                migration.upgrade,
+                lambda conn, m=migration: conn.execute(
+                    schema_migrations.insert().values(version=m.version, name=m.name)
+                ),
+            )
+            applied.append(migration)
+            if progress:
+                progress(migration)
+    return applied
+
+
+def downgrade(engine, target: int | None = None, progress=None) -> list[Migration]:
+    """
+    Revert applied migrations above `target`, newest first; without a
+    target only the latest one is reverted. Returns those reverted.
+    """
+    reverted = []
+    with migration_lock(engine):
+        with engine.connect() as conn:
+            done = applied_versions(conn)
+        if not done:
+            return reverted
+        if target is None:
+            target = max(done) - 1
+        to_revert = [
+            migration
+            for migration in reversed(MIGRATIONS)
+            if migration.version in done and migration.version > target
+        ]
+        for migration in to_revert:
+            if migration.downgrade is None:
+                raise ValueError(
+                    f"Migration {migration.version} ({migration.name}) cannot be reverted"
+                )
+        for migration in to_revert:
+            _run(
+                engine,
+                migration,
+                migration.downgrade,
+                lambda conn, m=migration: conn.execute(
+                    schema_migrations.delete().where(schema_migrations.c.version == m.version)
+                ),
+            )
+            reverted.append(migration)
+            if progress:
+                progress(migration)
+    return reverted
+
+
+def migration_status(engine) -> list[dict]:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    return [
+        {
+            "version": migration.version,
+            "name": migration.name,
+            "applied_at": done.get(migration.version),
+        }
+        for migration in MIGRATIONS
+    ]
+
+
+def check_schema_on_startup(engine, mode: str):
+    """
+    Startup hook. Reads schema_migrations only, so boot time does not depend
+    on the number of tables; `upgrade` applies pending migrations instead.
+    """
+    if mode not in STARTUP_MODES:
+        raise ValueError(f"Unknown SCHEMA_STARTUP_MODE: {mode}")
+    if mode == "upgrade":
+        for migration in upgrade(engine):
+            print(f"Applied schema migration {migration.version} ({migration.name})")
+        return
+
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    pending = [migration for migration in MIGRATIONS if migration.version not in done]
+    if not pending:
+        return
+    names = ", ".join(f"{migration.version} ({migration.name})" for migration in pending)
+    message = f"pending schema migrations: {names}; run `python manage.py migrate upgrade`"
+    if mode == "strict":
+        raise RuntimeError(f"Database schema is out of date, {message}")
+    print(f"WARNING: {message}")
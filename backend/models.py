@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, func, ForeignKey
+from sqlalchemy import BigInteger, Boolean, Column, Float, Index, Integer, String, Text, DateTime, cast, func, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship     
 
@@ -59,6 +60,10 @@ class IntakeSubmission(Base):
         foreign_keys=[converted_matter_id],
     )
 
+    __table_args__ = (
+        Index("ix_intake_submissions_created_at_id", "created_at", "id"),
+    )
+
 
 class User(Base):
     __tablename__ = "users"
@@ -87,6 +92,14 @@ class UserSession(Base):
     user = relationship("User", backref="sessions")
 
 
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False, index=True)  # unix timestamp
+
+
 class AuditEvent(Base):
     __tablename__ = "audit_events"
 
@@ -102,6 +115,19 @@ class AuditEvent(Base):
 
     user = relationship("User", backref="audit_events")
 
+    __table_args__ = (
+        Index("ix_audit_events_created_at_id", "created_at", "id"),
+        Index("ix_audit_events_resource", "resource_type", "resource_id", "created_at"),
+    )
+
+
+# Lets metadata containment filters (metadata_json::jsonb @> ...) use an index.
+Index(
+    "ix_audit_events_metadata_jsonb",
+    cast(AuditEvent.metadata_json, JSONB),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
 class Matter(Base):
     __tablename__ = "matters"
     id = Column(Integer, primary_key=True, index=True)
@@ -114,9 +140,25 @@ class Matter(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Maintained by matter_activity.record_matter_activity().
+    last_message_at = Column(DateTime(timezone=True), nullable=True)
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    document_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped with every matter event; used as the ETag of the matter's resources.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     client = relationship("User", foreign_keys=[client_id], backref="client_matters")
     lawyer = relationship("User", foreign_keys=[lawyer_id], backref="lawyer_matters")
 
+    __table_args__ = (
+        Index("ix_matters_lawyer_id_last_activity_at", "lawyer_id", "last_activity_at"),
+        Index("ix_matters_client_id_last_activity_at", "client_id", "last_activity_at"),
+        Index("ix_matters_lawyer_id_last_message_at", "lawyer_id", "last_message_at"),
+        Index("ix_matters_lawyer_id_created_at", "lawyer_id", "created_at", "id"),
+        Index("ix_matters_client_id_created_at", "client_id", "created_at", "id"),
+    )
+
 class Document(Base):
     __tablename__ = "documents"
 
@@ -131,12 +173,16 @@ class Document(Base):
     matter = relationship("Matter", backref="documents")
     uploaded_by = relationship("User")
 
+    __table_args__ = (
+        Index("ix_documents_matter_id_created_at", "matter_id", "created_at", "id"),
+    )
+
 
 class DocumentAccessToken(Base):
     __tablename__ = "document_access_tokens"
 
     id = Column(Integer, primary_key=True, index=True)
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     token = Column(String, nullable=False, unique=True, index=True)
     expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -159,6 +205,10 @@ class MatterNote(Base):
     matter = relationship("Matter", backref="matter_notes")
     user = relationship("User", backref="matter_notes")
 
+    __table_args__ = (
+        Index("ix_matter_notes_matter_id_type_created_at", "matter_id", "note_type", "created_at", "id"),
+    )
+
 
 class MatterMessage(Base):
     __tablename__ = "matter_messages"
@@ -172,6 +222,10 @@ class MatterMessage(Base):
     matter = relationship("Matter", backref="messages")
     sender = relationship("User", backref="matter_messages")
 
+    __table_args__ = (
+        Index("ix_matter_messages_matter_id_created_at", "matter_id", "created_at", "id"),
+    )
+
 
 class Notification(Base):
     __tablename__ = "notifications"
@@ -187,10 +241,40 @@ class Notification(Base):
     is_read = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     read_at = Column(DateTime(timezone=True), nullable=True)
+    # Set only while a coalesced notification is unread: "user:matter:type".
+    coalesce_key = Column(String(255), nullable=True)
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1")
+    # Strictly increasing, taken again on every coalescing bump (see
+    # next_notification_change_seq); /sync pages on it.
+    change_seq = Column(BigInteger, nullable=True)
+    # When the latest coalesced occurrence happened; created_at never changes.
+    last_occurred_at = Column(DateTime(timezone=True), nullable=True, default=func.now())
 
     user = relationship("User", backref="notifications")
     matter = relationship("Matter", backref="notifications")
 
+    __table_args__ = (
+        Index("ix_notifications_user_id_is_read", "user_id", "is_read"),
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at", "id"),
+        Index("uq_notifications_coalesce_key", "coalesce_key", unique=True),
+        Index("ix_notifications_user_id_change_seq", "user_id", "change_seq"),
+        Index(
+            "ix_notifications_user_id_last_occurred_at", "user_id", "last_occurred_at", "id"
+        ),
+    )
+
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
 
 class MatterEvent(Base):
     __tablename__ = "matter_events"
@@ -205,6 +289,10 @@ class MatterEvent(Base):
     matter = relationship("Matter", backref="matter_events")
     user = relationship("User", backref="matter_events")
 
+    __table_args__ = (
+        Index("ix_matter_events_matter_id_created_at", "matter_id", "created_at", "id"),
+    )
+
 
 class ClientInvitation(Base):
     __tablename__ = "client_invitations"
@@ -0,0 +1,116 @@
+"""
+Per-user unread notification counters.
+
+notification_counters holds one row per user, adjusted in the same
+transaction as the notification change, so /notifications/unread-count
+is a primary-key lookup instead of a COUNT(*) over notifications.
+Reads never create a row: until a user's first adjustment (or
+`python manage.py reconcile-unread-counters`) seeds it, they fall back to
+the COUNT(*).
+"""
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Notification, NotificationCounter
+
+
+def count_unread_notifications(db: Session, user_id: int) -> int:
+    return db.execute(
+        select(func.count(Notification.id)).where(
+            Notification.user_id == user_id,
+            Notification.is_read.is_(False),
+        )
+    ).scalar_one()
+
+
+def _seed_counter(db: Session, user_id: int) -> bool:
+    """Create the user's counter from the notifications table; False if it already exists."""
+    db.flush()
+    try:
+        with db.begin_nested():
+            db.add(
+                NotificationCounter(
+                    user_id=user_id,
+                    unread_count=count_unread_notifications(db, user_id),
+                )
+            )
+        return True
+    except IntegrityError:
+        return False
+
+
+def adjust_unread_count(db: Session, user_id: int, delta: int):
+    """
+    Apply `delta` to the user's counter in the current transaction.
+    A missing counter is seeded from the notifications table, which already
+    includes the change being made.
+    """
+    new_value = NotificationCounter.unread_count + delta
+    result = db.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id == user_id)
+        .values(unread_count=case((new_value < 0, 0), else_=new_value))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        return
+    if not _seed_counter(db, user_id):
+        # Another transaction created the row in the meantime.
+        adjust_unread_count(db, user_id, delta)
+
+
+def get_unread_count(db: Session, user_id: int) -> int:
+    value = db.execute(
+        select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id)
+    ).scalar()
+    if value is not None:
+        return value
+    # No counter yet; adjust_unread_count() seeds it with the next write.
+    return count_unread_notifications(db, user_id)
+
+
+def reconcile_unread_counters(db: Session, batch_size: int = 1000) -> int:
+    """
+    Recompute every counter from the notifications table and repair drift.
+    Returns the number of counters that were created or corrected.
+    """
+    actual = dict(
+        db.execute(
+            select(Notification.user_id, func.count(Notification.id))
+            .where(Notification.is_read.is_(False))
+            .group_by(Notification.user_id)
+        ).all()
+    )
+    stored = dict(
+        db.execute(select(NotificationCounter.user_id, NotificationCounter.unread_count)).all()
+    )
+
+    repaired = 0
+    for user_id in set(actual) | set(stored):
+        expected = actual.get(user_id, 0)
+        if stored.get(user_id) == expected:
+            continue
+        if user_id in stored:
+            # Recount inside the UPDATE so writes since the snapshot are not clobbered.
+            db.execute(
+                update(NotificationCounter)
+                .where(NotificationCounter.user_id == user_id)
+                .values(
+                    unread_count=select(func.count(Notification.id))
+                    .where(
+                        Notification.user_id == user_id,
+                        Notification.is_read.is_(False),
+                    )
+                    .scalar_subquery()
+                )
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            _seed_counter(db, user_id)
+        repaired += 1
+        if repaired % batch_size == 0:
+            db.commit()
+    db.commit()
+    return repaired
@@ -0,0 +1,253 @@
+"""
+Server-push delivery of notifications.
+
+create_notification() records each new notification on the session; once the
+transaction commits, the serialized notification is handed to a fan-out
+backend, which delivers it to the NotificationBroker of every worker.
+The broker feeds the asyncio queues behind the /notifications/stream
+server-sent-events connections of the recipient.
+
+    local     delivery within this process only (single worker, development)
+    postgres  LISTEN/NOTIFY on the main database, shared by every worker
+"""
+
+import asyncio
+import json
+import select
+import threading
+
+from sqlalchemy import event, text
+
+PENDING_KEY = "pending_notifications"
+PUBLISH_KEY = "notifications_to_publish"
+POSTGRES_CHANNEL = "ocl_notifications"
+# NOTIFY payloads are limited to 8000 bytes; larger notifications are sent
+# without their body and the client can fetch the full row.
+MAX_NOTIFY_PAYLOAD_BYTES = 7500
+
+
+class NotificationSubscriber:
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, max_queue_size: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.overflowed = False
+
+    def _put(self, message: dict):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The client is not keeping up; it is told to refetch instead.
+            self.overflowed = True
+
+
+class NotificationBroker:
+    """In-process pub/sub keyed by user id. deliver() is safe to call from any thread."""
+
+    def __init__(self, max_queue_size: int = 100, max_subscribers_per_user: int = 5):
+        self.max_queue_size = max_queue_size
+        self.max_subscribers_per_user = max_subscribers_per_user
+        self._subscribers: dict[int, set[NotificationSubscriber]] = {}
+        self._lock = threading.Lock()
+        self._delivered = 0
+
+    def subscribe(self, user_id: int) -> NotificationSubscriber | None:
+        """Register a stream for `user_id`; None when the user has too many open."""
+        subscriber = NotificationSubscriber(
+            user_id,
+            asyncio.get_running_loop(),
+            self.max_queue_size,
+        )
+        with self._lock:
+            streams = self._subscribers.setdefault(user_id, set())
+            if len(streams) >= self.max_subscribers_per_user:
+                return None
+            streams.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: NotificationSubscriber):
+        with self._lock:
+            streams = self._subscribers.get(subscriber.user_id)
+            if streams is None:
+                return
+            streams.discard(subscriber)
+            if not streams:
+                del self._subscribers[subscriber.user_id]
+
+    def deliver(self, user_id: int, message: dict):
+        with self._lock:
+            streams = list(self._subscribers.get(user_id, ()))
+        for subscriber in streams:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber._put, message)
+            except RuntimeError:
+                # Event loop already closed (worker shutting down).
+                self.unsubscribe(subscriber)
+                continue
+            self._delivered += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._subscribers),
+                "streams": sum(len(streams) for streams in self._subscribers.values()),
+                "delivered": self._delivered,
+            }
+
+
+class LocalNotificationFanout:
+    """Stand-in for a shared backend: delivers straight to this worker's broker."""
+
+    def __init__(self, broker: NotificationBroker):
+        self.broker = broker
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def publish(self, messages: list[dict]):
+        for message in messages:
+            self.broker.deliver(message["user_id"], message)
+
+
+class PostgresNotificationFanout:
+    """
+    Publishes with pg_notify() and runs one LISTEN connection per worker.
+    Every worker, including the publisher, receives the message through
+    LISTEN, so nothing is delivered locally twice.
+    """
+
+    def __init__(self, broker: NotificationBroker, engine, channel: str = POSTGRES_CHANNEL):
+        self.broker = broker
+        self.engine = engine
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._listen_forever,
+            name="notification-listener",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def publish(self, messages: list[dict]):
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for message in messages:
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.channel, "payload": encode_notify_payload(message)},
+                )
+
+    def _listen_forever(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception as listen_error:
+                print(f"Notification listener reconnecting after error: {listen_error}")
+                self._stop.wait(2)
+
+    def _listen(self):
+        raw = self.engine.raw_connection()
+        try:
+            dbapi_conn = raw.driver_connection
+            dbapi_conn.autocommit = True
+            with dbapi_conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            while not self._stop.is_set():
+                if select.select([dbapi_conn], [], [], 1.0) == ([], [], []):
+                    continue
+                dbapi_conn.poll()
+                while dbapi_conn.notifies:
+                    notify = dbapi_conn.notifies.pop(0)
+                    try:
+                        message = json.loads(notify.payload)
+                    except ValueError:
+                        continue
+                    self.broker.deliver(message["user_id"], message)
+        finally:
+            raw.invalidate()
+
+
+def encode_notify_payload(message: dict) -> str:
+    payload = json.dumps(message)
+    if len(payload.encode("utf-8")) <= MAX_NOTIFY_PAYLOAD_BYTES:
+        return payload
+    trimmed = dict(message, notification=dict(message["notification"], body=None, truncated=True))
+    return json.dumps(trimmed)
+
+
+def create_notification_fanout(backend: str, broker: NotificationBroker, engine):
+    if backend == "local":
+        return LocalNotificationFanout(broker)
+    if backend == "postgres":
+        if engine.dialect.name != "postgresql":
+            raise ValueError("NOTIFICATION_FANOUT_BACKEND=postgres requires a PostgreSQL DATABASE_URL")
+        return PostgresNotificationFanout(broker, engine)
+    raise ValueError(f"Unknown NOTIFICATION_FANOUT_BACKEND: {backend}")
+
+
+def install_publish_hooks(session_factory, fanout, serialize):
+    """
+    Publish notifications added with queue_notification() only after their
+    transaction commits. They are serialized right after the flush that
+    inserts them, while their columns are still loaded.
+    """
+
+    @event.listens_for(session_factory, "after_flush_postexec")
+    def _serialize_flushed(session, _flush_context):
+        pending = session.info.get(PENDING_KEY)
+        if not pending:
+            return
+        ready = [n for n in pending if n.id is not None]
+        if not ready:
+            return
+        session.info[PENDING_KEY] = [n for n in pending if n.id is None]
+        session.info.setdefault(PUBLISH_KEY, []).extend(
+            {"type": "notification", "user_id": n.user_id, "notification": serialize(n)}
+            for n in ready
+        )
+
+    @event.listens_for(session_factory, "after_commit")
+    def _publish_committed(session):
+        messages = session.info.pop(PUBLISH_KEY, None)
+        session.info.pop(PENDING_KEY, None)
+        if not messages:
+            return
+        try:
+            fanout.publish(messages)
+        except Exception as publish_error:
+            # The notification is committed; clients still see it on their next fetch.
+            print(f"Notification publish failed: {publish_error}")
+
+    @event.listens_for(session_factory, "after_soft_rollback")
+    def _discard_rolled_back(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(PUBLISH_KEY, None)
+            session.info.pop(PENDING_KEY, None)
+
+
+def queue_notification(db, notification):
+    db.info.setdefault(PENDING_KEY, []).append(notification)
+
+
+def format_sse(data: dict | None = None, *, event_name: str | None = None, event_id=None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event_name:
+        lines.append(f"event: {event_name}")
+    lines.append(f"data: {json.dumps(data if data is not None else {})}")
+    return "\n".join(lines) + "\n\n"
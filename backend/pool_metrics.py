@@ -0,0 +1,159 @@
+"""
+Connection pool instrumentation.
+
+The engines in database.py use InstrumentedQueuePool (and its asyncio
+variant), which times every checkout and keeps counters next to the pool's
+live occupancy: how long requests waited for a connection, how often the
+overflow was needed, checkouts that hit pool_timeout, and connections
+replaced after a failed pre-ping. A checkout slower than
+`slow_checkout_seconds` is logged, at most once per
+SLOW_CHECKOUT_WARNING_INTERVAL_SECONDS per pool.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+SLOW_CHECKOUT_WARNING_INTERVAL_SECONDS = 10.0
+
+
+class PoolMetrics:
+    def __init__(self, name: str = "", slow_checkout_seconds: float = 0.1):
+        self.name = name
+        self.slow_checkout_seconds = slow_checkout_seconds
+        self._lock = threading.Lock()
+        self._last_warning_at = float("-inf")
+        self._suppressed_warnings = 0
+        self._stats = {
+            "checkouts": 0,
+            "overflow_checkouts": 0,
+            "slow_checkouts": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "invalidations": 0,
+            "pre_ping_failures": 0,
+            "peak_checked_out": 0,
+        }
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def record_checkout(self, wait_seconds: float, checked_out: int, overflow: int, capacity: int):
+        warning = None
+        with self._lock:
+            stats = self._stats
+            stats["checkouts"] += 1
+            if overflow > 0:
+                stats["overflow_checkouts"] += 1
+            stats["peak_checked_out"] = max(stats["peak_checked_out"], checked_out)
+            self._wait_seconds_total += wait_seconds
+            self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+            if wait_seconds >= self.slow_checkout_seconds:
+                stats["slow_checkouts"] += 1
+                now = time.monotonic()
+                if now - self._last_warning_at >= SLOW_CHECKOUT_WARNING_INTERVAL_SECONDS:
+                    warning = self._suppressed_warnings
+                    self._last_warning_at = now
+                    self._suppressed_warnings = 0
+                else:
+                    self._suppressed_warnings += 1
+        if warning is not None:
+            print(
+                f"WARNING: {self.name} database pool checkout waited {wait_seconds * 1000:.0f} ms "
+                f"({checked_out} of {capacity} connections in use"
+                + (f"; {warning} more slow checkouts not logged" if warning else "")
+                + ")"
+            )
+
+    def record_timeout(self, wait_seconds: float):
+        with self._lock:
+            self._stats["timeouts"] += 1
+            self._wait_seconds_total += wait_seconds
+            self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+        print(f"WARNING: {self.name} database pool checkout timed out after {wait_seconds:.1f}s")
+
+    def record_connect(self):
+        with self._lock:
+            self._stats["connects"] += 1
+
+    def record_invalidation(self, error):
+        with self._lock:
+            self._stats["invalidations"] += 1
+            # Pre-ping failures surface as a DisconnectionError on checkout.
+            if isinstance(error, exc.DisconnectionError):
+                self._stats["pre_ping_failures"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = self._stats["checkouts"] + self._stats["timeouts"]
+            return {
+                **self._stats,
+                "wait_ms_total": round(self._wait_seconds_total * 1000, 1),
+                "wait_ms_avg": round(self._wait_seconds_total * 1000 / waits, 3) if waits else 0.0,
+                "wait_ms_max": round(self._wait_seconds_max * 1000, 1),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time into `self.metrics`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        # Includes opening a new connection when the pool had none idle.
+        self.metrics.record_checkout(
+            time.perf_counter() - started,
+            self.checkedout(),
+            self.overflow(),
+            self.size() + self._max_overflow,
+        )
+        return record
+
+    def stats(self) -> dict:
+        return {
+            "name": self.metrics.name,
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self._timeout,
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            **self.metrics.stats(),
+        }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine, name: str, slow_checkout_seconds: float):
+    """Name the pool's metrics and count new and invalidated connections."""
+    metrics = engine.pool.metrics
+    metrics.name = name
+    metrics.slow_checkout_seconds = slow_checkout_seconds
+
+    # Pool event listeners carry over to the pool recreated by dispose().
+    @event.listens_for(engine, "connect")
+    def _count_connect(_dbapi_connection, _record):
+        metrics.record_connect()
+
+    @event.listens_for(engine, "invalidate")
+    def _count_invalidation(_dbapi_connection, _record, error):
+        metrics.record_invalidation(error)
+
+    return engine
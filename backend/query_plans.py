@@ -0,0 +1,416 @@
+"""
+Query-plan regression check for the hot queries in main.py.
+
+HOT_QUERIES builds each query with the same helper the endpoint runs, so a
+change to an endpoint's filters or ordering is what gets explained.
+check_query_plans() seeds a scratch database with a realistic spread of
+users and matters, runs ANALYZE and EXPLAINs each query; a full table scan
+of a table with more than `row_threshold` rows is reported as a failure, so
+a dropped or mis-ordered index shows up before it reaches production.
+
+    sqlite      EXPLAIN QUERY PLAN; "SCAN <table>" without an index fails
+    postgresql  EXPLAIN (FORMAT JSON); a "Seq Scan" node fails
+"""
+
+import json
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, insert, inspect, select, text
+from sqlalchemy.orm import Session
+
+from main import (
+    MATTER_SORT_COLUMNS,
+    NOTIFICATION_LIST_LIMIT,
+    PageParams,
+    accessible_matter_ids_query,
+    audit_events_page_query,
+    coalesced_notification_query,
+    document_access_token_query,
+    encode_cursor,
+    intake_submissions_query,
+    lawyer_inbox_query,
+    matter_documents_query,
+    matter_events_query,
+    matter_messages_query,
+    matter_notes_query,
+    my_matters_query,
+    page_query,
+    recent_notifications_query,
+    refresh_session_query,
+    sync_stream_queries,
+    unread_by_matter_query,
+)
+from migrations import check_schema_on_startup, upgrade
+from models import (
+    AuditEvent,
+    Document,
+    DocumentAccessToken,
+    IntakeSubmission,
+    Matter,
+    MatterEvent,
+    MatterMessage,
+    MatterNote,
+    Notification,
+    User,
+    UserSession,
+)
+
+PAGE_SIZE = 50
+SQLITE_SCAN_PATTERN = re.compile(r"^SCAN (\w+)(?: AS \w+)?(.*)$")
+
+
+def _first_page():
+    return PageParams(PAGE_SIZE, None, None)
+
+
+def _older_page(p):
+    return PageParams(PAGE_SIZE, encode_cursor(p["since"], p["cursor_id"]), None)
+
+
+def _paged(db, query, page, created_at_column, id_column, oldest_first=False):
+    return page_query(
+        query, page, created_at_column, id_column, db.get_bind().dialect.name, oldest_first
+    )
+
+
+def _matters(db, user, page, sort="created", active_since=None):
+    sort_column, _sort_value = MATTER_SORT_COLUMNS[sort]
+    return _paged(db, my_matters_query(db, user, active_since), page, sort_column, Matter.id)
+
+
+def _sync_stream(stream):
+    return lambda db, p: sync_stream_queries(db, p["client"], p["sync_state"])[stream]
+
+
+# name -> build(db, params); the result is an ORM Query or a Core select.
+HOT_QUERIES = {
+    "matters_by_lawyer": lambda db, p: _matters(db, p["lawyer"], _first_page()),
+    "matters_by_client": lambda db, p: _matters(db, p["client"], _first_page()),
+    "matters_by_lawyer_with_cursor": lambda db, p: _matters(db, p["lawyer"], _older_page(p)),
+    "matters_by_activity": lambda db, p: _matters(
+        db, p["lawyer"], _first_page(), sort="activity", active_since=p["since"]
+    ),
+    "accessible_matter_ids": lambda db, p: accessible_matter_ids_query(p["client"]),
+    "matter_messages": lambda db, p: _paged(
+        db,
+        matter_messages_query(db, p["matter_id"]),
+        _first_page(),
+        MatterMessage.created_at,
+        MatterMessage.id,
+        oldest_first=True,
+    ),
+    "matter_events": lambda db, p: _paged(
+        db,
+        matter_events_query(db, p["client"], p["matter_id"]),
+        _first_page(),
+        MatterEvent.created_at,
+        MatterEvent.id,
+    ),
+    "matter_documents": lambda db, p: _paged(
+        db,
+        matter_documents_query(db, p["matter_id"]),
+        _first_page(),
+        Document.created_at,
+        Document.id,
+    ),
+    "matter_shared_updates": lambda db, p: _paged(
+        db,
+        matter_notes_query(db, p["matter_id"], "shared"),
+        _first_page(),
+        MatterNote.created_at,
+        MatterNote.id,
+    ),
+    "document_access_token": lambda db, p: document_access_token_query(db, p["access_token"]),
+    "lawyer_inbox": lambda db, p: lawyer_inbox_query(db, p["lawyer"].id, PAGE_SIZE),
+    "notifications_by_user": lambda db, p: recent_notifications_query(
+        db, p["client"].id, NOTIFICATION_LIST_LIMIT
+    ),
+    "unread_by_matter": lambda db, p: unread_by_matter_query(db, p["client"].id),
+    "coalesced_notification": lambda db, p: coalesced_notification_query(db, p["coalesce_key"]),
+    "sync_messages": _sync_stream("messages"),
+    "sync_events": _sync_stream("events"),
+    "sync_notes": _sync_stream("notes"),
+    "sync_documents": _sync_stream("documents"),
+    "sync_notifications": _sync_stream("notifications"),
+    "audit_events": lambda db, p: audit_events_page_query(
+        db.get_bind().dialect.name, PAGE_SIZE
+    ),
+    "audit_events_with_cursor": lambda db, p: audit_events_page_query(
+        db.get_bind().dialect.name, PAGE_SIZE, encode_cursor(p["since"], p["cursor_id"])
+    ),
+    "audit_by_resource": lambda db, p: audit_events_page_query(
+        db.get_bind().dialect.name,
+        PAGE_SIZE,
+        resource_type="document",
+        resource_id=str(p["document_id"]),
+    ),
+    "intake_submissions": lambda db, p: _paged(
+        db,
+        intake_submissions_query(db),
+        _first_page(),
+        IntakeSubmission.created_at,
+        IntakeSubmission.id,
+    ),
+    "intake_submissions_with_cursor": lambda db, p: _paged(
+        db,
+        intake_submissions_query(db),
+        _older_page(p),
+        IntakeSubmission.created_at,
+        IntakeSubmission.id,
+    ),
+    "session_by_refresh_hash": lambda db, p: refresh_session_query(db, p["refresh_hash"]),
+}
+
+
+def _insert_chunks(conn, model, rows, chunk_size=2000):
+    for start in range(0, len(rows), chunk_size):
+        conn.execute(insert(model), rows[start:start + chunk_size])
+
+
+def seed_database(engine, rows: int) -> dict:
+    """
+    Fill an empty database with about `rows` messages, notifications and
+    events spread over rows/20 matters, one lawyer per 10 clients.
+    Returns the parameters the hot queries are explained with.
+    """
+    matter_count = max(rows // 20, 10)
+    client_count = max(matter_count // 2, 5)
+    lawyer_count = max(client_count // 10, 2)
+    now = datetime.now(timezone.utc)
+
+    def at(i):
+        return now - timedelta(minutes=i)
+
+    with engine.begin() as conn:
+        users = [
+            {"id": i, "name": f"Lawyer {i}", "email": f"lawyer{i}@example.test",
+             "password_hash": "x", "role": "lawyer", "created_at": at(i)}
+            for i in range(1, lawyer_count + 1)
+        ]
+        users += [
+            {"id": i, "name": f"Client {i}", "email": f"client{i}@example.test",
+             "password_hash": "x", "role": "client", "created_at": at(i)}
+            for i in range(lawyer_count + 1, lawyer_count + client_count + 1)
+        ]
+        _insert_chunks(conn, User, users)
+        client_ids = [u["id"] for u in users if u["role"] == "client"]
+
+        matters = []
+        for i in range(1, matter_count + 1):
+            matters.append({
+                "id": i, "title": f"Matter {i}", "status": "Open",
+                "client_id": client_ids[i % client_count],
+                "lawyer_id": 1 + i % lawyer_count,
+                "created_at": at(i), "last_activity_at": at(i // 2), "last_message_at": at(i // 2),
+            })
+        _insert_chunks(conn, Matter, matters)
+
+        _insert_chunks(conn, MatterMessage, [
+            {"id": i, "matter_id": 1 + i % matter_count, "sender_id": 1 + i % lawyer_count,
+             "body": "message", "created_at": at(i)}
+            for i in range(1, rows + 1)
+        ])
+        _insert_chunks(conn, MatterEvent, [
+            {"id": i, "matter_id": 1 + i % matter_count, "event_type": "message_sent",
+             "message": "event", "created_at": at(i)}
+            for i in range(1, rows + 1)
+        ])
+        _insert_chunks(conn, MatterNote, [
+            {"id": i, "matter_id": 1 + i % matter_count, "user_id": 1 + i % lawyer_count,
+             "note_type": "shared" if i % 2 else "internal", "content": "note", "created_at": at(i)}
+            for i in range(1, rows // 2 + 1)
+        ])
+        _insert_chunks(conn, Document, [
+            {"id": i, "matter_id": 1 + i % matter_count, "filename": f"doc{i}.pdf",
+             "s3_key": f"matters/{i}", "uploaded_by_id": 1 + i % lawyer_count, "created_at": at(i)}
+            for i in range(1, rows // 2 + 1)
+        ])
+        _insert_chunks(conn, DocumentAccessToken, [
+            {"id": i, "document_id": 1 + i % (rows // 2), "user_id": 1,
+             "token": f"token-{i}", "expires_at": at(-60), "created_at": at(i)}
+            for i in range(1, rows // 2 + 1)
+        ])
+        _insert_chunks(conn, Notification, [
+            {"id": i, "user_id": client_ids[i % client_count], "type": "new_message",
+             "title": "New message", "matter_id": 1 + i % matter_count,
+             "is_read": i % 3 == 0, "created_at": at(i), "last_occurred_at": at(i),
+             "occurrence_count": 1, "change_seq": i,
+             "coalesce_key": f"{client_ids[i % client_count]}:{1 + i % matter_count}:{i}"}
+            for i in range(1, rows + 1)
+        ])
+        _insert_chunks(conn, AuditEvent, [
+            {"id": i, "user_id": 1 + i % lawyer_count, "event_type": "document_downloaded",
+             "resource_type": "document", "resource_id": str(1 + i % (rows // 2)),
+             "created_at": at(i)}
+            for i in range(1, rows + 1)
+        ])
+        _insert_chunks(conn, IntakeSubmission, [
+            {"id": i, "name": f"Prospect {i}", "email": f"prospect{i}@example.test",
+             "description": "intake", "status": "new", "created_at": at(i)}
+            for i in range(1, rows // 2 + 1)
+        ])
+        _insert_chunks(conn, UserSession, [
+            {"id": i, "user_id": client_ids[i % client_count], "refresh_token_hash": f"hash-{i}",
+             "created_at": at(i), "expires_at": at(-60)}
+            for i in range(1, client_count * 2 + 1)
+        ])
+
+    return _query_params(
+        lawyer_id=1,
+        client_id=client_ids[0],
+        matter_id=1,
+        document_id=1,
+        after_id=rows // 2,
+        since=at(60),
+        cursor_id=60,
+        access_token="token-1",
+        coalesce_key=f"{client_ids[0]}:1:1",
+        refresh_hash="hash-1",
+    )
+
+
+def _query_params(lawyer_id, client_id, after_id, **params) -> dict:
+    """Parameters for HOT_QUERIES; users are transient, only id and role are read."""
+    return {
+        **params,
+        "lawyer": User(id=lawyer_id, role="lawyer"),
+        "client": User(id=client_id, role="client"),
+        "sync_state": {
+            "messages": after_id,
+            "events": after_id,
+            "notes": after_id // 2,
+            "documents": after_id // 2,
+            "notifications": after_id,
+            "seen": {},
+        },
+    }
+
+
+def _explain_params(compiled) -> dict | list:
+    params = {
+        name: value.isoformat(sep=" ") if isinstance(value, datetime) else value
+        for name, value in compiled.params.items()
+    }
+    if compiled.positional:
+        return tuple(params[name] for name in compiled.positiontup)
+    return params
+
+
+def _table_rows(conn, dialect_name: str) -> dict:
+    if dialect_name == "postgresql":
+        return dict(conn.exec_driver_sql(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r'"
+        ).all())
+    return {
+        table: conn.exec_driver_sql(f'SELECT COUNT(*) FROM "{table}"').scalar()
+        for table in inspect(conn).get_table_names()
+    }
+
+
+def _sqlite_full_scans(conn, sql: str, params) -> tuple[list[str], list[str]]:
+    plan = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params).all()]
+    scans = []
+    for detail in plan:
+        match = SQLITE_SCAN_PATTERN.match(detail)
+        if match and "INDEX" not in match.group(2):
+            scans.append(match.group(1))
+    return plan, scans
+
+
+def _postgres_full_scans(conn, sql: str, params) -> tuple[list[str], list[str]]:
+    raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+    plan = json.loads(raw) if isinstance(raw, str) else raw
+    lines, scans = [], []
+
+    def walk(node, depth=0):
+        relation = node.get("Relation Name")
+        lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else ""))
+        if node["Node Type"] == "Seq Scan":
+            scans.append(relation)
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"])
+    return lines, scans
+
+
+def explain_hot_queries(engine, params: dict, row_threshold: int) -> list[dict]:
+    """EXPLAIN every hot query; each result lists the plan and the offending scans."""
+    dialect_name = engine.dialect.name
+    explain = _postgres_full_scans if dialect_name == "postgresql" else _sqlite_full_scans
+    results = []
+    with engine.connect() as conn, Session(bind=conn) as db:
+        table_rows = _table_rows(conn, dialect_name)
+        for name, build in HOT_QUERIES.items():
+            query = build(db, params)
+            statement = getattr(query, "statement", query)
+            compiled = statement.compile(
+                dialect=engine.dialect, compile_kwargs={"render_postcompile": True}
+            )
+            plan, scans = explain(conn, str(compiled), _explain_params(compiled))
+            results.append({
+                "name": name,
+                "plan": plan,
+                "full_scans": sorted({
+                    table for table in scans
+                    if table in table_rows and table_rows[table] > row_threshold
+                }),
+            })
+    return results
+
+
+def check_query_plans(database_url: str | None = None, rows: int = 20000, row_threshold: int = 1000):
+    """
+    Seed a database and explain the hot queries against it. Without
+    `database_url` that is a temporary SQLite file, migrated here. A supplied
+    database is never migrated: it must already be at the latest schema
+    version (RuntimeError otherwise), is seeded only if it has no matters, and
+    is explained as it is when it does.
+    """
+    scratch_path = None
+    if not database_url:
+        handle, scratch_path = tempfile.mkstemp(prefix="query-plans-", suffix=".db")
+        os.close(handle)
+        database_url = f"sqlite:///{scratch_path}"
+
+    engine = create_engine(database_url, future=True)
+    try:
+        if scratch_path:
+            upgrade(engine)
+        else:
+            check_schema_on_startup(engine, "strict")
+        with engine.connect() as conn:
+            seeded = conn.execute(select(func.count(Matter.id))).scalar()
+        if seeded:
+            params = _params_from_existing(engine)
+        else:
+            params = seed_database(engine, rows)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        return explain_hot_queries(engine, params, row_threshold)
+    finally:
+        engine.dispose()
+        if scratch_path:
+            os.remove(scratch_path)
+
+
+def _params_from_existing(engine) -> dict:
+    with engine.connect() as conn:
+        matter = conn.execute(select(Matter).order_by(Matter.id.desc()).limit(1)).first()
+        document_id = conn.execute(select(func.max(Document.id))).scalar() or 0
+        after_id = conn.execute(select(func.max(MatterMessage.id))).scalar() or 0
+    return _query_params(
+        lawyer_id=matter.lawyer_id,
+        client_id=matter.client_id,
+        matter_id=matter.id,
+        document_id=document_id,
+        after_id=after_id,
+        since=datetime.now(timezone.utc) - timedelta(days=30),
+        cursor_id=matter.id,
+        access_token="",
+        coalesce_key=f"{matter.client_id}:{matter.id}:new_message",
+        refresh_hash="",
+    )
@@ -0,0 +1,131 @@
+"""Token-bucket rate limiting with pluggable storage backends."""
+
+import threading
+import time
+
+from sqlalchemy import case, create_engine, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import sessionmaker
+
+from migrations import create_rate_limit_table
+from models import RateLimitBucket
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE ... RETURNING (SQLite >= 3.35).
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class MemoryRateLimitBackend:
+    """
+    Per-process buckets: one (tokens, updated_at) pair per key.
+    Keys idle long enough to have refilled completely are swept periodically.
+    """
+
+    def __init__(self, idle_seconds: float, sweep_interval_seconds: float = 60):
+        self.idle_seconds = idle_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> bool:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if now - self._last_sweep >= self.sweep_interval_seconds:
+                self._sweep(now)
+        return allowed
+
+    def _sweep(self, now: float):
+        stale_before = now - self.idle_seconds
+        stale_keys = [
+            key for key, (_tokens, updated_at) in self._buckets.items() if updated_at < stale_before
+        ]
+        for key in stale_keys:
+            del self._buckets[key]
+        self._last_sweep = now
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+class SQLRateLimitBackend:
+    """
+    Buckets in the rate_limit_buckets table, shared by every worker using the
+    same database. Each check is one upsert, so concurrent workers cannot
+    both spend the last token. The table comes from the migrations.
+    """
+
+    def __init__(self, engine, idle_seconds: float, sweep_interval_seconds: float = 300):
+        if engine.dialect.name not in UPSERT_DIALECTS:
+            raise ValueError(f"The sql rate limit backend does not support {engine.dialect.name}")
+        self.engine = engine
+        self.idle_seconds = idle_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._insert = UPSERT_DIALECTS[engine.dialect.name]
+        self._session_factory = sessionmaker(bind=engine, autoflush=False)
+        self._last_sweep = time.time()
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> bool:
+        now = time.time()
+        refilled = RateLimitBucket.tokens + (now - RateLimitBucket.updated_at) * refill_per_second
+        available = case((refilled > capacity, float(capacity)), else_=refilled)
+
+        # When the bucket is empty the conflict update is skipped, so
+        # RETURNING yields a row exactly when a token was spent.
+        stmt = self._insert(RateLimitBucket).values(
+            key=key,
+            tokens=float(capacity - 1),
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RateLimitBucket.key],
+            set_={"tokens": available - 1, "updated_at": now},
+            where=available >= 1,
+        ).returning(RateLimitBucket.key)
+
+        db = self._session_factory()
+        try:
+            allowed = db.execute(stmt).first() is not None
+            db.commit()
+            if allowed:
+                self._maybe_sweep(db, now)
+            return allowed
+        finally:
+            db.close()
+
+    def _maybe_sweep(self, db, now: float):
+        if now - self._last_sweep < self.sweep_interval_seconds:
+            return
+        self._last_sweep = now
+        db.execute(delete(RateLimitBucket).where(RateLimitBucket.updated_at < now - self.idle_seconds))
+        db.commit()
+
+
+def create_rate_limit_backend(
+    backend: str,
+    *,
+    idle_seconds: float,
+    default_engine=None,
+    database_url: str | None = None,
+):
+    """
+    "memory": per-process buckets (limits are per uvicorn worker).
+    "sql": shared buckets in `database_url`, or the main database when unset.
+    A local file such as sqlite:////var/run/ocl/ratelimit.db shares limits
+    between the workers on one host without touching the main database.
+    """
+    if backend == "memory":
+        return MemoryRateLimitBackend(idle_seconds=idle_seconds)
+    if backend == "sql":
+        if database_url:
+            engine = create_engine(database_url, future=True)
+            create_rate_limit_table(engine)
+        else:
+            engine = default_engine
+        return SQLRateLimitBackend(engine, idle_seconds=idle_seconds)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# database.py reads the URL at import; every test module shares this file.
+_db_dir = tempfile.mkdtemp(prefix="ocl-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'app.db')}"
+os.environ["SCHEMA_STARTUP_MODE"] = "upgrade"
+os.environ["COOKIE_SECURE"] = "false"
+os.environ["COOKIE_DOMAIN"] = ""
+
+import pytest
+
+TEST_PASSWORD = "pw12345678"
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import main
+
+    return main
+
+
+@pytest.fixture
+def app(app_module):
+    """The app on a freshly emptied database with cold caches."""
+    from fastapi.testclient import TestClient
+
+    from database import engine
+    from models import Base
+
+    with TestClient(app_module.app):  # runs the lifespan once per test
+        yield app_module.app
+
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    for cache in (
+        app_module.identity_cache,
+        app_module.matter_access_cache,
+        app_module.document_matter_cache,
+        app_module.csrf_session_cache,
+    ):
+        cache.clear()
+    app_module.rate_limit_backend._buckets.clear()
+
+
+@pytest.fixture
+def make_user(app):
+    from auth_utils import hash_password
+    from database import SessionLocal
+    from models import User
+
+    def _make_user(email: str, role: str = "client", name: str | None = None) -> int:
+        db = SessionLocal()
+        try:
+            user = User(
+                name=name or email.split("@")[0],
+                email=email,
+                role=role,
+                password_hash=hash_password(TEST_PASSWORD),
+            )
+            db.add(user)
+            db.commit()
+            return user.id
+        finally:
+            db.close()
+
+    return _make_user
+
+
+@pytest.fixture
+def login(app):
+    """Return a TestClient signed in as `email`, sending its CSRF header."""
+    from fastapi.testclient import TestClient
+
+    clients = []
+
+    def _login(email: str) -> TestClient:
+        client = TestClient(app)
+        clients.append(client)
+        response = client.post("/auth/login", json={"email": email, "password": TEST_PASSWORD})
+        assert response.status_code == 200, response.text
+        client.headers["x-csrf-token"] = client.cookies.get("ocl_csrf")
+        return client
+
+    yield _login
+    for client in clients:
+        client.close()
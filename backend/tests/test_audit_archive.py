@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import audit_archive
+import migrations
+from audit_archive import archive_audit_events, iter_archived_events, merge_audit_rows
+from audit_log import serialize_audit_event
+from models import AuditEvent
+
+
+def test_export_merges_overlapping_segments_and_table_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    migrations.upgrade(engine)
+    session_factory = sessionmaker(bind=engine)
+    archive_dir = str(tmp_path / "archive")
+    month = (datetime.now(timezone.utc) - timedelta(days=90)).replace(day=10, microsecond=0)
+
+    def add_event(event_type: str, created_at: datetime):
+        with session_factory() as db:
+            db.add(AuditEvent(event_type=event_type, metadata_json="{}", created_at=created_at))
+            db.commit()
+
+    add_event("first", month)
+    add_event("third", month + timedelta(hours=2))
+    archive_audit_events(session_factory, archive_dir, older_than_days=30)
+    # Arrives after the month was archived: goes into a second segment.
+    add_event("second", month + timedelta(hours=1))
+    archive_audit_events(session_factory, archive_dir, older_than_days=30)
+    # Still in the table, but older than archived rows.
+    add_event("live", month + timedelta(hours=1, minutes=30))
+
+    with session_factory() as db:
+        table_rows = [
+            serialize_audit_event(event)
+            for event in db.scalars(select(AuditEvent).order_by(AuditEvent.created_at, AuditEvent.id))
+        ]
+    archived = list(iter_archived_events(archive_dir))
+    # A run that stopped before deleting leaves a row in both places.
+    table_rows = sorted(
+        table_rows + [archived[-1]],
+        key=lambda row: (datetime.fromisoformat(row["created_at"]).replace(tzinfo=None), row["id"]),
+    )
+
+    merged = list(merge_audit_rows(iter_archived_events(archive_dir), iter(table_rows)))
+
+    assert [row["event_type"] for row in merged] == ["first", "second", "live", "third"]
+
+
+def test_rows_committed_during_the_export_are_not_deleted(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    migrations.upgrade(engine)
+    session_factory = sessionmaker(bind=engine)
+    archive_dir = str(tmp_path / "archive")
+    month = (datetime.now(timezone.utc) - timedelta(days=90)).replace(day=10, microsecond=0)
+
+    def add_event(event_id: int, event_type: str):
+        with session_factory() as db:
+            db.add(AuditEvent(id=event_id, event_type=event_type, metadata_json="{}", created_at=month))
+            db.commit()
+
+    add_event(1, "exported")
+    add_event(3, "exported")
+    write_segment = audit_archive._write_segment
+
+    def write_segment_then_commit_late_row(*args):
+        manifest, ids = write_segment(*args)
+        if manifest:
+            # A transaction that took id 2 earlier commits only now.
+            add_event(2, "late")
+        return manifest, ids
+
+    monkeypatch.setattr(audit_archive, "_write_segment", write_segment_then_commit_late_row)
+    archive_audit_events(session_factory, archive_dir, older_than_days=30)
+
+    assert [row["id"] for row in iter_archived_events(archive_dir)] == [1, 3]
+    with session_factory() as db:
+        assert db.scalars(select(AuditEvent.event_type)).all() == ["late"]
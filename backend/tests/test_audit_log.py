@@ -0,0 +1,119 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import migrations
+from audit_log import AuditWriter
+from database import SessionLocal
+from models import AuditEvent
+
+
+def audit_row(event_type: str) -> dict:
+    return {
+        "event_type": event_type,
+        "metadata_json": "{}",
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def test_deferred_rows_are_written_only_after_commit(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    migrations.upgrade(engine)
+    session_factory = sessionmaker(bind=engine)
+    writer = AuditWriter(session_factory)
+    writer.install_session_hooks(session_factory)
+
+    db = session_factory()
+    writer.defer(db, audit_row("rolled_back"))
+    db.rollback()
+    writer.defer(db, audit_row("committed"))
+    assert writer.stats()["enqueued"] == 0
+    db.commit()
+    db.close()
+
+    assert writer.stats()["enqueued"] == 1
+    writer.flush()
+    with session_factory() as db:
+        assert db.scalars(select(AuditEvent.event_type)).all() == ["committed"]
+
+
+def test_rows_that_do_not_fit_the_queue_are_written_at_commit(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    migrations.upgrade(engine)
+    session_factory = sessionmaker(bind=engine)
+    writer = AuditWriter(session_factory, max_queue_size=1)
+    writer.install_session_hooks(session_factory)
+
+    with session_factory() as db:
+        writer.defer(db, audit_row("queued"))
+        writer.defer(db, audit_row("overflow"))
+        db.commit()
+
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(AuditEvent)) == 1
+    writer.flush()
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(AuditEvent)) == 2
+
+
+def count_audit_events(event_type: str) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).where(AuditEvent.event_type == event_type))
+
+
+def test_denials_on_the_async_read_path_are_written_off_the_request(
+    app_module, monkeypatch, make_user, login
+):
+    writer_threads = []
+    write_audit_event_on_primary = app_module.write_audit_event_on_primary
+
+    def record_writer_thread(row):
+        writer_threads.append(threading.current_thread().name)
+        write_audit_event_on_primary(row)
+
+    monkeypatch.setattr(app_module, "write_audit_event_on_primary", record_writer_thread)
+    make_user("lawyer@example.com", role="lawyer")
+    owner_id = make_user("owner@example.com")
+    make_user("other@example.com")
+    matter_id = (
+        login("lawyer@example.com")
+        .post("/matters", json={"title": "Estate", "client_id": owner_id})
+        .json()["id"]
+    )
+
+    response = login("other@example.com").get(f"/matters/{matter_id}/messages")
+
+    assert response.status_code == 404
+    deadline = time.monotonic() + 5
+    while not count_audit_events("access_denied"):
+        assert time.monotonic() < deadline, "denial was never recorded"
+        time.sleep(0.05)
+    assert len(writer_threads) == 1
+    assert writer_threads[0].startswith("audit-primary")
+
+
+def test_metadata_filters_match_objects_and_arrays(make_user, login):
+    make_user("lawyer@example.com", role="lawyer")
+    lawyer = login("lawyer@example.com")
+    with SessionLocal() as db:
+        for event_type, metadata in (
+            ("object", '{"k": {"a": 1}}'),
+            ("array", '{"k": [1, 2]}'),
+            ("scalar", '{"k": 1}'),
+        ):
+            db.add(
+                AuditEvent(
+                    event_type=event_type,
+                    metadata_json=metadata,
+                    created_at=datetime.now(timezone.utc),
+                )
+            )
+        db.commit()
+
+    for meta, expected in (('k={"a":1}', "object"), ("k=[1,2]", "array"), ("k=1", "scalar")):
+        response = lawyer.get("/audit-events", params={"meta": meta})
+        assert response.status_code == 200, response.text
+        assert [e["event_type"] for e in response.json()] == [expected]
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from conftest import TEST_PASSWORD
+from database import SessionLocal
+from models import PasswordResetToken, UserSession
+
+
+def test_cached_csrf_session_revoked_elsewhere_is_rejected(make_user, login):
+    user_id = make_user("client@example.com")
+    client = login("client@example.com")
+    assert client.patch("/notifications/read-all").status_code == 200  # warms the cache
+
+    # Logout handled by another worker: only the database knows.
+    db = SessionLocal()
+    db.execute(
+        update(UserSession)
+        .where(UserSession.user_id == user_id)
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+    db.commit()
+    db.close()
+
+    response = client.patch("/notifications/read-all")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Session revoked"
+
+
+def test_password_reset_revokes_existing_sessions(app_module, make_user, login):
+    user_id = make_user("client@example.com")
+    client = login("client@example.com")
+    assert client.patch("/notifications/read-all").status_code == 200
+    assert app_module.csrf_session_cache.stats()["entries"] == 1
+
+    db = SessionLocal()
+    db.add(
+        PasswordResetToken(
+            user_id=user_id,
+            token="reset-token",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+    )
+    db.commit()
+    db.close()
+
+    response = client.post(
+        "/password-reset/confirm",
+        json={"token": "reset-token", "password": TEST_PASSWORD + "-new"},
+    )
+    assert response.status_code == 200, response.text
+    assert app_module.csrf_session_cache.stats()["entries"] == 0
+
+    assert client.patch("/notifications/read-all").status_code == 401
+    assert client.post("/auth/refresh").status_code == 401
+
+
+def test_password_reset_rechecks_the_token_after_hashing(app_module, make_user, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from database import engine
+
+    user_id = make_user("client@example.com")
+    db = SessionLocal()
+    db.add(
+        PasswordResetToken(
+            user_id=user_id,
+            token="reset-token",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+    )
+    db.commit()
+    db.close()
+
+    hash_password_async = app_module.hash_password_async
+    checked_out_while_hashing = []
+
+    async def hash_while_the_token_is_used(password):
+        checked_out_while_hashing.append(engine.pool.checkedout())
+        # Another request finishes its reset while this one hashes.
+        with SessionLocal() as other:
+            other.execute(
+                update(PasswordResetToken)
+                .where(PasswordResetToken.token == "reset-token")
+                .values(used_at=datetime.now(timezone.utc))
+            )
+            other.commit()
+        return await hash_password_async(password)
+
+    monkeypatch.setattr(app_module, "hash_password_async", hash_while_the_token_is_used)
+    with TestClient(app_module.app) as client:
+        response = client.post(
+            "/password-reset/confirm",
+            json={"token": "reset-token", "password": TEST_PASSWORD + "-new"},
+        )
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Reset token has already been used"
+    assert checked_out_while_hashing == [0]
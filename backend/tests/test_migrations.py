@@ -0,0 +1,73 @@
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+from models import Base
+
+
+def schema_snapshot(engine) -> dict:
+    inspector = inspect(engine)
+    return {
+        table: (
+            {(column["name"], column["nullable"]) for column in inspector.get_columns(table)},
+            {index["name"] for index in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names()
+        if table != migrations.schema_migrations.name
+    }
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    modeled = create_engine(f"sqlite:///{tmp_path / 'modeled.db'}")
+
+    migrations.upgrade(migrated)
+    Base.metadata.create_all(modeled)
+
+    assert schema_snapshot(migrated) == schema_snapshot(modeled)
+
+
+def test_migrations_downgrade_to_empty_and_back(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'roundtrip.db'}")
+    migrations.upgrade(engine)
+    expected = schema_snapshot(engine)
+
+    migrations.downgrade(engine, target=0)
+    assert schema_snapshot(engine) == {}
+
+    migrations.upgrade(engine)
+    assert schema_snapshot(engine) == expected
+
+
+def test_baseline_upgrade_stamps_a_database_created_from_the_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(engine)
+    expected = schema_snapshot(engine)
+
+    applied = migrations.upgrade(engine)
+
+    assert [m.version for m in applied] == [m.version for m in migrations.MIGRATIONS]
+    assert schema_snapshot(engine) == expected
+
+
+def test_change_seq_backfill_numbers_existing_notifications_in_batches(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notifications.db'}")
+    migrations.upgrade(engine, target=4)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (id, name, email, password_hash) VALUES (1, 'u', 'u@x', 'h')")
+        )
+        for notification_id in (1, 2, 3, 5, 8):
+            conn.execute(
+                text(
+                    "INSERT INTO notifications (id, user_id, type, title, is_read) "
+                    "VALUES (:id, 1, 'message', 't', false)"
+                ),
+                {"id": notification_id},
+            )
+    monkeypatch.setattr(migrations, "BACKFILL_CHUNK_SIZE", 2)
+
+    migrations.upgrade(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, change_seq FROM notifications ORDER BY id")).all()
+    assert [(row.id, row.change_seq) for row in rows] == [(i, i) for i in (1, 2, 3, 5, 8)]
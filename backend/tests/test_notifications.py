@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from database import SessionLocal
+from models import Notification, NotificationCounter
+
+
+def add_notification(user_id: int, title: str = "New message") -> int:
+    db = SessionLocal()
+    try:
+        notification = Notification(user_id=user_id, type="new_message", title=title, body="")
+        db.add(notification)
+        db.commit()
+        return notification.id
+    finally:
+        db.close()
+
+
+def test_marking_a_notification_read_twice_decrements_once(make_user, login):
+    user_id = make_user("client@example.com")
+    first = add_notification(user_id, "first")
+    add_notification(user_id, "second")
+    client = login("client@example.com")
+    assert client.get("/notifications/unread-count").json()["unread_count"] == 2
+
+    for _attempt in range(2):
+        response = client.patch(f"/notifications/{first}/read")
+        assert response.status_code == 200, response.text
+        assert response.json()["is_read"] is True
+
+    assert client.get("/notifications/unread-count").json()["unread_count"] == 1
+
+
+def test_reading_the_unread_count_does_not_create_a_counter(make_user, login):
+    user_id = make_user("client@example.com")
+    add_notification(user_id)
+    client = login("client@example.com")
+
+    for path in ("/notifications/unread-count", "/portal/bootstrap"):
+        response = client.get(path)
+        assert response.status_code == 200, response.text
+        assert response.json()["unread_count"] == 1
+    db = SessionLocal()
+    assert db.get(NotificationCounter, user_id) is None
+    db.close()
+
+
+def test_marking_someone_elses_notification_read_is_not_found(make_user, login):
+    owner_id = make_user("owner@example.com")
+    make_user("other@example.com")
+    notification_id = add_notification(owner_id)
+
+    response = login("other@example.com").patch(f"/notifications/{notification_id}/read")
+
+    assert response.status_code == 404
+    db = SessionLocal()
+    assert db.get(Notification, notification_id).is_read is False
+    db.close()
+
+
+def test_coalescing_bump_takes_a_new_change_seq(make_user, login):
+    make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    lawyer = login("lawyer@example.com")
+    client = login("client@example.com")
+    matter_id = lawyer.post("/matters", json={"title": "Estate", "client_id": client_id}).json()["id"]
+
+    client.post(f"/matters/{matter_id}/messages", json={"body": "first"})
+    [first] = lawyer.get("/notifications").json()
+    client.post(f"/matters/{matter_id}/messages", json={"body": "second"})
+    [bumped] = lawyer.get("/notifications").json()
+
+    assert bumped["id"] == first["id"]
+    assert bumped["occurrence_count"] == 2
+    assert bumped["change_seq"] > first["change_seq"]
+
+
+def test_coalescing_bump_keeps_created_at_and_moves_last_occurred_at(make_user, login):
+    make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    lawyer = login("lawyer@example.com")
+    client = login("client@example.com")
+    matter_id = lawyer.post("/matters", json={"title": "Estate", "client_id": client_id}).json()["id"]
+    client.post(f"/matters/{matter_id}/messages", json={"body": "first"})
+    an_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    db = SessionLocal()
+    db.execute(update(Notification).values(created_at=an_hour_ago, last_occurred_at=an_hour_ago))
+    db.commit()
+    db.close()
+    [first] = lawyer.get("/notifications").json()
+
+    client.post(f"/matters/{matter_id}/messages", json={"body": "second"})
+    [bumped] = lawyer.get("/notifications").json()
+
+    assert bumped["created_at"] == first["created_at"]
+    assert bumped["last_occurred_at"] > first["last_occurred_at"]
+    # Read-all up to what the client saw before the bump leaves the bump unread.
+    response = lawyer.patch(
+        "/notifications/read-all",
+        params={"before": (an_hour_ago + timedelta(minutes=1)).isoformat()},
+    )
+    assert response.json() == {"updated": 0}
+
+
+def test_stream_replays_a_bumped_notification_after_last_event_id(
+    app_module, monkeypatch, make_user, login
+):
+    monkeypatch.setattr(app_module, "SYNC_SETTLE_SECONDS", 0)
+    # Expire the token so the stream ends right after the replay.
+    decode_access_token = app_module.decode_access_token
+    monkeypatch.setattr(
+        app_module, "decode_access_token", lambda token: {**decode_access_token(token), "exp": 0}
+    )
+    lawyer_id = make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    lawyer = login("lawyer@example.com")
+    client = login("client@example.com")
+    matter_id = lawyer.post("/matters", json={"title": "Estate", "client_id": client_id}).json()["id"]
+    client.post(f"/matters/{matter_id}/messages", json={"body": "first"})
+    [coalesced] = lawyer.get("/notifications").json()
+    db = SessionLocal()
+    app_module.create_notification(db, lawyer_id, "reminder", "Reminder")
+    db.commit()
+    db.close()
+    last_event_id = max(n["change_seq"] for n in lawyer.get("/notifications").json())
+    client.post(f"/matters/{matter_id}/messages", json={"body": "second"})
+
+    response = lawyer.get("/notifications/stream", headers={"Last-Event-ID": str(last_event_id)})
+
+    assert response.status_code == 200, response.text
+    replayed = [line for line in response.text.splitlines() if line.startswith("id:")]
+    [bumped] = [n for n in lawyer.get("/notifications").json() if n["id"] == coalesced["id"]]
+    assert bumped["occurrence_count"] == 2
+    assert replayed == [f"id: {bumped['change_seq']}"]
+    assert "event: reauthenticate" in response.text
@@ -0,0 +1,50 @@
+from sqlalchemy import update
+
+from database import SessionLocal
+from main import DEFAULT_PAGE_SIZE
+from models import Matter
+
+
+def create_matters(lawyer, client_id: int, count: int) -> list[int]:
+    return [
+        lawyer.post("/matters", json={"title": f"Matter {i}", "client_id": client_id}).json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_lists_are_complete_unless_paging_is_requested(make_user, login):
+    make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    lawyer = login("lawyer@example.com")
+    matter_ids = create_matters(lawyer, client_id, DEFAULT_PAGE_SIZE + 5)
+
+    response = lawyer.get("/matters")
+    assert len(response.json()) == len(matter_ids)
+    assert "X-Next-Cursor" not in response.headers
+
+    response = lawyer.get("/matters", params={"limit": 10})
+    assert len(response.json()) == 10
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_activity_sort_pages_through_matters_without_activity(make_user, login):
+    make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    lawyer = login("lawyer@example.com")
+    matter_ids = create_matters(lawyer, client_id, 7)
+    db = SessionLocal()
+    db.execute(update(Matter).where(Matter.id.in_(matter_ids[::2])).values(last_activity_at=None))
+    db.commit()
+    db.close()
+
+    seen = []
+    params = {"sort": "activity", "limit": 3}
+    while True:
+        response = lawyer.get("/matters", params=params)
+        assert response.status_code == 200, response.text
+        seen.extend(matter["id"] for matter in response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["before"] = response.headers["X-Next-Cursor"]
+
+    assert sorted(seen) == sorted(matter_ids)
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def count_statements():
+    """Counts statements sent by any engine, sync or async, inside the block."""
+    statements = []
+
+    def _count(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _count)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", _count)
+
+
+def create_matters(lawyer, client, client_id: int, count: int):
+    for index in range(count):
+        response = lawyer.post("/matters", json={"title": f"Matter {index}", "client_id": client_id})
+        assert response.status_code == 201, response.text
+        # Messages both ways, so each side has notifications and a counter row.
+        matter_id = response.json()["id"]
+        for sender in (lawyer, client):
+            response = sender.post(f"/matters/{matter_id}/messages", json={"body": "Hello"})
+            assert response.status_code == 201, response.text
+
+
+def statements_for(http, path: str) -> list[str]:
+    http.get(path)  # warm the identity and access caches
+    with count_statements() as statements:
+        response = http.get(path)
+    assert response.status_code == 200, response.text
+    return statements
+
+
+@pytest.mark.parametrize("matter_count", [1, 8])
+def test_portal_bootstrap_query_count_is_fixed(make_user, login, matter_count):
+    make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    lawyer = login("lawyer@example.com")
+    client = login("client@example.com")
+    create_matters(lawyer, client, client_id, matter_count)
+
+    for http in (lawyer, client):
+        statements = statements_for(http, "/portal/bootstrap")
+        # Matters, unread per matter, recent notifications, unread counter.
+        assert len(statements) == 4, statements
+
+
+@pytest.mark.parametrize("matter_count", [1, 8])
+def test_lawyer_matter_list_query_count_is_fixed(make_user, login, matter_count):
+    make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    lawyer = login("lawyer@example.com")
+    create_matters(lawyer, login("client@example.com"), client_id, matter_count)
+
+    assert len(statements_for(lawyer, "/matters")) == 1
+    assert len(statements_for(lawyer, "/lawyer/matters")) == 1
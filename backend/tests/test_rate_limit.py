@@ -0,0 +1,43 @@
+from sqlalchemy import event
+
+import rate_limit
+from rate_limit import create_rate_limit_backend
+
+
+def test_sql_backend_spends_and_denies_with_one_statement(tmp_path):
+    backend = create_rate_limit_backend(
+        "sql",
+        idle_seconds=60,
+        database_url=f"sqlite:///{tmp_path / 'ratelimit.db'}",
+    )
+    statements = []
+    event.listen(
+        backend.engine,
+        "before_cursor_execute",
+        lambda _conn, _cursor, statement, *_args: statements.append(statement),
+    )
+
+    results = [backend.take("login:1.2.3.4", capacity=2, refill_per_second=0.001) for _ in range(3)]
+
+    assert results == [True, True, False]
+    assert len(statements) == 3
+    assert all(statement.startswith("INSERT INTO rate_limit_buckets") for statement in statements)
+    # Buckets are per key.
+    assert backend.take("login:5.6.7.8", capacity=2, refill_per_second=0.001)
+
+
+def test_sql_backend_refills(tmp_path, monkeypatch):
+    backend = create_rate_limit_backend(
+        "sql",
+        idle_seconds=60,
+        database_url=f"sqlite:///{tmp_path / 'ratelimit.db'}",
+    )
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: clock[0])
+
+    assert backend.take("key", capacity=1, refill_per_second=0.5)
+    assert not backend.take("key", capacity=1, refill_per_second=0.5)
+    clock[0] += 1.0  # half a token: still denied
+    assert not backend.take("key", capacity=1, refill_per_second=0.5)
+    clock[0] += 1.0
+    assert backend.take("key", capacity=1, refill_per_second=0.5)
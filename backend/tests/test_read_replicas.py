@@ -0,0 +1,60 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from starlette.requests import Request
+
+import database
+from conftest import TEST_PASSWORD
+from models import Base, User
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    """An empty replica, so a read that finds rows must have gone to the primary."""
+    replica_engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'replica.db')}")
+    Base.metadata.create_all(replica_engine)
+    monkeypatch.setattr(database, "replica_engines", [replica_engine])
+    monkeypatch.setattr(database, "replica_router", database.ReplicaRouter(1))
+    yield replica_engine
+    replica_engine.dispose()
+
+
+def test_read_db_session_rejects_writes(app_module, make_user):
+    user_id = make_user("client@example.com")
+    dependency = app_module.get_read_db(Request({"type": "http", "headers": []}))
+    db = next(dependency)
+    try:
+        assert db.info[database.READ_ONLY_SESSION_KEY] is True
+        db.get(User, user_id).name = "Changed"
+        with pytest.raises(RuntimeError, match="Read-only session"):
+            db.flush()
+    finally:
+        dependency.close()
+
+
+def test_read_your_writes_cookie_sends_the_next_read_to_the_primary(
+    app_module, app, replica, make_user
+):
+    make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    # The middleware is only installed when replicas are configured at import.
+    lawyer = TestClient(app_module.ReadYourWritesMiddleware(app))
+    response = lawyer.post(
+        "/auth/login", json={"email": "lawyer@example.com", "password": TEST_PASSWORD}
+    )
+    assert response.status_code == 200, response.text
+    lawyer.headers["x-csrf-token"] = lawyer.cookies.get("ocl_csrf")
+
+    response = lawyer.post("/matters", json={"title": "Estate", "client_id": client_id})
+    assert response.status_code == 201, response.text
+    assert app_module.READ_YOUR_WRITES_COOKIE_NAME in lawyer.cookies
+
+    assert [m["title"] for m in lawyer.get("/lawyer/matters").json()] == ["Estate"]
+    assert database.replica_router.stats()["primary_reads"] == 1
+
+    lawyer.cookies.delete(app_module.READ_YOUR_WRITES_COOKIE_NAME)
+    assert lawyer.get("/lawyer/matters").json() == []
+    assert database.replica_router.stats()["replica_reads"] == 1
+    lawyer.close()
@@ -0,0 +1,54 @@
+import time
+
+from database import SessionLocal
+from models import MatterMessage
+
+
+def setup_matter(make_user, login):
+    make_user("lawyer@example.com", role="lawyer")
+    client_id = make_user("client@example.com")
+    lawyer = login("lawyer@example.com")
+    client = login("client@example.com")
+    matter_id = lawyer.post("/matters", json={"title": "Estate", "client_id": client_id}).json()["id"]
+    return lawyer, client, matter_id
+
+
+def test_sync_returns_a_bumped_coalesced_notification(app_module, monkeypatch, make_user, login):
+    monkeypatch.setattr(app_module, "SYNC_SETTLE_SECONDS", 0)
+    lawyer, client, matter_id = setup_matter(make_user, login)
+    lawyer.post(f"/matters/{matter_id}/messages", json={"body": "first"})
+    head = client.get("/sync").json()["cursor"]
+
+    lawyer.post(f"/matters/{matter_id}/messages", json={"body": "second"})
+    changes = client.get("/sync", params={"cursor": head}).json()["changes"]
+
+    [notification] = changes["notifications"]
+    assert notification["occurrence_count"] == 2
+    assert [message["body"] for message in changes["messages"]] == ["second"]
+
+
+def test_sync_returns_rows_that_commit_after_a_higher_id(app_module, monkeypatch, make_user, login):
+    monkeypatch.setattr(app_module, "SYNC_SETTLE_SECONDS", 60)
+    lawyer, client, matter_id = setup_matter(make_user, login)
+    sender_id = lawyer.get("/auth/me").json()["id"]
+
+    def commit_message(message_id: int, body: str):
+        db = SessionLocal()
+        db.add(MatterMessage(id=message_id, matter_id=matter_id, sender_id=sender_id, body=body))
+        db.commit()
+        db.close()
+
+    commit_message(100, "committed first")
+    head = client.get("/sync").json()["cursor"]
+    # A transaction that took id 50 before id 100 was assigned commits late.
+    commit_message(50, "committed late")
+
+    result = client.get("/sync", params={"cursor": head}).json()
+    bodies = {message["body"] for message in result["changes"]["messages"]}
+    assert bodies == {"committed first", "committed late"}
+
+    # Repeated recent rows alone do not end a long poll early.
+    started = time.monotonic()
+    again = client.get("/sync", params={"cursor": result["cursor"], "wait": 1}).json()
+    assert time.monotonic() - started >= 0.9
+    assert {message["body"] for message in again["changes"]["messages"]} == bodies
@@ -258,6 +258,23 @@ export async function fetchMe(retry = false) {
   return meInFlight;
 }
 
+// Dashboard data in one request; returns null when the session is not valid.
+export async function fetchPortalBootstrap() {
+  const res = await authFetch("/portal/bootstrap");
+  if (res.status === 401) {
+    meCache = null;
+    return null;
+  }
+  if (!res.ok) {
+    const txt = await res.text().catch(() => "");
+    console.error("fetchPortalBootstrap failed:", res.status, txt);
+    throw new Error("Failed to load your dashboard");
+  }
+  const data = await res.json();
+  meCache = data.user;
+  return data;
+}
+
 // Unified: fetch matters for current user based on role (backend handles it)
 export async function fetchMyMatters() {
   const res = await authFetch("/matters");
@@ -299,6 +316,73 @@ export async function fetchUnreadNotificationCount() {
   return res.json();
 }
 
+// Opens the /notifications/stream event source. `onNotification` gets each
+// new or bumped notification (merge it with mergeNotification); `onResync`
+// means events were dropped and the list should be reloaded. Reconnects
+// resume from the last change_seq seen. Returns a function that closes it.
+export function subscribeToNotifications({ onNotification, onResync } = {}) {
+  if (typeof window === "undefined" || typeof EventSource === "undefined") {
+    return () => {};
+  }
+
+  let source = null;
+  let closed = false;
+  let lastEventId = "";
+  let reconnectTimer = null;
+
+  function open() {
+    const query = lastEventId ? `?last_event_id=${encodeURIComponent(lastEventId)}` : "";
+    source = new EventSource(`${API}/notifications/stream${query}`, {
+      withCredentials: true,
+    });
+
+    source.addEventListener("notification", (event) => {
+      if (event.lastEventId) lastEventId = event.lastEventId;
+      try {
+        onNotification?.(JSON.parse(event.data));
+      } catch (err) {
+        console.error("Bad notification event:", err);
+      }
+    });
+    source.addEventListener("resync", () => onResync?.());
+    // The server ends the stream when the access token expires.
+    source.addEventListener("reauthenticate", () => reconnect(0));
+    source.onerror = () => {
+      // EventSource retries dropped connections by itself; a rejected one
+      // (e.g. 401 after the cookie expired) is closed and needs a refresh.
+      if (source.readyState === EventSource.CLOSED) reconnect(5000);
+    };
+  }
+
+  function reconnect(delayMs) {
+    source?.close();
+    if (closed || reconnectTimer) return;
+    reconnectTimer = setTimeout(async () => {
+      reconnectTimer = null;
+      const refreshed = await refreshSessionOnce();
+      if (!closed && refreshed) open();
+    }, delayMs);
+  }
+
+  open();
+
+  return () => {
+    closed = true;
+    clearTimeout(reconnectTimer);
+    source?.close();
+  };
+}
+
+// Puts a streamed notification at the top of the list, replacing the copy
+// with the same id unless that copy is already as recent.
+export function mergeNotification(notifications, notification) {
+  const existing = notifications.find((item) => item.id === notification.id);
+  if (existing && (existing.change_seq ?? 0) >= (notification.change_seq ?? 0)) {
+    return notifications;
+  }
+  return [notification, ...notifications.filter((item) => item.id !== notification.id)];
+}
+
 export async function markNotificationRead(notificationId) {
   const res = await authFetch(`/notifications/${notificationId}/read`, {
     method: "PATCH",
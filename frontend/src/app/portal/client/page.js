@@ -4,12 +4,13 @@ import Link from "next/link";
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import {
-  fetchMyMatters,
-  fetchMe,
+  fetchPortalBootstrap,
+  fetchNotifications,
+  subscribeToNotifications,
+  mergeNotification,
   uploadMatterFile,
   fetchMatterDocuments,
   getDocumentAccessLinks,
-  fetchNotifications,
   markNotificationRead,
   markAllNotificationsRead,
 } from "../../lib/auth";
@@ -145,6 +146,11 @@ function NotificationsPanel({
                 <div className="min-w-0">
                   <p className="text-sm font-semibold text-slate-900">
                     {notification.title}
+                    {notification.occurrence_count > 1 && (
+                      <span className="ml-2 rounded-full bg-[#245B83] px-2 py-0.5 text-xs font-medium text-white">
+                        {notification.occurrence_count}
+                      </span>
+                    )}
                   </p>
                   {notification.body && (
                     <p className="mt-1 break-words text-sm leading-6 text-slate-600">
@@ -157,7 +163,7 @@ function NotificationsPanel({
                 )}
               </div>
               <p className="mt-2 text-xs text-slate-500">
-                {formatNotificationDate(notification.created_at)}
+                {formatNotificationDate(notification.last_occurred_at || notification.created_at)}
               </p>
             </button>
           ))
@@ -566,42 +572,21 @@ export default function ClientDashboardPage() {
       }
 
       try {
-        const [meResult, mattersResult, notificationsResult] = await Promise.allSettled([
-          fetchMe(true),
-          fetchMyMatters(),
-          fetchNotifications(),
-        ]);
+        const bootstrap = await fetchPortalBootstrap();
 
         if (cancelled) return;
 
-        if (
-          meResult.status !== "fulfilled" ||
-          !meResult.value ||
-          meResult.value.role !== "client"
-        ) {
+        if (!bootstrap || !bootstrap.user || bootstrap.user.role !== "client") {
           router.push("/portal");
           return;
         }
 
-        if (mattersResult.status === "fulfilled") {
-          setMatters(Array.isArray(mattersResult.value) ? mattersResult.value : []);
-          setError(null);
-        } else {
-          setMatters([]);
-          setError(getErrorMessage(mattersResult.reason, "Could not load your matters."));
-        }
-
-        if (notificationsResult.status === "fulfilled") {
-          setNotifications(
-            Array.isArray(notificationsResult.value) ? notificationsResult.value : []
-          );
-          setNotificationsError("");
-        } else {
-          setNotifications([]);
-          setNotificationsError(
-            getErrorMessage(notificationsResult.reason, "Could not load notifications.")
-          );
-        }
+        setMatters(Array.isArray(bootstrap.matters) ? bootstrap.matters : []);
+        setError(null);
+        setNotifications(
+          Array.isArray(bootstrap.notifications) ? bootstrap.notifications : []
+        );
+        setNotificationsError("");
       } catch (e) {
         if (!cancelled) {
           setPageError(getErrorMessage(e, "Could not load your dashboard."));
@@ -622,6 +607,19 @@ export default function ClientDashboardPage() {
     };
   }, [router]);
 
+  useEffect(() => {
+    if (authLoading || pageError) return undefined;
+
+    return subscribeToNotifications({
+      onNotification: (notification) =>
+        setNotifications((prev) => mergeNotification(prev, notification)),
+      onResync: () =>
+        fetchNotifications()
+          .then((list) => setNotifications(Array.isArray(list) ? list : []))
+          .catch(() => {}),
+    });
+  }, [authLoading, pageError]);
+
   async function handleOpenNotification(notification) {
     const href = getNotificationHref(notification);
     try {
@@ -4,15 +4,16 @@ import Link from "next/link";
 import { useEffect, useMemo, useState } from "react";
 import { useRouter } from "next/navigation";
 import {
-  fetchMe,
-  fetchMyMatters,
+  fetchPortalBootstrap,
+  fetchNotifications,
+  subscribeToNotifications,
+  mergeNotification,
   createMatter,
   createClientInvitation,
   searchClients,
   uploadMatterFile,
   fetchMatterDocuments,
   getDocumentAccessLinks,
-  fetchNotifications,
   markNotificationRead,
   markAllNotificationsRead,
 } from "../../lib/auth";
@@ -162,6 +163,11 @@ function NotificationsPanel({
                 <div className="min-w-0">
                   <p className="text-sm font-semibold text-slate-900">
                     {notification.title}
+                    {notification.occurrence_count > 1 && (
+                      <span className="ml-2 rounded-full bg-[#245B83] px-2 py-0.5 text-xs font-medium text-white">
+                        {notification.occurrence_count}
+                      </span>
+                    )}
                   </p>
                   {notification.body && (
                     <p className="mt-1 break-words text-sm leading-6 text-slate-600">
@@ -169,7 +175,7 @@ function NotificationsPanel({
                     </p>
                   )}
                   <p className="mt-2 text-xs text-slate-500">
-                    {formatNotificationDate(notification.created_at)}
+                    {formatNotificationDate(notification.last_occurred_at || notification.created_at)}
                   </p>
                 </div>
                 {!notification.is_read && (
@@ -627,44 +633,21 @@ export default function LawyerDashboardPage() {
       }
 
       try {
-        const [meResult, mattersResult, notificationsResult] = await Promise.allSettled([
-          fetchMe(true),
-          fetchMyMatters(),
-          fetchNotifications(),
-        ]);
+        const bootstrap = await fetchPortalBootstrap();
 
         if (cancelled) return;
 
-        if (
-          meResult.status !== "fulfilled" ||
-          !meResult.value ||
-          meResult.value.role !== "lawyer"
-        ) {
+        if (!bootstrap || !bootstrap.user || bootstrap.user.role !== "lawyer") {
           router.push("/portal");
           return;
         }
 
-        if (mattersResult.status === "fulfilled") {
-          setMatters(Array.isArray(mattersResult.value) ? mattersResult.value : []);
-          setMattersError(null);
-        } else {
-          setMatters([]);
-          setMattersError(
-            getErrorMessage(mattersResult.reason, "Could not load matters.")
-          );
-        }
-
-        if (notificationsResult.status === "fulfilled") {
-          setNotifications(
-            Array.isArray(notificationsResult.value) ? notificationsResult.value : []
-          );
-          setNotificationsError("");
-        } else {
-          setNotifications([]);
-          setNotificationsError(
-            getErrorMessage(notificationsResult.reason, "Could not load notifications.")
-          );
-        }
+        setMatters(Array.isArray(bootstrap.matters) ? bootstrap.matters : []);
+        setMattersError(null);
+        setNotifications(
+          Array.isArray(bootstrap.notifications) ? bootstrap.notifications : []
+        );
+        setNotificationsError("");
       } catch (e) {
         if (!cancelled) {
           setPageError(getErrorMessage(e, "Could not load your dashboard."));
@@ -684,6 +667,19 @@ export default function LawyerDashboardPage() {
     };
   }, [router]);
 
+  useEffect(() => {
+    if (checkingRole || pageError) return undefined;
+
+    return subscribeToNotifications({
+      onNotification: (notification) =>
+        setNotifications((prev) => mergeNotification(prev, notification)),
+      onResync: () =>
+        fetchNotifications()
+          .then((list) => setNotifications(Array.isArray(list) ? list : []))
+          .catch(() => {}),
+    });
+  }, [checkingRole, pageError]);
+
   const stats = useMemo(() => {
     const total = matters.length;
     const open = matters.filter((m) => {